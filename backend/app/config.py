@@ -6,29 +6,147 @@ load_dotenv()
 class Config:
     # Gemini API Configuration
     GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
+    # Optional override, e.g. a local stand-in server for tests
+    GEMINI_API_ENDPOINT = os.getenv("GEMINI_API_ENDPOINT")
     
     # Vector Store Configuration
     VECTOR_STORE_PATH = "data/vectors"
     TRANSCRIPTS_PATH = "data/transcripts"
+    CHECKPOINTS_PATH = "data/checkpoints"
+    BUNDLES_PATH = "data/bundles"
+    # Videos are hash-partitioned by video_id over this many Chroma directories; only
+    # applied when a store is created, existing stores keep their shard count
+    VECTOR_STORE_SHARDS = int(os.getenv("VECTOR_STORE_SHARDS", "1"))
+    # Directory of exported index bundles loaded during warm-up (e.g. a new node's popular videos)
+    WARM_UP_BUNDLES_PATH = os.getenv("WARM_UP_BUNDLES_PATH")
+    
+    # Transcript Fetch Configuration
+    # Concurrent YouTube fetches per node; split evenly across ingestion worker processes
+    TRANSCRIPT_FETCH_CONCURRENCY = 4
+    TRANSCRIPT_HTTP_POOL_SIZE = 10
+    TRANSCRIPT_NEGATIVE_TTL_SECONDS = 6 * 60 * 60
     
     # Embedding Model Configuration
     EMBEDDING_MODEL = "all-MiniLM-L6-v2"
     
+    # Shared embedding server ("host:port" or a Unix socket path); unset loads the model in-process
+    EMBEDDING_SERVER_ADDRESS = os.getenv("EMBEDDING_SERVER_ADDRESS")
+    # Shared secret for the connection handshake; required when the server listens on TCP
+    EMBEDDING_SERVER_AUTHKEY = os.getenv("EMBEDDING_SERVER_AUTHKEY")
+    
+    # Content-addressed embedding cache shared across videos
+    EMBEDDING_CACHE_ENABLED = True
+    EMBEDDING_CACHE_PATH = "data/embedding_cache.sqlite3"
+    EMBEDDING_CACHE_MAX_BYTES = 512 * 1024 * 1024
+    
+    # Query micro-batching: concurrent /chat queries share one encode call
+    QUERY_BATCHING_ENABLED = True
+    QUERY_BATCH_WINDOW_MS = 5
+    QUERY_BATCH_MAX_SIZE = 32
+    
+    # Background re-embedding into a versioned collection when the embedding model changes
+    MIGRATION_CHUNKS_PER_SECOND = 200
+    MIGRATION_BATCH_SIZE = 64
+    MIGRATION_MAX_PASSES = 5
+    # How long the outgoing query model stays loaded after the switch
+    MIGRATION_DRAIN_SECONDS = 30
+    
+    # Ingestion worker processes (0 runs ingestion on the in-process thread pool)
+    INGESTION_WORKERS = int(os.getenv("INGESTION_WORKERS", "0"))
+    INGESTION_WORKER_TORCH_THREADS = int(os.getenv("INGESTION_WORKER_TORCH_THREADS", "0"))
+    
     # Text Splitting Configuration
     CHUNK_SIZE = 1000
     CHUNK_OVERLAP = 200
     
     # Retrieval Configuration
     TOP_K_CHUNKS = 5
+    MULTI_VIDEO_TOP_K = 8
+    
+    # Adaptive retrieval depth: keep chunks up to the first large score drop or until
+    # the kept share of the candidates' relevance mass is reached, within min/max bounds.
+    # Off by default, so every query keeps TOP_K_CHUNKS unless enabled
+    ADAPTIVE_RETRIEVAL = os.getenv("ADAPTIVE_RETRIEVAL", "false").lower() == "true"
+    ADAPTIVE_MIN_CHUNKS = 2
+    ADAPTIVE_MAX_CHUNKS = 10
+    ADAPTIVE_SCORE_GAP = 0.08
+    ADAPTIVE_MASS_FRACTION = 0.8
+    
+    # Corpus-wide search
+    CORPUS_SEARCH_MAX_VIDEOS = 5
+    CORPUS_SEARCH_PER_VIDEO_TOP_N = 3
+    # Candidate videos come from centroid similarity, which is approximate: a video with one
+    # strongly matching chunk can rank low. More candidates per result trades latency for recall,
+    # and the best chunks of a small global chunk query are always added as candidates.
+    CORPUS_SEARCH_CANDIDATE_FACTOR = int(os.getenv("CORPUS_SEARCH_CANDIDATE_FACTOR", "2"))
+    CORPUS_SEARCH_GLOBAL_CHUNKS = int(os.getenv("CORPUS_SEARCH_GLOBAL_CHUNKS", "20"))
+    CORPUS_SEARCH_PARALLELISM = 8
+    
+    # Chat sessions: history beyond the token budget is compacted into a rolling summary
+    SESSION_HISTORY_TOKEN_BUDGET = 1500
+    SESSION_SUMMARY_MAX_TOKENS = 400
+    SESSION_KEEP_RECENT_TURNS = 2
+    SESSION_MAX_SESSIONS = 10000
+    SESSION_TTL_SECONDS = 24 * 60 * 60
     
     # LLM Configuration
     GEMINI_MODEL = "gemini-pro"
     MAX_TOKENS = 1000
     TEMPERATURE = 0.7
+    # Transcript characters sent for a summary, with or without context caching
+    SUMMARY_TRANSCRIPT_MAX_CHARS = int(os.getenv("SUMMARY_TRANSCRIPT_MAX_CHARS", "400000"))
+    
+    # Provider-side context caching of per-video transcripts (summaries).
+    # Needs a model version that supports cached content (e.g. "models/gemini-1.5-flash-001").
+    LLM_CONTEXT_CACHING = os.getenv("LLM_CONTEXT_CACHING", "false").lower() == "true"
+    LLM_CACHE_TTL_SECONDS = 3600
+    LLM_CACHE_RETRY_AFTER_SECONDS = 600
+    # Provider minimum for cached content; smaller prompts are sent in full (estimated at 4 chars/token)
+    LLM_CACHE_MIN_TOKENS = int(os.getenv("LLM_CACHE_MIN_TOKENS", "4096"))
+    LLM_CACHE_MAX_ENTRIES = 256
+    
+    # Tracing Configuration
+    TRACING_ENABLED = True
+    TRACES_PATH = "data/traces"
+    TRACE_FILE_MAX_BYTES = 10 * 1024 * 1024
+    TRACE_FILE_BACKUP_COUNT = 5
+    # Only slower requests are written; health probes are never traced
+    TRACE_MIN_DURATION_MS = float(os.getenv("TRACE_MIN_DURATION_MS", "100"))
+    # Traces waiting for the background writer; more are dropped rather than block requests
+    TRACE_EXPORT_QUEUE_SIZE = 1000
+    
+    # Access tracking and eviction of cold videos (a quota of 0 disables that bound)
+    ACCESS_TRACKER_PATH = "data/access.sqlite3"
+    ACCESS_FLUSH_INTERVAL_SECONDS = 30
+    EVICTION_DISK_QUOTA_BYTES = int(os.getenv("EVICTION_DISK_QUOTA_BYTES", "0"))
+    EVICTION_MEMORY_QUOTA_BYTES = int(os.getenv("EVICTION_MEMORY_QUOTA_BYTES", "0"))
+    # Index and storage overhead per raw vector byte
+    EVICTION_INDEX_OVERHEAD = 2.0
+    # Keep cached transcripts of evicted videos so re-ingesting skips the fetch
+    EVICTION_KEEP_TRANSCRIPTS = True
+    # Keep checkpoints (chunks and embeddings) of evicted videos so re-ingesting skips
+    # the embed. Eviction does not free them, so they are left out of the footprints
+    # counted against EVICTION_DISK_QUOTA_BYTES. When False, checkpoints count and an
+    # evicted video is fetched and embedded again from scratch if it is processed again.
+    EVICTION_KEEP_CHECKPOINTS = True
+    
+    # /stats and /health are served from a snapshot refreshed at this interval
+    STATS_REFRESH_SECONDS = 15
+    
+    # API responses: /video/{id}/info segment paging and gzip for large bodies
+    INFO_DEFAULT_FIELDS = ["video_id", "url_info", "processing_stats"]
+    INFO_SEGMENTS_PAGE_SIZE = 200
+    INFO_SEGMENTS_MAX_PAGE_SIZE = 2000
+    GZIP_MINIMUM_SIZE = 1024
     
     # CORS Configuration
     ALLOWED_ORIGINS = ["http://localhost:5173", "http://127.0.0.1:5173"]
 
-# Create directories if they don't exist
-os.makedirs(Config.VECTOR_STORE_PATH, exist_ok=True)
-os.makedirs(Config.TRANSCRIPTS_PATH, exist_ok=True)
\ No newline at end of file
+    @classmethod
+    def ensure_directories(cls):
+        """
+        Create the data directories; called at startup rather than on import
+        """
+        os.makedirs(cls.VECTOR_STORE_PATH, exist_ok=True)
+        os.makedirs(cls.TRANSCRIPTS_PATH, exist_ok=True)
+        os.makedirs(cls.CHECKPOINTS_PATH, exist_ok=True)
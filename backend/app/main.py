@@ -1,9 +1,13 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request, BackgroundTasks, Query
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, ORJSONResponse, Response
 from pydantic import BaseModel
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
+from contextlib import contextmanager
 import asyncio
+import time
 from concurrent.futures import ThreadPoolExecutor
 
 # Import RAG components
@@ -13,16 +17,49 @@ from rag.embedding_model import EmbeddingModel
 from rag.vector_store import VectorStore
 from rag.retriever import Retriever
 from rag.llm_handler import LLMHandler
+from rag.ingestion import IngestionPipeline, IngestionWorkerPool, attach_embeddings, reindex_from_checkpoints, \
+    rebuildable_videos
+from rag.checkpoint_store import CheckpointStore
+from rag.session_store import SessionStore
+from rag.eviction import AccessTracker, VideoEvictor, estimate_footprint
+from rag.migration import EmbeddingMigration
+from rag.bundles import import_bundles
 from utils.youtube_utils import validate_and_clean_url
+from utils.metrics import track_stage, observe_stage, register_executor, render_metrics
+from utils.tracing import start_trace, bind_context, TRACE_HEADER
+from utils.snapshots import SnapshotRefresher
 from app.config import Config
 
 # Initialize FastAPI app
 app = FastAPI(
     title="YouTube RAG Chatbot API",
     description="A RAG-based chatbot for YouTube video content",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
+# Warm-up progress reported by /ready
+startup_state = {'ready': False, 'error': None, 'started_at': time.time(), 'stages': {}}
+
+# Paths served before warm-up completes
+PROBE_PATHS = {"/", "/live", "/ready", "/metrics", "/docs", "/openapi.json"}
+
+@app.middleware("http")
+async def require_ready(request: Request, call_next):
+    """
+    Answer 503 until the components are warm, instead of failing on half-built state
+    """
+    if not startup_state['ready'] and request.url.path not in PROBE_PATHS:
+        return JSONResponse(
+            status_code=503,
+            content={'detail': 'Service is warming up'},
+            headers={'Retry-After': '5'}
+        )
+    return await call_next(request)
+
+# Compress large bodies for clients that send Accept-Encoding: gzip
+app.add_middleware(GZipMiddleware, minimum_size=Config.GZIP_MINIMUM_SIZE)
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -30,18 +67,140 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[TRACE_HEADER],
 )
 
-# Initialize components
-document_loader = DocumentLoader()
-text_splitter = TextSplitter()
-embedding_model = EmbeddingModel()
-vector_store = VectorStore()
-retriever = Retriever()
-llm_handler = LLMHandler()
+@app.middleware("http")
+async def trace_requests(request: Request, call_next):
+    """
+    Open a trace per request and return its ID in the response headers
+    """
+    if request.url.path in PROBE_PATHS:
+        return await call_next(request)
+    with start_trace(f"{request.method} {request.url.path}", request.headers.get(TRACE_HEADER)) as trace:
+        response = await call_next(request)
+        trace.attributes['status_code'] = response.status_code
+        response.headers[TRACE_HEADER] = trace.trace_id
+        return response
+
+# Components are built by warm_up() after the server starts listening, so /live
+# answers at once and /ready turns green only when models and stores are loaded
+document_loader: Optional[DocumentLoader] = None
+text_splitter: Optional[TextSplitter] = None
+vector_store: Optional[VectorStore] = None
+embedding_model: Optional[EmbeddingModel] = None
+retriever: Optional[Retriever] = None
+llm_handler: Optional[LLMHandler] = None
+checkpoint_store: Optional[CheckpointStore] = None
+session_store: Optional[SessionStore] = None
+access_tracker: Optional[AccessTracker] = None
+ingestion_pipeline: Optional[IngestionPipeline] = None
+ingestion_pool: Optional[IngestionWorkerPool] = None
+video_evictor: Optional[VideoEvictor] = None
+embedding_migration: Optional[EmbeddingMigration] = None
+stats_snapshot: Optional[SnapshotRefresher] = None
+
+# Thread pool for CPU-intensive tasks (waits on the worker processes when enabled)
+executor = ThreadPoolExecutor(max_workers=max(2, Config.INGESTION_WORKERS))
+register_executor("video_processing", executor)
+
+@contextmanager
+def _startup_stage(name: str):
+    started = time.perf_counter()
+    yield
+    startup_state['stages'][name] = round(time.perf_counter() - started, 3)
+
+def warm_up():
+    """
+    Build every component and push one query through the embedding model and the store
+    """
+    global document_loader, text_splitter, vector_store, embedding_model, retriever, llm_handler
+    global checkpoint_store, session_store, access_tracker, ingestion_pipeline, ingestion_pool
+    global video_evictor, embedding_migration, stats_snapshot
+    
+    try:
+        with _startup_stage("directories"):
+            Config.ensure_directories()
+        
+        with _startup_stage("vector_store"):
+            vector_store = VectorStore()
+            checkpoint_store = CheckpointStore()
+        
+        with _startup_stage("embedding_model"):
+            # Queries must use the model the active collection was embedded with
+            embedding_model = EmbeddingModel(vector_store.model_name)
+        
+        with _startup_stage("llm_handler"):
+            llm_handler = LLMHandler()
+        
+        with _startup_stage("components"):
+            document_loader = DocumentLoader()
+            text_splitter = TextSplitter()
+            retriever = Retriever(embedding_model, vector_store)
+            session_store = SessionStore()
+            access_tracker = AccessTracker()
+            ingestion_pipeline = IngestionPipeline(document_loader, text_splitter, embedding_model, checkpoint_store)
+            video_evictor = VideoEvictor(vector_store, access_tracker, _evict_video)
+            embedding_migration = EmbeddingMigration(vector_store, retriever, on_switch=_use_embedding_model)
+            
+            # Worker processes for fetch/split/embed, so ingestion does not compete
+            # with request handling for the GIL
+            if Config.INGESTION_WORKERS > 0:
+                ingestion_pool = IngestionWorkerPool(model_name=vector_store.model_name)
+                register_executor("ingestion_processes", ingestion_pool)
+        
+        with _startup_stage("video_index"):
+            # Older stores have no centroid collection yet, and video counts read from it.
+            # Runs before bundles load: their centroids would make the index look complete.
+            if vector_store.video_collection.count() == 0 and vector_store.collection.count() > 0:
+                vector_store.rebuild_video_index()
+        
+        if Config.WARM_UP_BUNDLES_PATH:
+            with _startup_stage("bundles"):
+                _load_warm_up_bundles(Config.WARM_UP_BUNDLES_PATH)
+        
+        with _startup_stage("first_query"):
+            # Loads lazily initialized model weights and the HNSW index
+            query_embedding = embedding_model.generate_single_embedding("warm up")
+            vector_store.search_similar(query_embedding, top_k=1)
+        
+        with _startup_stage("stats_snapshot"):
+            stats_snapshot = SnapshotRefresher(_collect_stats)
+            stats_snapshot.start()
+        
+    except Exception as e:
+        startup_state['error'] = str(e)
+        print(f"❌ Warm-up failed: {str(e)}")
+        return
+    
+    startup_state['ready'] = True
+    startup_state['ready_at'] = time.time()
+    print(f"✅ Ready in {startup_state['ready_at'] - startup_state['started_at']:.1f}s")
+    
+    # Background work that must not hold up readiness
+    if ingestion_pool:
+        ingestion_pool.warm_up()
+    if video_evictor.enabled:
+        # Track videos stored before access tracking existed, then enforce the quotas
+        video_evictor.backfill()
+        video_evictor.run()
+    embedding_migration.resume()
+
+@app.on_event("startup")
+async def start_warm_up():
+    """
+    Warm up in the background so the process answers /live while models load
+    """
+    asyncio.get_event_loop().run_in_executor(executor, warm_up)
 
-# Thread pool for CPU-intensive tasks
-executor = ThreadPoolExecutor(max_workers=2)
+@app.on_event("shutdown")
+async def stop_ingestion_workers():
+    if stats_snapshot:
+        stats_snapshot.stop()
+    if ingestion_pool:
+        ingestion_pool.shutdown()
+    if access_tracker:
+        access_tracker.flush()
 
 # Pydantic models
 class VideoProcessRequest(BaseModel):
@@ -50,6 +209,21 @@ class VideoProcessRequest(BaseModel):
 class ChatRequest(BaseModel):
     query: str
     video_id: Optional[str] = None
+    video_ids: Optional[List[str]] = None
+    session_id: Optional[str] = None
+    # Without a session_id, only keep history when the client asks for a new session
+    start_session: bool = False
+
+class SearchRequest(BaseModel):
+    query: str
+    max_videos: Optional[int] = None
+    per_video_top_n: Optional[int] = None
+
+class MigrationRequest(BaseModel):
+    embedding_model: str
+
+class BulkDeleteRequest(BaseModel):
+    video_ids: List[str]
 
 class VideoProcessResponse(BaseModel):
     success: bool
@@ -62,12 +236,66 @@ class ChatResponse(BaseModel):
     response: str
     query: str
     video_id: Optional[str] = None
+    video_ids: Optional[List[str]] = None
     context_used: bool = False
     relevant_chunks: Optional[list] = None
+    session_id: Optional[str] = None
 
 # Global storage for processed videos
 processed_videos = {}
 
+def _forget_video(video_id: str):
+    """
+    Drop everything kept for a video outside the vector store
+    """
+    processed_videos.pop(video_id, None)
+    checkpoint_store.delete(video_id)
+    llm_handler.invalidate_video_cache(video_id)
+    access_tracker.forget([video_id])
+
+def _evict_video(video_id: str):
+    """
+    Drop an evicted video's in-process state; its checkpoint and transcript are kept
+    (unless configured otherwise) so processing it again skips the fetch and embed
+    """
+    processed_videos.pop(video_id, None)
+    llm_handler.invalidate_video_cache(video_id)
+    if Config.EVICTION_KEEP_CHECKPOINTS:
+        checkpoint_store.mark_evicted(video_id)
+    else:
+        checkpoint_store.delete(video_id)
+    if not Config.EVICTION_KEEP_TRANSCRIPTS:
+        document_loader.clear_cache(video_id)
+
+def _load_warm_up_bundles(path: str):
+    """
+    Load exported index bundles so this node serves those videos without ingesting them
+    """
+    summary = import_bundles(vector_store, [path], document_loader, access_tracker)
+    for video_id, entry in summary['documents'].items():
+        document_data = entry['document_data']
+        processed_videos[video_id] = {
+            'url_info': entry['url_info'],
+            'document_data': document_data,
+            'processing_stats': {
+                'total_chunks': entry['chunk_count'],
+                'transcript_length': len(document_data['full_text']),
+                'total_segments': document_data['total_segments'],
+                'loaded_from_bundle': True
+            }
+        }
+    for bundle, reason in summary['skipped'].items():
+        print(f"⚠️ Skipped bundle {bundle}: {reason}")
+
+def _use_embedding_model(model: EmbeddingModel):
+    """
+    Point query encoding and in-process ingestion at the model of the newly active collection
+    """
+    global embedding_model
+    embedding_model = model
+    retriever.embedding_model = model
+    ingestion_pipeline.embedding_model = model
+
 @app.get("/")
 async def root():
     """Root endpoint"""
@@ -77,28 +305,78 @@ async def root():
         "version": "1.0.0"
     }
 
+@app.get("/live")
+async def liveness():
+    """
+    Liveness probe: the process is up and serving; touches no components
+    """
+    return {"status": "alive", "uptime_seconds": round(time.time() - startup_state['started_at'], 3)}
+
+@app.get("/ready")
+async def readiness():
+    """
+    Readiness probe: green once warm-up has loaded the models and opened the stores
+    """
+    body = {
+        "status": "ready" if startup_state['ready'] else ("failed" if startup_state['error'] else "warming_up"),
+        "stages": startup_state['stages']
+    }
+    if startup_state['error']:
+        body['error'] = startup_state['error']
+    if startup_state['ready']:
+        body['warm_up_seconds'] = round(startup_state['ready_at'] - startup_state['started_at'], 3)
+        return body
+    return JSONResponse(status_code=503, content=body)
+
+def _collect_stats() -> Dict[str, Any]:
+    """
+    Gather everything /stats and /health report; runs on the snapshot refresher thread
+    """
+    vector_stats = vector_store.get_collection_stats()
+    return {
+        'vector_store': vector_stats,
+        'retrieval_system': retriever.get_retrieval_stats(vector_stats),
+        'llm_model': llm_handler.get_model_info(),
+        'query_batching': embedding_model.get_batching_stats(),
+        'chat_sessions': session_store.get_stats(),
+        'eviction': video_evictor.get_stats(),
+        'processed_videos_count': len(processed_videos)
+    }
+
+def _snapshot_meta(snapshot: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        'refreshed_at': snapshot['refreshed_at'],
+        'age_seconds': snapshot['age_seconds'],
+        'refresh_ms': snapshot['refresh_ms'],
+        'stale': snapshot['stale'],
+        'error': snapshot['error']
+    }
+
 @app.get("/health")
 async def health_check():
-    """Health check endpoint"""
-    try:
-        # Check if all components are working
-        stats = vector_store.get_collection_stats()
-        model_info = llm_handler.get_model_info()
-        
-        return {
-            "status": "healthy",
-            "components": {
-                "vector_store": "ok" if 'error' not in stats else "error",
-                "llm_handler": "ok" if model_info.get('api_configured') else "error",
-                "embedding_model": "ok"
-            },
-            "stats": stats
-        }
-    except Exception as e:
-        return JSONResponse(
-            status_code=500,
-            content={"status": "unhealthy", "error": str(e)}
-        )
+    """Health check endpoint, served from the latest stats snapshot"""
+    snapshot = stats_snapshot.get() if stats_snapshot else None
+    if snapshot is None:
+        return JSONResponse(status_code=503, content={"status": "unhealthy", "error": "No stats snapshot yet"})
+    
+    stats = snapshot['data'].get('vector_store', {})
+    model_info = snapshot['data'].get('llm_model', {})
+    embedding_info = snapshot['data'].get('retrieval_system', {}).get('embedding_model', {})
+    body = {
+        "status": "healthy",
+        "components": {
+            "vector_store": "ok" if stats and 'error' not in stats else "error",
+            "llm_handler": "ok" if model_info.get('api_configured') else "error",
+            "embedding_model": "ok" if embedding_info and 'error' not in embedding_info else "error"
+        },
+        "stats": stats,
+        "snapshot": _snapshot_meta(snapshot)
+    }
+    # A failing or stalled refresher means the numbers above can no longer be trusted
+    if snapshot['error'] or snapshot['stale']:
+        body['status'] = "unhealthy"
+        return JSONResponse(status_code=503, content=body)
+    return body
 
 def process_video_sync(youtube_url: str) -> Dict[str, Any]:
     """
@@ -108,7 +386,8 @@ def process_video_sync(youtube_url: str) -> Dict[str, Any]:
         print("🔍 Received YouTube URL:", youtube_url)
 
         # Step 1: Validate URL
-        url_info = validate_and_clean_url(youtube_url)
+        with track_stage("url_validation"):
+            url_info = validate_and_clean_url(youtube_url)
         print("✅ URL Validation Result:", url_info)
 
         if not url_info['valid']:
@@ -130,23 +409,34 @@ def process_video_sync(youtube_url: str) -> Dict[str, Any]:
                 'step': 'already_processed'
             }
 
-        # Step 3: Load transcript
-        print(f"🎬 Loading transcript for video: {video_id}")
-        document_data = document_loader.load_transcript(url_info['clean_url'])
-
-        # Step 4: Split text into chunks
-        print("✂️ Splitting text into chunks...")
-        chunks = text_splitter.split_text(document_data['full_text'])
+        # Steps 3-5: Load transcript, split into chunks and generate embeddings
+        if ingestion_pool:
+            prepared = ingestion_pool.prepare(url_info, vector_store.model_name)
+            for stage, seconds in prepared['stage_seconds'].items():
+                observe_stage(stage, seconds)
+        else:
+            prepared = ingestion_pipeline.prepare(url_info)
 
-        # Step 5: Generate embeddings
-        print("🧠 Generating embeddings...")
-        embedded_chunks = embedding_model.embed_chunks(chunks)
+        document_data = prepared['document_data']
+        chunks = prepared['chunks']
+        embedded_chunks = attach_embeddings(chunks, prepared['embeddings'])
 
         # Step 6: Store in vector database
         print("📦 Storing in vector database...")
-        success = vector_store.add_documents(video_id, embedded_chunks)
+        with track_stage("vector_add"):
+            # Refused if an embedding migration switched models while this video was embedding
+            success = vector_store.add_documents(video_id, embedded_chunks, prepared['embedding_model'])
 
         if success:
+            checkpoint_store.mark_stored(video_id, vector_store.collection_name)
+            footprint = estimate_footprint(
+                chunks,
+                prepared['embeddings'].shape[1],
+                checkpoint_bytes=checkpoint_store.video_bytes(video_id),
+                cached_text_chars=len(document_data['full_text'])
+            )
+            access_tracker.record_video(video_id, **footprint)
+
             # Store video info
             processed_videos[video_id] = {
                 'url_info': url_info,
@@ -154,10 +444,15 @@ def process_video_sync(youtube_url: str) -> Dict[str, Any]:
                 'processing_stats': {
                     'total_chunks': len(chunks),
                     'transcript_length': len(document_data['full_text']),
-                    'total_segments': document_data['total_segments']
+                    'total_segments': document_data['total_segments'],
+                    'resumed_stages': prepared['resumed_stages'],
+                    'embedding_cache': prepared['embedding_cache']
                 }
             }
 
+            # Make room for the new video by evicting cold ones
+            video_evictor.run(protect=[video_id])
+
             return {
                 'success': True,
                 'message': 'Video processed successfully',
@@ -167,6 +462,12 @@ def process_video_sync(youtube_url: str) -> Dict[str, Any]:
                 'step': 'completed'
             }
 
+        elif prepared['embedding_model'] != vector_store.model_name:
+            return {
+                'success': False,
+                'message': 'The embedding model changed while this video was processing; please retry',
+                'step': 'vector_storage'
+            }
         else:
             return {
                 'success': False,
@@ -193,8 +494,7 @@ async def process_video(request: VideoProcessRequest):
         loop = asyncio.get_event_loop()
         result = await loop.run_in_executor(
             executor, 
-            process_video_sync, 
-            request.youtube_url
+            bind_context(process_video_sync, request.youtube_url)
         )
         
         if result['success']:
@@ -208,53 +508,162 @@ async def process_video(request: VideoProcessRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/chat", response_model=ChatResponse)
-async def chat(request: ChatRequest):
+async def chat(request: ChatRequest, background_tasks: BackgroundTasks):
     """
     Chat with the RAG system
     """
     try:
-        if request.video_id:
-            # Chat with video context
-            print(f"Chat request for video: {request.video_id}")
-            
-            # Check if video exists
-            if not vector_store.video_exists(request.video_id):
-                raise HTTPException(status_code=404, detail="Video not found. Please process the video first.")
-            
-            # Retrieve relevant context
-            context_result = retriever.retrieve_context(request.query, request.video_id)
-            
-            # Generate response with context
-            response_result = llm_handler.generate_response(
-                request.query, 
-                context_result['context'], 
-                request.video_id
-            )
-            
-            return ChatResponse(
-                response=response_result['response'],
-                query=request.query,
-                video_id=request.video_id,
-                context_used=True,
-                relevant_chunks=context_result.get('relevant_chunks', [])
-            )
-        else:
-            # General chat without video context
-            print("General chat request (no video context)")
-            response_result = llm_handler.chat_without_context(request.query)
-            
-            return ChatResponse(
-                response=response_result['response'],
-                query=request.query,
-                context_used=False
-            )
-            
+        response = await _answer_chat(request)
+        
+        # Remember the exchange; compaction into the rolling summary runs after the response is sent
+        if response.session_id:
+            session = session_store.get_or_create(response.session_id)
+            # The session may have expired while answering; report the replacement ID
+            response.session_id = session.session_id
+            if session_store.add_turn(session, request.query, response.response):
+                background_tasks.add_task(session_store.compact, session, llm_handler.summarize_conversation)
+        
+        return response
+    
     except HTTPException:
         raise
     except Exception as e:
         print(f"Error in chat: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+async def _answer_chat(request: ChatRequest) -> ChatResponse:
+    """
+    Retrieve context and generate the answer for one chat request
+    """
+    session = session_store.get_or_create(request.session_id) \
+        if request.session_id or request.start_session else None
+    history = session_store.build_history(session) if session else None
+    session_id = session.session_id if session else None
+    
+    video_ids = list(dict.fromkeys(
+        ([request.video_id] if request.video_id else []) + (request.video_ids or [])
+    ))
+    
+    if len(video_ids) > 1:
+        # Chat across several videos: one retrieval query, one LLM call
+        print(f"Chat request for {len(video_ids)} videos")
+        
+        missing = [
+            video_id for video_id in video_ids
+            if not await run_in_threadpool(vector_store.video_exists, video_id)
+        ]
+        if missing:
+            raise HTTPException(
+                status_code=404,
+                detail=f"Videos not found: {', '.join(missing)}. Please process them first."
+            )
+        
+        for video_id in video_ids:
+            access_tracker.touch(video_id)
+        
+        with track_stage("retrieve"):
+            context_result = await run_in_threadpool(
+                bind_context(retriever.retrieve_multi_context, request.query, video_ids)
+            )
+        
+        with track_stage("llm_generate"):
+            response_result = await run_in_threadpool(
+                bind_context(
+                    llm_handler.generate_response,
+                    request.query,
+                    context_result['context'],
+                    video_ids=video_ids,
+                    history=history
+                )
+            )
+        
+        return ChatResponse(
+            response=response_result['response'],
+            query=request.query,
+            video_ids=video_ids,
+            context_used=True,
+            relevant_chunks=context_result.get('relevant_chunks', []),
+            session_id=session_id
+        )
+    elif video_ids:
+        # Chat with video context
+        video_id = video_ids[0]
+        print(f"Chat request for video: {video_id}")
+        
+        # Check if video exists
+        if not await run_in_threadpool(vector_store.video_exists, video_id):
+            raise HTTPException(status_code=404, detail="Video not found. Please process the video first.")
+        access_tracker.touch(video_id)
+        
+        # Retrieve relevant context off the event loop so concurrent
+        # queries can share an encoder micro-batch
+        with track_stage("retrieve"):
+            context_result = await run_in_threadpool(
+                bind_context(retriever.retrieve_context, request.query, video_id)
+            )
+        
+        # Generate response with context
+        with track_stage("llm_generate"):
+            response_result = await run_in_threadpool(
+                bind_context(
+                    llm_handler.generate_response,
+                    request.query, 
+                    context_result['context'], 
+                    video_id,
+                    history=history
+                )
+            )
+        
+        return ChatResponse(
+            response=response_result['response'],
+            query=request.query,
+            video_id=video_id,
+            context_used=True,
+            relevant_chunks=context_result.get('relevant_chunks', []),
+            session_id=session_id
+        )
+    else:
+        # General chat without video context
+        print("General chat request (no video context)")
+        with track_stage("llm_generate"):
+            response_result = await run_in_threadpool(
+                bind_context(llm_handler.chat_without_context, request.query, history=history)
+            )
+        
+        return ChatResponse(
+            response=response_result['response'],
+            query=request.query,
+            context_used=False,
+            session_id=session_id
+        )
+
+@app.delete("/session/{session_id}")
+async def delete_session(session_id: str):
+    """
+    Forget a chat session and its history
+    """
+    if session_store.delete(session_id):
+        return {"message": f"Session {session_id} deleted successfully"}
+    raise HTTPException(status_code=404, detail="Session not found")
+
+@app.post("/search")
+async def search(request: SearchRequest):
+    """
+    Search across all processed videos, grouped by video
+    """
+    try:
+        with track_stage("corpus_search"):
+            return await run_in_threadpool(
+                bind_context(
+                    retriever.search_corpus,
+                    request.query,
+                    request.max_videos,
+                    request.per_video_top_n
+                )
+            )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.get("/video/{video_id}/summary")
 async def get_video_summary(video_id: str):
     """
@@ -263,14 +672,16 @@ async def get_video_summary(video_id: str):
     try:
         if not vector_store.video_exists(video_id):
             raise HTTPException(status_code=404, detail="Video not found")
+        access_tracker.touch(video_id)
         
         # Get video data
         if video_id in processed_videos:
             document_data = processed_videos[video_id]['document_data']
-            summary_result = llm_handler.generate_summary(
-                document_data['full_text'], 
-                video_id
-            )
+            with track_stage("llm_generate"):
+                summary_result = llm_handler.generate_summary(
+                    document_data['full_text'], 
+                    video_id
+                )
             return summary_result
         else:
             raise HTTPException(status_code=404, detail="Video data not found")
@@ -280,25 +691,57 @@ async def get_video_summary(video_id: str):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+VIDEO_INFO_FIELDS = {"video_id", "url_info", "processing_stats", "full_text", "segments"}
+
 @app.get("/video/{video_id}/info")
-async def get_video_info(video_id: str):
+async def get_video_info(video_id: str, fields: Optional[str] = None, cursor: int = Query(0, ge=0),
+                         limit: int = Query(Config.INFO_SEGMENTS_PAGE_SIZE, ge=1,
+                                            le=Config.INFO_SEGMENTS_MAX_PAGE_SIZE)):
     """
-    Get information about a processed video
+    Get information about a processed video.
+    `fields` is a comma-separated subset of video_id, url_info, processing_stats,
+    full_text and segments (defaults to the lightweight ones); segments are paged
+    with `cursor` and `limit`.
     """
     try:
+        requested = [field.strip() for field in fields.split(",") if field.strip()] \
+            if fields else Config.INFO_DEFAULT_FIELDS
+        unknown = set(requested) - VIDEO_INFO_FIELDS
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+        
         if not vector_store.video_exists(video_id):
             raise HTTPException(status_code=404, detail="Video not found")
+        access_tracker.touch(video_id)
         
-        if video_id in processed_videos:
-            return processed_videos[video_id]
-        else:
+        if video_id not in processed_videos:
             # Return basic info from vector store
-            chunks = vector_store.get_video_chunks(video_id)
             return {
                 'video_id': video_id,
-                'chunk_count': len(chunks),
+                'chunk_count': vector_store.count_video_chunks(video_id),
                 'status': 'processed'
             }
+        
+        entry = processed_videos[video_id]
+        document_data = entry['document_data']
+        info = {}
+        for field in requested:
+            if field == 'video_id':
+                info['video_id'] = video_id
+            elif field == 'full_text':
+                info['full_text'] = document_data['full_text']
+            elif field == 'segments':
+                timestamps = document_data['timestamps']
+                end = cursor + limit
+                info['segments'] = {
+                    'items': timestamps[cursor:end],
+                    'cursor': cursor,
+                    'next_cursor': end if end < len(timestamps) else None,
+                    'total': len(timestamps)
+                }
+            else:
+                info[field] = entry[field]
+        return info
             
     except HTTPException:
         raise
@@ -308,22 +751,99 @@ async def get_video_info(video_id: str):
 @app.get("/stats")
 async def get_system_stats():
     """
-    Get system statistics
+    Get system statistics, as of the last background refresh
+    """
+    snapshot = stats_snapshot.get() if stats_snapshot else None
+    if snapshot is None:
+        return {"error": "No stats snapshot yet"}
+    return {**snapshot['data'], 'snapshot': _snapshot_meta(snapshot)}
+
+@app.post("/maintenance/evict")
+async def evict_cold_videos(dry_run: bool = False):
+    """
+    Evict least recently used videos until the disk and memory quotas are met
     """
     try:
-        vector_stats = vector_store.get_collection_stats()
-        retrieval_stats = retriever.get_retrieval_stats()
-        model_info = llm_handler.get_model_info()
-        
+        return await run_in_threadpool(bind_context(video_evictor.run, dry_run=dry_run))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/migration")
+async def start_migration(request: MigrationRequest):
+    """
+    Re-embed all videos with another embedding model in the background, then switch to it
+    """
+    result = embedding_migration.start(request.embedding_model)
+    if 'error' in result:
+        raise HTTPException(status_code=409, detail=result['error'])
+    return result
+
+@app.get("/migration")
+async def get_migration_status():
+    """
+    Progress of the current or last embedding migration
+    """
+    return embedding_migration.get_status()
+
+@app.post("/reindex")
+async def reindex(clear: bool = False):
+    """
+    Rebuild the vector store from ingestion checkpoints, reusing stored embeddings.
+    With clear, only videos whose checkpoints match the active embedding model are
+    deleted and re-added; videos without such a checkpoint (ingested before
+    checkpointing, loaded from bundles, or checkpointed with an older model) are kept.
+    """
+    try:
+        def run():
+            video_ids = None
+            kept = []
+            if clear:
+                video_ids = rebuildable_videos(checkpoint_store, vector_store.model_name)
+                rebuildable = set(video_ids)
+                kept = [v for v in vector_store.list_videos() if v not in rebuildable]
+                vector_store.delete_videos(video_ids)
+                for video_id in video_ids:
+                    checkpoint_store.mark_unstored(video_id)
+            summary = reindex_from_checkpoints(vector_store, checkpoint_store, vector_store.model_name, video_ids)
+            summary['kept_without_checkpoint'] = kept
+            return summary
+
+        loop = asyncio.get_event_loop()
+        summary = await loop.run_in_executor(executor, run)
         return {
-            'vector_store': vector_stats,
-            'retrieval_system': retrieval_stats,
-            'llm_model': model_info,
-            'processed_videos_count': len(processed_videos)
+            'reindexed': len(summary['reindexed']),
+            'already_present': len(summary['already_present']),
+            'skipped': summary['skipped'],
+            'kept_without_checkpoint': summary['kept_without_checkpoint']
         }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/metrics")
+async def metrics():
+    """
+    Prometheus metrics endpoint
+    """
+    content, content_type = render_metrics()
+    return Response(content=content, media_type=content_type)
+
+@app.post("/videos/delete")
+async def delete_videos(request: BulkDeleteRequest):
+    """
+    Delete many processed videos in one call
+    """
+    try:
+        deleted = await run_in_threadpool(bind_context(vector_store.delete_videos, request.video_ids))
+        for video_id in request.video_ids:
+            _forget_video(video_id)
         
+        return {
+            'deleted': sorted(deleted),
+            'not_found': sorted(set(request.video_ids) - set(deleted)),
+            'chunks_deleted': sum(deleted.values())
+        }
     except Exception as e:
-        return {"error": str(e)}
+        raise HTTPException(status_code=500, detail=str(e))
 
 @app.delete("/video/{video_id}")
 async def delete_video(video_id: str):
@@ -334,9 +854,8 @@ async def delete_video(video_id: str):
         # Delete from vector store
         deleted = vector_store.delete_video(video_id)
         
-        # Remove from processed videos
-        if video_id in processed_videos:
-            del processed_videos[video_id]
+        # Remove from processed videos, checkpoints and cached LLM context
+        _forget_video(video_id)
         
         if deleted:
             return {"message": f"Video {video_id} deleted successfully"}
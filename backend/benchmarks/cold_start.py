@@ -0,0 +1,139 @@
+"""
+Cold-start benchmark for the YouTube RAG Chatbot API.
+
+Launches the API in a fresh process (with the offline transcript and LLM stubs)
+several times and measures time to first /live response, time to /ready, and
+the time spent importing app.main. Run from the backend directory:
+
+    python -m benchmarks.cold_start --runs 5
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import List, Dict, Any
+
+import requests
+
+from benchmarks.fixtures import install_stubs, percentile, environment_info
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+IMPORT_MARKER = "COLD_START_IMPORT_SECONDS="
+
+
+def serve(port: int, data_dir: str):
+    """
+    Child process: install the stubs, time the app import, then serve
+    """
+    install_stubs(data_dir)
+
+    started = time.perf_counter()
+    from app.main import app
+    print(f"{IMPORT_MARKER}{time.perf_counter() - started:.4f}", flush=True)
+
+    import uvicorn
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning")
+
+
+def _wait_for(url: str, deadline: float) -> float:
+    """
+    Poll url until it answers 200; returns the time it did
+    """
+    while time.time() < deadline:
+        try:
+            if requests.get(url, timeout=1).status_code == 200:
+                return time.perf_counter()
+        except requests.RequestException:
+            pass
+        time.sleep(0.02)
+    raise RuntimeError(f"{url} did not answer 200 in time")
+
+
+def measure_once(port: int, data_dir: str, timeout: float) -> Dict[str, Any]:
+    """
+    Start one API process and time it from spawn to live and to ready
+    """
+    base_url = f"http://127.0.0.1:{port}"
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.cold_start", "--serve", "--port", str(port), "--data-dir", data_dir],
+        stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True
+    )
+    try:
+        deadline = time.time() + timeout
+        live_at = _wait_for(f"{base_url}/live", deadline)
+        ready_at = _wait_for(f"{base_url}/ready", deadline)
+        stages = requests.get(f"{base_url}/ready", timeout=5).json().get('stages', {})
+    finally:
+        process.terminate()
+        output, _ = process.communicate(timeout=30)
+
+    import_seconds = None
+    for line in output.splitlines():
+        if line.startswith(IMPORT_MARKER):
+            import_seconds = float(line[len(IMPORT_MARKER):])
+
+    return {
+        'time_to_live_s': round(live_at - started, 3),
+        'time_to_ready_s': round(ready_at - started, 3),
+        'import_app_s': import_seconds,
+        'warm_up_stages_s': stages
+    }
+
+
+def summarize(values: List[float]) -> Dict[str, float]:
+    return {
+        'p50_s': round(percentile(values, 50), 3),
+        'max_s': round(max(values), 3) if values else 0.0
+    }
+
+
+def main(argv=None) -> Dict[str, Any]:
+    parser = argparse.ArgumentParser(description="Measure API cold-start time")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--timeout", type=float, default=300)
+    parser.add_argument("--data-dir", default=None, help="scratch data directory (default: temp dir)")
+    parser.add_argument("--output", default=None, help="results JSON path")
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.serve:
+        serve(args.port, args.data_dir)
+        return {}
+
+    data_dir = install_stubs(args.data_dir)
+    runs = []
+    for run in range(args.runs):
+        result = measure_once(args.port, data_dir, args.timeout)
+        runs.append(result)
+        print(f"Run {run + 1}: live in {result['time_to_live_s']}s, "
+              f"ready in {result['time_to_ready_s']}s (import {result['import_app_s']}s)")
+
+    report = {
+        'benchmark': 'cold_start',
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'environment': environment_info(),
+        'parameters': {'runs': args.runs},
+        'time_to_live': summarize([run['time_to_live_s'] for run in runs]),
+        'time_to_ready': summarize([run['time_to_ready_s'] for run in runs]),
+        'import_app': summarize([run['import_app_s'] for run in runs if run['import_app_s'] is not None]),
+        'runs': runs
+    }
+
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"cold_start_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {output}")
+
+    return report
+
+
+if __name__ == "__main__":
+    main()
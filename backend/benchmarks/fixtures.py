@@ -0,0 +1,233 @@
+import os
+import random
+import string
+import tempfile
+import time
+from typing import List, Dict, Any, Optional
+
+from app.config import Config
+
+WORDS = [
+    "model", "vector", "lecture", "example", "gradient", "network", "python",
+    "function", "memory", "index", "query", "result", "training", "layer",
+    "context", "answer", "video", "speaker", "topic", "system", "data",
+    "process", "value", "matrix", "token", "embedding", "search", "latency",
+    "cache", "server", "request", "thread", "design", "problem", "solution",
+    "today", "really", "important", "simple", "because", "another", "next",
+]
+
+
+def synthetic_video_ids(count: int, seed: int = 0) -> List[str]:
+    """
+    Generate deterministic 11-character YouTube-style video IDs
+    """
+    rng = random.Random(seed)
+    alphabet = string.ascii_letters + string.digits + "_-"
+    return ["".join(rng.choice(alphabet) for _ in range(11)) for _ in range(count)]
+
+
+def synthetic_sentence(rng: random.Random) -> str:
+    """
+    Build one transcript-like sentence from the benchmark vocabulary
+    """
+    words = [rng.choice(WORDS) for _ in range(rng.randint(8, 20))]
+    words[0] = words[0].capitalize()
+    return " ".join(words) + rng.choice([".", ".", ".", "?", "!"])
+
+
+def synthetic_transcript(video_id: str, segments: int = 400) -> List[Dict[str, Any]]:
+    """
+    Generate a deterministic transcript in the youtube-transcript-api segment format
+    """
+    rng = random.Random(video_id)
+    transcript = []
+    start = 0.0
+    for _ in range(segments):
+        duration = round(rng.uniform(1.5, 6.0), 2)
+        transcript.append({
+            'text': synthetic_sentence(rng),
+            'start': round(start, 2),
+            'duration': duration
+        })
+        start += duration
+    return transcript
+
+
+def synthetic_document(video_id: str, segments: int = 400) -> Dict[str, Any]:
+    """
+    Generate document data shaped like DocumentLoader.load_transcript output
+    """
+    transcript = synthetic_transcript(video_id, segments)
+    return {
+        'video_id': video_id,
+        'url': f"https://www.youtube.com/watch?v={video_id}",
+        'full_text': " ".join(segment['text'] for segment in transcript),
+        'timestamps': transcript,
+        'total_segments': len(transcript)
+    }
+
+
+class StubTranscript:
+    def __init__(self, video_id: str, segments: int):
+        self.video_id = video_id
+        self.segments = segments
+
+    def fetch(self) -> List[Dict[str, Any]]:
+        return synthetic_transcript(self.video_id, self.segments)
+
+
+class StubTranscriptList:
+    def __init__(self, video_id: str, segments: int):
+        self.video_id = video_id
+        self.segments = segments
+
+    def find_manually_created_transcript(self, language_codes: List[str]) -> StubTranscript:
+        return StubTranscript(self.video_id, self.segments)
+
+    def find_generated_transcript(self, language_codes: List[str]) -> StubTranscript:
+        return StubTranscript(self.video_id, self.segments)
+
+
+class StubYouTubeTranscriptApi:
+    """
+    Offline transcript source serving synthetic transcripts; also usable
+    as DocumentLoader(transcript_source=StubYouTubeTranscriptApi())
+    """
+    segments_per_video = 400
+    fetch_delay = 0.0
+
+    @classmethod
+    def list_transcripts(cls, video_id: str, *args, **kwargs) -> StubTranscriptList:
+        if cls.fetch_delay:
+            time.sleep(cls.fetch_delay)
+        return StubTranscriptList(video_id, cls.segments_per_video)
+
+
+class StubLLMHandler:
+    """
+    Offline stand-in for LLMHandler with a fixed, configurable generation delay
+    """
+    delay = 0.0
+
+    def __init__(self):
+        self.model_name = "stub-llm"
+        self.max_tokens = Config.MAX_TOKENS
+        self.temperature = Config.TEMPERATURE
+
+    def generate_response(self, query: str, context: str, video_id: str = None,
+                          video_ids: List[str] = None, history: str = None) -> Dict[str, Any]:
+        if self.delay:
+            time.sleep(self.delay)
+        return {
+            'response': f"Stub answer to '{query[:50]}' using {len(context)} characters of context.",
+            'query': query,
+            'video_id': video_id,
+            'has_context': bool(context.strip()),
+            'context_length': len(context)
+        }
+
+    def generate_summary(self, full_transcript: str, video_id: str = None) -> Dict[str, Any]:
+        if self.delay:
+            time.sleep(self.delay)
+        return {
+            'summary': f"Stub summary of {len(full_transcript)} characters.",
+            'video_id': video_id,
+            'transcript_length': len(full_transcript)
+        }
+
+    def chat_without_context(self, query: str, history: str = None) -> Dict[str, Any]:
+        if self.delay:
+            time.sleep(self.delay)
+        return {
+            'response': f"Stub answer to '{query[:50]}'.",
+            'query': query,
+            'has_context': False
+        }
+
+    def summarize_conversation(self, previous_summary: str, turns: str) -> str:
+        if self.delay:
+            time.sleep(self.delay)
+        return f"{previous_summary} {turns}".strip()[-1000:]
+
+    def invalidate_video_cache(self, video_id: str):
+        pass
+
+    def get_model_info(self) -> Dict[str, Any]:
+        return {
+            'model_name': self.model_name,
+            'max_tokens': self.max_tokens,
+            'temperature': self.temperature,
+            'api_configured': True
+        }
+
+
+def install_stubs(data_dir: Optional[str] = None, segments_per_video: int = 400,
+                  llm_delay: float = 0.0, fetch_delay: float = 0.0,
+                  embedding_cache: bool = False) -> str:
+    """
+    Point Config at a scratch data directory and swap in the offline stubs.
+    The embedding cache is off unless asked for, so repeated runs measure real
+    encoding and stay comparable with uncached baselines.
+    Must run before app.main is imported.
+    """
+    data_dir = data_dir or tempfile.mkdtemp(prefix="yt-rag-bench-")
+    Config.VECTOR_STORE_PATH = os.path.join(data_dir, "vectors")
+    Config.TRANSCRIPTS_PATH = os.path.join(data_dir, "transcripts")
+    Config.CHECKPOINTS_PATH = os.path.join(data_dir, "checkpoints")
+    Config.TRACES_PATH = os.path.join(data_dir, "traces")
+    Config.EMBEDDING_CACHE_PATH = os.path.join(data_dir, "embedding_cache.sqlite3")
+    Config.EMBEDDING_CACHE_ENABLED = embedding_cache
+    Config.ACCESS_TRACKER_PATH = os.path.join(data_dir, "access.sqlite3")
+    os.makedirs(Config.VECTOR_STORE_PATH, exist_ok=True)
+    os.makedirs(Config.TRANSCRIPTS_PATH, exist_ok=True)
+
+    StubYouTubeTranscriptApi.segments_per_video = segments_per_video
+    StubYouTubeTranscriptApi.fetch_delay = fetch_delay
+    StubLLMHandler.delay = llm_delay
+
+    import rag.document_loader
+    import rag.llm_handler
+    rag.document_loader.YouTubeTranscriptSource = StubYouTubeTranscriptApi
+    rag.llm_handler.LLMHandler = StubLLMHandler
+
+    return data_dir
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """
+    Linear-interpolated percentile of a list of values
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100.0
+    lower = int(rank)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+
+def environment_info() -> Dict[str, Any]:
+    """
+    Describe the machine and revision a benchmark ran on
+    """
+    import platform
+    import subprocess
+
+    try:
+        revision = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        revision = "unknown"
+
+    return {
+        'git_revision': revision,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'embedding_model': Config.EMBEDDING_MODEL,
+        'chunk_size': Config.CHUNK_SIZE,
+        'chunk_overlap': Config.CHUNK_OVERLAP,
+        'top_k_chunks': Config.TOP_K_CHUNKS
+    }
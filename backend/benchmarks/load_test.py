@@ -0,0 +1,249 @@
+"""
+End-to-end load test for the YouTube RAG Chatbot API.
+
+Runs the real FastAPI app (real splitter, embedding model and ChromaDB) on a
+local uvicorn server, with YouTubeTranscriptApi and the Gemini LLM replaced by
+offline stubs. Run from the backend directory:
+
+    python -m benchmarks.load_test --videos 20 --concurrency 1,4,16
+"""
+import argparse
+import json
+import os
+import random
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import List, Dict, Any
+
+import requests
+
+from benchmarks.fixtures import (
+    install_stubs,
+    synthetic_video_ids,
+    percentile,
+    environment_info,
+    WORDS,
+)
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+_local = threading.local()
+
+
+def _session() -> requests.Session:
+    """
+    One keep-alive HTTP session per load-generating thread
+    """
+    if not hasattr(_local, "session"):
+        _local.session = requests.Session()
+    return _local.session
+
+
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(port: int):
+    """
+    Start the API on a background uvicorn server and wait until warm-up is done
+    """
+    import uvicorn
+    from app.main import app
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+
+    deadline = time.time() + 60
+    while not server.started:
+        if time.time() > deadline:
+            raise RuntimeError("API server did not start within 60 seconds")
+        time.sleep(0.05)
+
+    wait_until_ready(f"http://127.0.0.1:{port}")
+    return server, thread
+
+
+def wait_until_ready(base_url: str, timeout: float = 300) -> Dict[str, Any]:
+    """
+    Poll /ready until warm-up finishes; returns the readiness report
+    """
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            response = requests.get(f"{base_url}/ready", timeout=5)
+            body = response.json()
+            if response.status_code == 200:
+                return body
+            if body.get('status') == 'failed':
+                raise RuntimeError(f"API warm-up failed: {body.get('error')}")
+        except requests.RequestException:
+            pass
+        time.sleep(0.1)
+    raise RuntimeError(f"API was not ready within {timeout} seconds")
+
+
+def latency_summary(latencies: List[float]) -> Dict[str, float]:
+    """
+    Summarize request latencies in milliseconds
+    """
+    return {
+        'p50_ms': round(percentile(latencies, 50) * 1000, 2),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 2),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 2),
+        'mean_ms': round(sum(latencies) / len(latencies) * 1000, 2) if latencies else 0.0,
+        'max_ms': round(max(latencies) * 1000, 2) if latencies else 0.0
+    }
+
+
+def run_ingestion(base_url: str, video_ids: List[str], concurrency: int) -> Dict[str, Any]:
+    """
+    Ingest every synthetic video through POST /process-video
+    """
+    def ingest(video_id: str) -> Dict[str, Any]:
+        started = time.perf_counter()
+        response = _session().post(
+            f"{base_url}/process-video",
+            json={'youtube_url': f"https://www.youtube.com/watch?v={video_id}"}
+        )
+        elapsed = time.perf_counter() - started
+        body = response.json()
+        stats = body.get('processing_stats') or {}
+        return {
+            'video_id': video_id,
+            'ok': response.status_code == 200,
+            'seconds': elapsed,
+            'chunks': stats.get('total_chunks', 0)
+        }
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(ingest, video_ids))
+    wall = time.perf_counter() - started
+
+    succeeded = [r for r in results if r['ok']]
+    total_chunks = sum(r['chunks'] for r in succeeded)
+
+    return {
+        'videos': len(video_ids),
+        'succeeded': len(succeeded),
+        'failed': len(results) - len(succeeded),
+        'concurrency': concurrency,
+        'wall_seconds': round(wall, 3),
+        'total_chunks': total_chunks,
+        'videos_per_minute': round(len(succeeded) / wall * 60, 2) if wall else 0.0,
+        'chunks_per_second': round(total_chunks / wall, 2) if wall else 0.0,
+        'per_video_latency': latency_summary([r['seconds'] for r in succeeded])
+    }
+
+
+def run_chat(base_url: str, video_ids: List[str], concurrency: int,
+             total_requests: int, seed: int = 0) -> Dict[str, Any]:
+    """
+    Fire total_requests POST /chat calls with the given concurrency
+    """
+    rng = random.Random(seed)
+    payloads = [
+        {
+            'query': " ".join(rng.choice(WORDS) for _ in range(rng.randint(4, 10))) + "?",
+            'video_id': rng.choice(video_ids)
+        }
+        for _ in range(total_requests)
+    ]
+
+    def send(payload: Dict[str, Any]):
+        started = time.perf_counter()
+        response = _session().post(f"{base_url}/chat", json=payload)
+        return response.status_code == 200, time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(send, payloads))
+    wall = time.perf_counter() - started
+
+    latencies = [elapsed for ok, elapsed in results if ok]
+
+    return {
+        'concurrency': concurrency,
+        'requests': total_requests,
+        'errors': total_requests - len(latencies),
+        'wall_seconds': round(wall, 3),
+        'throughput_rps': round(len(latencies) / wall, 2) if wall else 0.0,
+        **latency_summary(latencies)
+    }
+
+
+def main(argv=None) -> Dict[str, Any]:
+    parser = argparse.ArgumentParser(description="Load test ingestion and /chat")
+    parser.add_argument("--videos", type=int, default=10, help="synthetic videos to ingest")
+    parser.add_argument("--segments", type=int, default=400, help="transcript segments per video")
+    parser.add_argument("--ingest-concurrency", type=int, default=2)
+    parser.add_argument("--concurrency", default="1,2,4,8,16",
+                        help="comma-separated /chat concurrency levels")
+    parser.add_argument("--requests", type=int, default=100, help="/chat requests per level")
+    parser.add_argument("--llm-delay", type=float, default=0.0, help="stub LLM latency in seconds")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--data-dir", default=None, help="scratch data directory (default: temp dir)")
+    parser.add_argument("--output", default=None, help="results JSON path")
+    args = parser.parse_args(argv)
+
+    data_dir = install_stubs(args.data_dir, args.segments, args.llm_delay)
+    port = _free_port()
+    base_url = f"http://127.0.0.1:{port}"
+
+    print(f"Starting API on {base_url} (data in {data_dir})")
+    server, thread = start_server(port)
+
+    try:
+        video_ids = synthetic_video_ids(args.videos, args.seed)
+
+        print(f"Ingesting {len(video_ids)} videos...")
+        ingestion = run_ingestion(base_url, video_ids, args.ingest_concurrency)
+        print(f"Ingestion: {ingestion['videos_per_minute']} videos/min, "
+              f"{ingestion['chunks_per_second']} chunks/s")
+
+        chat_levels = []
+        for level in [int(c) for c in args.concurrency.split(",") if c.strip()]:
+            result = run_chat(base_url, video_ids, level, args.requests, args.seed)
+            chat_levels.append(result)
+            print(f"/chat concurrency={level}: p50={result['p50_ms']}ms "
+                  f"p95={result['p95_ms']}ms p99={result['p99_ms']}ms "
+                  f"errors={result['errors']}")
+    finally:
+        server.should_exit = True
+        thread.join(timeout=10)
+
+    report = {
+        'benchmark': 'load_test',
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'environment': environment_info(),
+        'parameters': {
+            'videos': args.videos,
+            'segments_per_video': args.segments,
+            'ingest_concurrency': args.ingest_concurrency,
+            'requests_per_level': args.requests,
+            'llm_delay': args.llm_delay,
+            'seed': args.seed
+        },
+        'ingestion': ingestion,
+        'chat': chat_levels
+    }
+
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"load_test_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {output}")
+
+    return report
+
+
+if __name__ == "__main__":
+    main()
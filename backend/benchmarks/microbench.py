@@ -0,0 +1,210 @@
+"""
+Per-stage microbenchmarks for the rag package with regression thresholds.
+
+Each stage is timed over several synthetic corpus sizes and compared against
+a stored baseline; the run fails when any stage is slower than its baseline
+by more than the allowed margin. Run from the backend directory:
+
+    python -m benchmarks.microbench                    # compare to baseline
+    python -m benchmarks.microbench --update-baseline  # record a new baseline
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Callable, List, Dict, Any
+
+from benchmarks.fixtures import (
+    install_stubs,
+    synthetic_document,
+    synthetic_video_ids,
+    environment_info,
+)
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+STAGES = [
+    "split_text",
+    "generate_embeddings",
+    "embed_chunks",
+    "add_documents",
+    "search_similar",
+    "retrieve_context",
+]
+
+
+def time_call(fn: Callable[[int], Any], repeats: int, warmup: int = 1) -> Dict[str, float]:
+    """
+    Time fn(iteration) repeatedly and summarize wall time in seconds
+    """
+    for i in range(warmup):
+        fn(-1 - i)
+
+    samples = []
+    for i in range(repeats):
+        started = time.perf_counter()
+        fn(i)
+        samples.append(time.perf_counter() - started)
+
+    return {
+        'median_s': statistics.median(samples),
+        'min_s': min(samples),
+        'max_s': max(samples),
+        'repeats': repeats
+    }
+
+
+def run_stages(sizes: List[int], repeats: int, stages: List[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    Benchmark every requested stage at every corpus size (in transcript segments)
+    """
+    from rag.text_splitter import TextSplitter
+    from rag.embedding_model import EmbeddingModel
+    from rag.vector_store import VectorStore
+    from rag.retriever import Retriever
+
+    splitter = TextSplitter()
+    embedding_model = EmbeddingModel()
+    retriever = Retriever(embedding_model) if "retrieve_context" in stages else None
+    query = "How does the embedding cache reduce query latency?"
+    query_embedding = embedding_model.generate_single_embedding(query)
+
+    results = {}
+    for size in sizes:
+        document = synthetic_document(f"bench{size:06d}", segments=size)
+        chunks = splitter.split_text(document['full_text'])
+        texts = [chunk['text'] for chunk in chunks]
+        embedded_chunks = embedding_model.embed_chunks(chunks)
+
+        store = VectorStore(collection_name=f"microbench_{size}")
+        store.clear_collection()
+        for video_id in synthetic_video_ids(4, seed=size):
+            store.add_documents(video_id, embedded_chunks)
+        target_video = synthetic_video_ids(1, seed=size)[0]
+
+        if retriever:
+            retriever.vector_store = store
+
+        def add_documents(i: int):
+            store.add_documents(f"add{size:05d}{i + 100:03d}"[-11:], embedded_chunks)
+
+        benchmarks = {
+            'split_text': lambda i: splitter.split_text(document['full_text']),
+            'generate_embeddings': lambda i: embedding_model.generate_embeddings(texts),
+            'embed_chunks': lambda i: embedding_model.embed_chunks(chunks),
+            'add_documents': add_documents,
+            'search_similar': lambda i: store.search_similar(query_embedding, video_id=target_video),
+            'retrieve_context': lambda i: retriever.retrieve_context(query, target_video),
+        }
+
+        for stage in stages:
+            key = f"{stage}[size={size}]"
+            print(f"Benchmarking {key} ({len(chunks)} chunks)...")
+            results[key] = time_call(benchmarks[stage], repeats)
+            results[key]['chunks'] = len(chunks)
+
+        store.client.delete_collection(store.collection_name)
+
+    return results
+
+
+def compare_to_baseline(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]],
+                        max_regression: float) -> List[Dict[str, Any]]:
+    """
+    Return one row per benchmark with its slowdown relative to the baseline
+    """
+    rows = []
+    for key, current in results.items():
+        reference = baseline.get(key)
+        if not reference:
+            rows.append({'benchmark': key, 'status': 'new', 'current_s': current['median_s']})
+            continue
+
+        ratio = current['median_s'] / reference['median_s'] if reference['median_s'] else 1.0
+        rows.append({
+            'benchmark': key,
+            'status': 'regressed' if ratio > 1 + max_regression else 'ok',
+            'baseline_s': reference['median_s'],
+            'current_s': current['median_s'],
+            'ratio': round(ratio, 3)
+        })
+    return rows
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Per-stage rag microbenchmarks")
+    parser.add_argument("--sizes", default="100,400,1600",
+                        help="comma-separated corpus sizes in transcript segments")
+    parser.add_argument("--stages", default=",".join(STAGES),
+                        help="comma-separated subset of: " + ", ".join(STAGES))
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--max-regression", type=float,
+                        default=float(os.getenv("MICROBENCH_MAX_REGRESSION", "0.25")),
+                        help="allowed slowdown over baseline, e.g. 0.25 for 25%%")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--data-dir", default=None)
+    parser.add_argument("--output", default=None, help="results JSON path")
+    args = parser.parse_args(argv)
+
+    stages = [s.strip() for s in args.stages.split(",") if s.strip()]
+    unknown = set(stages) - set(STAGES)
+    if unknown:
+        parser.error(f"unknown stages: {', '.join(sorted(unknown))}")
+
+    install_stubs(args.data_dir)
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    results = run_stages(sizes, args.repeats, stages)
+
+    if args.update_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump({'environment': environment_info(), 'benchmarks': results}, f, indent=2)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f).get('benchmarks', {})
+    else:
+        print(f"No baseline at {args.baseline}; run with --update-baseline to create one")
+
+    rows = compare_to_baseline(results, baseline, args.max_regression)
+
+    print(f"\n{'benchmark':<40} {'baseline':>10} {'current':>10} {'ratio':>7}  status")
+    for row in rows:
+        baseline_ms = f"{row['baseline_s'] * 1000:.1f}ms" if 'baseline_s' in row else "-"
+        ratio = f"{row['ratio']:.2f}" if 'ratio' in row else "-"
+        print(f"{row['benchmark']:<40} {baseline_ms:>10} {row['current_s'] * 1000:>8.1f}ms "
+              f"{ratio:>7}  {row['status']}")
+
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"microbench_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump({
+            'benchmark': 'microbench',
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'environment': environment_info(),
+            'max_regression': args.max_regression,
+            'benchmarks': results,
+            'comparison': rows
+        }, f, indent=2)
+    print(f"\nResults written to {output}")
+
+    regressions = [row for row in rows if row['status'] == 'regressed']
+    if regressions:
+        print(f"❌ {len(regressions)} stage(s) regressed by more than {args.max_regression:.0%}")
+        return 1
+
+    print("✅ No stage regressed past the allowed margin")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
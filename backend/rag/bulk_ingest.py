@@ -0,0 +1,243 @@
+"""
+Offline bulk ingestion straight into the vector store. Run with the API stopped:
+
+    python -m rag.bulk_ingest videos.txt --workers 4
+
+The input is a file with one YouTube URL, 11-character video ID or transcript path
+per line (blank lines and lines starting with '#' are ignored), or a directory of
+SRT/VTT/transcript JSON files. Transcript files are streamed from disk and each
+maps to a stable video_id. Progress is saved to a state file after every video,
+so re-running the same command skips what is already stored and resumes partly
+processed videos from their split/embed checkpoints.
+"""
+import argparse
+import json
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Dict, Any, Optional
+from rag.ingestion import IngestionPipeline, IngestionWorkerPool, attach_embeddings
+from rag.checkpoint_store import CheckpointStore
+from rag.eviction import AccessTracker, estimate_footprint
+from rag.vector_store import VectorStore
+from rag.transcript_files import iter_transcript_files, transcript_file_info, is_transcript_path
+from utils.youtube_utils import validate_and_clean_url
+from app.config import Config
+
+VIDEO_ID_PATTERN = re.compile(r'^[a-zA-Z0-9_-]{11}$')
+
+
+def read_inputs(path: str) -> List[str]:
+    """
+    URLs and transcript file paths from the input, with bare video IDs expanded to
+    watch URLs, directories expanded to the transcript files under them, and duplicates dropped
+    """
+    if os.path.isdir(path):
+        return list(iter_transcript_files(path))
+
+    inputs = []
+    seen = set()
+    base_directory = os.path.dirname(os.path.abspath(path))
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            entry = line.strip()
+            if not entry or entry.startswith('#'):
+                continue
+            local_path = os.path.join(base_directory, entry)
+            if is_transcript_path(local_path):
+                entries = list(iter_transcript_files(local_path))
+            elif VIDEO_ID_PATTERN.match(entry):
+                entries = [f"https://www.youtube.com/watch?v={entry}"]
+            else:
+                entries = [entry]
+            for entry in entries:
+                if entry not in seen:
+                    seen.add(entry)
+                    inputs.append(entry)
+    return inputs
+
+
+def resolve_input(entry: str) -> Dict[str, Any]:
+    if is_transcript_path(entry):
+        return transcript_file_info(entry)
+    return validate_and_clean_url(entry)
+
+
+class BulkIngestState:
+    """
+    Per-video outcome of a bulk run, rewritten atomically after every video
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self.videos: Dict[str, Dict[str, Any]] = {}
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                self.videos = json.load(f).get('videos', {})
+
+    def is_stored(self, video_id: str) -> bool:
+        return self.videos.get(video_id, {}).get('status') == 'stored'
+
+    def record(self, video_id: str, result: Dict[str, Any]):
+        self.videos[video_id] = {**result, 'updated_at': time.time()}
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'videos': self.videos}, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+
+class BulkIngestor:
+    """
+    Fetch, split and embed videos in parallel and write them directly to the vector store
+    """
+    def __init__(self, workers: int = 1, vector_store: VectorStore = None,
+                 checkpoint_store: CheckpointStore = None, access_tracker: AccessTracker = None):
+        self.workers = max(1, workers)
+        self.vector_store = vector_store or VectorStore()
+        self.checkpoint_store = checkpoint_store or CheckpointStore()
+        self.access_tracker = access_tracker or AccessTracker()
+        self.model_name = self.vector_store.model_name
+
+        # Worker processes keep CPU-bound embedding off a shared GIL; one worker stays in-process
+        self.pool: Optional[IngestionWorkerPool] = None
+        self.pipeline: Optional[IngestionPipeline] = None
+        if self.workers > 1:
+            self.pool = IngestionWorkerPool(workers=self.workers, model_name=self.model_name)
+        else:
+            from rag.embedding_model import EmbeddingModel
+            self.pipeline = IngestionPipeline(embedding_model=EmbeddingModel(self.model_name),
+                                              checkpoint_store=self.checkpoint_store)
+
+    def _prepare(self, url_info: Dict[str, Any]) -> Dict[str, Any]:
+        if self.pool:
+            return self.pool.prepare(url_info, self.model_name)
+        return self.pipeline.prepare(url_info)
+
+    def _ingest(self, url_info: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Run one video through the pipeline and store it; returns a result row
+        """
+        video_id = url_info['video_id']
+        started = time.perf_counter()
+        try:
+            prepared = self._prepare(url_info)
+            chunks = prepared['chunks']
+            if not self.vector_store.add_documents(video_id, attach_embeddings(chunks, prepared['embeddings']),
+                                                   prepared['embedding_model']):
+                raise Exception("Failed to store video data")
+
+            self.checkpoint_store.mark_stored(video_id, self.vector_store.collection_name)
+            footprint = estimate_footprint(
+                chunks,
+                prepared['embeddings'].shape[1],
+                checkpoint_bytes=self.checkpoint_store.video_bytes(video_id)
+            )
+            self.access_tracker.record_video(video_id, **footprint)
+            return {
+                'status': 'stored',
+                'chunks': len(chunks),
+                'seconds': round(time.perf_counter() - started, 3),
+                'resumed_stages': prepared['resumed_stages']
+            }
+        except Exception as e:
+            return {'status': 'failed', 'error': str(e), 'seconds': round(time.perf_counter() - started, 3)}
+
+    def run(self, urls: List[str], state: BulkIngestState) -> Dict[str, Any]:
+        """
+        Ingest every URL or transcript file not already stored, recording each outcome as it finishes
+        """
+        started = time.perf_counter()
+        results: Dict[str, Dict[str, Any]] = {}
+        pending = []
+        for url in urls:
+            url_info = resolve_input(url)
+            if not url_info['valid']:
+                results[url] = {'status': 'invalid', 'error': url_info['error']}
+                continue
+            video_id = url_info['video_id']
+            if state.is_stored(video_id) or self.vector_store.video_exists(video_id):
+                results[video_id] = {'status': 'skipped', 'chunks': state.videos.get(video_id, {}).get('chunks')}
+                continue
+            pending.append(url_info)
+
+        print(f"🚚 Ingesting {len(pending)} videos with {self.workers} workers "
+              f"({len(urls) - len(pending)} skipped or invalid)")
+        done = 0
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = {executor.submit(self._ingest, url_info): url_info['video_id'] for url_info in pending}
+            for future in as_completed(futures):
+                video_id = futures[future]
+                result = future.result()
+                results[video_id] = result
+                state.record(video_id, result)
+                done += 1
+                marker = "✅" if result['status'] == 'stored' else "❌"
+                print(f"{marker} [{done}/{len(pending)}] {video_id} {result['status']} in {result['seconds']}s")
+
+        self.access_tracker.flush()
+        elapsed = time.perf_counter() - started
+        stored = [r for r in results.values() if r['status'] == 'stored']
+        chunks = sum(r['chunks'] for r in stored)
+        return {
+            'videos': results,
+            'stored': len(stored),
+            'failed': sum(1 for r in results.values() if r['status'] in ('failed', 'invalid')),
+            'skipped': sum(1 for r in results.values() if r['status'] == 'skipped'),
+            'elapsed_seconds': round(elapsed, 3),
+            'videos_per_minute': round(len(stored) * 60 / elapsed, 2) if elapsed else 0.0,
+            'chunks_per_second': round(chunks / elapsed, 1) if elapsed else 0.0
+        }
+
+    def shutdown(self):
+        if self.pool:
+            self.pool.shutdown()
+
+
+def format_table(results: Dict[str, Dict[str, Any]]) -> str:
+    """
+    Per-video results as a fixed-width text table
+    """
+    lines = [f"{'video':<44} {'status':<8} {'chunks':>7} {'seconds':>8}  error"]
+    for video_id, result in results.items():
+        chunks = result.get('chunks')
+        seconds = result.get('seconds')
+        lines.append(
+            f"{video_id:<44} {result['status']:<8} "
+            f"{'' if chunks is None else chunks:>7} {'' if seconds is None else seconds:>8}  "
+            f"{result.get('error', '')}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Bulk-ingest YouTube videos (run with the API stopped)")
+    parser.add_argument("input", help="file with one YouTube URL, video ID or transcript path per line, "
+                                      "or a directory of SRT/VTT/JSON transcripts")
+    parser.add_argument("--workers", type=int, default=max(1, Config.INGESTION_WORKERS))
+    parser.add_argument("--state", default=None, help="progress file (default: <input>.state.json)")
+    parser.add_argument("--output", default=None, help="write the JSON report here")
+    args = parser.parse_args(argv)
+
+    Config.ensure_directories()
+    urls = read_inputs(args.input)
+    state = BulkIngestState(args.state or f"{args.input}.state.json")
+
+    ingestor = BulkIngestor(workers=args.workers)
+    try:
+        report = ingestor.run(urls, state)
+    finally:
+        ingestor.shutdown()
+
+    print(format_table(report['videos']))
+    print(f"Stored {report['stored']}, skipped {report['skipped']}, failed {report['failed']} "
+          f"in {report['elapsed_seconds']}s ({report['videos_per_minute']} videos/min, "
+          f"{report['chunks_per_second']} chunks/s)")
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    return 1 if report['failed'] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
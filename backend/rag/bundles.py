@@ -0,0 +1,273 @@
+"""
+Portable per-video index bundles: one compressed .npz per video holding its chunks,
+embeddings, manifest and (optionally) transcript, so another node can load the video
+without fetching or re-embedding anything. Run with the API stopped:
+
+    python -m rag.bundles export VIDEO_ID [VIDEO_ID ...] --out data/bundles
+    python -m rag.bundles export --popular 100 --out data/bundles
+    python -m rag.bundles import data/bundles
+
+A starting API node loads every bundle in WARM_UP_BUNDLES_PATH before it reports ready.
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import time
+from typing import List, Dict, Any, Iterator
+import numpy as np
+from rag.vector_store import VectorStore
+from rag.eviction import estimate_footprint
+from utils.youtube_utils import validate_and_clean_url
+from app.config import Config
+
+BUNDLE_FORMAT_VERSION = 1
+BUNDLE_EXTENSION = ".npz"
+# YouTube IDs, or the content-derived IDs of ingested transcript files (see transcript_files)
+BUNDLE_VIDEO_ID_PATTERN = re.compile(r'^(?:[a-zA-Z0-9_-]{11}|file-[0-9a-f]{16})$')
+
+
+def _json_array(data: Any) -> np.ndarray:
+    return np.frombuffer(json.dumps(data, ensure_ascii=False).encode("utf-8"), dtype=np.uint8)
+
+
+def _json_value(array: np.ndarray) -> Any:
+    return json.loads(array.tobytes().decode("utf-8"))
+
+
+def _checksum(embeddings: np.ndarray) -> str:
+    return hashlib.sha256(np.ascontiguousarray(embeddings).tobytes()).hexdigest()
+
+
+def _url_info(document_data: Dict[str, Any]) -> Dict[str, Any]:
+    url_info = validate_and_clean_url(document_data.get('url') or '')
+    if url_info['valid']:
+        return url_info
+    return {'valid': True, 'video_id': document_data['video_id'], 'original_url': document_data.get('url')}
+
+
+def write_bundle(path: str, video_id: str, chunks: List[Dict[str, Any]], embeddings: np.ndarray,
+                 embedding_model: str, document_data: Dict[str, Any] = None, float16: bool = False):
+    """
+    Write one video's bundle. Texts are stored as a single UTF-8 buffer with offsets, so
+    loading needs no pickle. float16 halves the embedding size at a small precision cost.
+    """
+    embeddings = np.asarray(embeddings, dtype=np.float16 if float16 else np.float32)
+    encoded = [chunk['text'].encode("utf-8") for chunk in chunks]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(text) for text in encoded])
+
+    manifest = {
+        'format_version': BUNDLE_FORMAT_VERSION,
+        'video_id': video_id,
+        'embedding_model': embedding_model,
+        'embedding_dimension': int(embeddings.shape[1]) if embeddings.ndim == 2 else 0,
+        'embedding_dtype': str(embeddings.dtype),
+        'embedding_sha256': _checksum(embeddings),
+        'chunk_count': len(chunks),
+        'has_transcript': document_data is not None,
+        'url_info': _url_info(document_data) if document_data else None,
+        'exported_at': time.time()
+    }
+    arrays = {
+        'manifest': _json_array(manifest),
+        'embeddings': embeddings,
+        'chunk_ids': np.asarray([chunk['id'] for chunk in chunks], dtype=np.int32),
+        'chunk_lengths': np.asarray([chunk['length'] for chunk in chunks], dtype=np.int32),
+        'texts': np.frombuffer(b"".join(encoded), dtype=np.uint8),
+        'text_offsets': offsets
+    }
+    if document_data is not None:
+        arrays['transcript'] = _json_array(document_data)
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'wb') as f:
+        np.savez_compressed(f, **arrays)
+    os.replace(tmp_path, path)
+
+
+def read_bundle(path: str) -> Dict[str, Any]:
+    """
+    Load and verify a bundle; embeddings come back as float32
+    """
+    with np.load(path, allow_pickle=False) as data:
+        manifest = _json_value(data['manifest'])
+        if manifest.get('format_version') != BUNDLE_FORMAT_VERSION:
+            raise ValueError(f"Unsupported bundle format {manifest.get('format_version')}")
+
+        embeddings = data['embeddings']
+        if _checksum(embeddings) != manifest['embedding_sha256']:
+            raise ValueError("Embedding checksum mismatch")
+
+        texts = data['texts'].tobytes()
+        offsets = data['text_offsets']
+        chunks = [
+            {
+                'id': int(chunk_id),
+                'text': texts[offsets[i]:offsets[i + 1]].decode("utf-8"),
+                'length': int(length)
+            }
+            for i, (chunk_id, length) in enumerate(zip(data['chunk_ids'], data['chunk_lengths']))
+        ]
+        document_data = _json_value(data['transcript']) if 'transcript' in data.files else None
+
+    return {
+        'manifest': manifest,
+        'chunks': chunks,
+        'embeddings': embeddings.astype(np.float32),
+        'document_data': document_data
+    }
+
+
+def bundle_path(directory: str, video_id: str) -> str:
+    return os.path.join(directory, f"{video_id}{BUNDLE_EXTENSION}")
+
+
+def iter_bundle_paths(paths: List[str]) -> Iterator[str]:
+    """
+    Bundle files named directly or found in the given directories
+    """
+    for path in paths:
+        if os.path.isdir(path):
+            for name in sorted(os.listdir(path)):
+                if name.endswith(BUNDLE_EXTENSION):
+                    yield os.path.join(path, name)
+        else:
+            yield path
+
+
+def export_videos(vector_store: VectorStore, video_ids: List[str], directory: str = None,
+                  document_loader=None, float16: bool = False) -> Dict[str, Any]:
+    """
+    Export each video's stored chunks and embeddings, plus its cached transcript when available
+    """
+    directory = directory or Config.BUNDLES_PATH
+    summary = {'exported': [], 'missing': [], 'bytes': 0}
+    for video_id in video_ids:
+        exported = vector_store.export_video(video_id)
+        if exported is None:
+            summary['missing'].append(video_id)
+            continue
+        document_data = document_loader.get_cached_transcript(video_id) if document_loader else None
+        path = bundle_path(directory, video_id)
+        write_bundle(path, video_id, exported['chunks'], exported['embeddings'],
+                     exported['embedding_model'], document_data, float16)
+        summary['exported'].append(video_id)
+        summary['bytes'] += os.path.getsize(path)
+    print(f"📦 Exported {len(summary['exported'])} video bundles to {directory}")
+    return summary
+
+
+def import_bundles(vector_store: VectorStore, paths: List[str], document_loader=None,
+                   access_tracker=None, batch_videos: int = 50) -> Dict[str, Any]:
+    """
+    Bulk-load bundles into the active collection without re-embedding. Bundles made with
+    a different embedding model, that fail verification or that cannot be written are skipped.
+    The summary also carries each bundled transcript, for videos loaded or already present.
+    """
+    started = time.perf_counter()
+    summary = {'loaded': [], 'already_present': [], 'skipped': {}, 'chunks': 0, 'documents': {}}
+    pending: Dict[str, Any] = {}
+
+    def flush():
+        videos = {video_id: (bundle['chunks'], bundle['embeddings']) for video_id, (_, bundle) in pending.items()}
+        try:
+            added = set(vector_store.add_videos(videos, vector_store.model_name))
+        except Exception as e:
+            for path, _ in pending.values():
+                summary['skipped'][path] = f"Failed to store: {str(e)}"
+            pending.clear()
+            return
+        for video_id, (_, bundle) in pending.items():
+            document_data = bundle['document_data']
+            if document_data is not None:
+                summary['documents'][video_id] = {'document_data': document_data,
+                                                  'url_info': bundle['manifest']['url_info'],
+                                                  'chunk_count': len(bundle['chunks'])}
+            if video_id not in added:
+                summary['already_present'].append(video_id)
+                continue
+            summary['loaded'].append(video_id)
+            summary['chunks'] += len(bundle['chunks'])
+            if document_data is not None and document_loader:
+                document_loader.cache_transcript(document_data)
+            if access_tracker:
+                footprint = estimate_footprint(
+                    bundle['chunks'],
+                    bundle['embeddings'].shape[1],
+                    cached_text_chars=len(document_data['full_text']) if document_data else 0
+                )
+                access_tracker.record_video(video_id, **footprint)
+        pending.clear()
+
+    for path in iter_bundle_paths(paths):
+        try:
+            bundle = read_bundle(path)
+        except Exception as e:
+            summary['skipped'][path] = str(e)
+            continue
+        manifest = bundle['manifest']
+        video_id = manifest.get('video_id')
+        document_data = bundle['document_data']
+        # The ID names files on this node (cached transcripts), so only accept well-formed ones
+        if not isinstance(video_id, str) or not BUNDLE_VIDEO_ID_PATTERN.match(video_id):
+            summary['skipped'][path] = f"Invalid video ID {video_id!r}"
+            continue
+        if document_data is not None and document_data.get('video_id') != video_id:
+            summary['skipped'][path] = (f"Transcript is for video {document_data.get('video_id')!r}, "
+                                        f"bundle is for {video_id}")
+            continue
+        if manifest['embedding_model'] != vector_store.model_name:
+            summary['skipped'][path] = (f"Embedded with {manifest['embedding_model']}, "
+                                        f"collection uses {vector_store.model_name}")
+            continue
+        pending[video_id] = (path, bundle)
+        if len(pending) >= batch_videos:
+            flush()
+    flush()
+
+    summary['seconds'] = round(time.perf_counter() - started, 3)
+    print(f"📥 Loaded {len(summary['loaded'])} videos ({summary['chunks']} chunks) from bundles "
+          f"in {summary['seconds']}s")
+    return summary
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Export or import per-video index bundles (run with the API stopped)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    export = subparsers.add_parser("export", help="write bundles for stored videos")
+    export.add_argument("video_ids", nargs="*")
+    export.add_argument("--popular", type=int, default=0, help="export the N most read videos")
+    export.add_argument("--out", default=Config.BUNDLES_PATH)
+    export.add_argument("--float16", action="store_true", help="store embeddings at half precision")
+    load = subparsers.add_parser("import", help="bulk-load bundles into the active collection")
+    load.add_argument("paths", nargs="+", help="bundle files or directories of bundles")
+    args = parser.parse_args(argv)
+
+    Config.ensure_directories()
+    from rag.document_loader import DocumentLoader
+    from rag.eviction import AccessTracker
+    vector_store = VectorStore()
+    document_loader = DocumentLoader()
+    access_tracker = AccessTracker()
+
+    if args.command == "export":
+        video_ids = list(args.video_ids)
+        if args.popular:
+            video_ids += [v for v in access_tracker.most_used(args.popular) if v not in video_ids]
+        if not video_ids:
+            parser.error("give video IDs or --popular N")
+        summary = export_videos(vector_store, video_ids, args.out, document_loader, args.float16)
+    else:
+        summary = import_bundles(vector_store, args.paths, document_loader, access_tracker)
+        access_tracker.flush()
+        summary.pop('documents')
+
+    print(json.dumps(summary, indent=2))
+    return 1 if summary.get('missing') or summary.get('skipped') else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
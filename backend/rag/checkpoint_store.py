@@ -0,0 +1,157 @@
+import json
+import os
+import shutil
+import time
+from typing import List, Dict, Any, Optional
+import numpy as np
+from app.config import Config
+
+# Ingestion stages in completion order
+STAGES = ['split', 'embedded', 'stored']
+
+
+class CheckpointStore:
+    """
+    Per-video ingestion checkpoints: chunk list, embeddings (.npy) and store commit status
+    """
+    def __init__(self, base_path: str = None):
+        self.base_path = base_path or Config.CHECKPOINTS_PATH
+        os.makedirs(self.base_path, exist_ok=True)
+
+    def _video_dir(self, video_id: str) -> str:
+        return os.path.join(self.base_path, video_id)
+
+    def _path(self, video_id: str, name: str) -> str:
+        return os.path.join(self._video_dir(video_id), name)
+
+    def _write_json(self, path: str, data: Any):
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def _read_json(self, path: str) -> Optional[Any]:
+        if not os.path.exists(path):
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _update_status(self, video_id: str, stage: str, **fields):
+        status = self.get_status(video_id) or {}
+        status.update(fields)
+        status['stage'] = stage
+        status['updated_at'] = time.time()
+        self._write_json(self._path(video_id, "status.json"), status)
+
+    def get_status(self, video_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the checkpoint status for a video, or None if it has none
+        """
+        try:
+            return self._read_json(self._path(video_id, "status.json"))
+        except Exception as e:
+            print(f"Error reading checkpoint status for {video_id}: {str(e)}")
+            return None
+
+    def has_reached(self, video_id: str, stage: str) -> bool:
+        status = self.get_status(video_id)
+        if not status or status.get('stage') not in STAGES:
+            return False
+        return STAGES.index(status['stage']) >= STAGES.index(stage)
+
+    def save_chunks(self, video_id: str, chunks: List[Dict[str, Any]], settings: Dict[str, Any] = None):
+        """
+        Checkpoint the split stage; settings records the splitter configuration used
+        """
+        os.makedirs(self._video_dir(video_id), exist_ok=True)
+        self._write_json(self._path(video_id, "chunks.json"), chunks)
+        self._update_status(video_id, 'split', chunk_count=len(chunks), split_settings=settings)
+
+    def load_chunks(self, video_id: str, settings: Dict[str, Any] = None) -> Optional[List[Dict[str, Any]]]:
+        """
+        Load checkpointed chunks if they were split with the same settings
+        """
+        if not self.has_reached(video_id, 'split'):
+            return None
+        if settings is not None and self.get_status(video_id).get('split_settings') != settings:
+            return None
+        try:
+            return self._read_json(self._path(video_id, "chunks.json"))
+        except Exception as e:
+            print(f"Error loading chunk checkpoint for {video_id}: {str(e)}")
+            return None
+
+    def save_embeddings(self, video_id: str, embeddings: np.ndarray, model_name: str):
+        """
+        Checkpoint the embed stage
+        """
+        path = self._path(video_id, "embeddings.npy")
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'wb') as f:
+            np.save(f, np.asarray(embeddings, dtype=np.float32))
+        os.replace(tmp_path, path)
+        self._update_status(video_id, 'embedded', model_name=model_name,
+                            embedding_shape=list(embeddings.shape))
+
+    def load_embeddings(self, video_id: str, model_name: str) -> Optional[np.ndarray]:
+        """
+        Load checkpointed embeddings if they were produced by model_name
+        """
+        if not self.has_reached(video_id, 'embedded'):
+            return None
+        status = self.get_status(video_id)
+        if status.get('model_name') != model_name:
+            return None
+        try:
+            return np.load(self._path(video_id, "embeddings.npy"))
+        except Exception as e:
+            print(f"Error loading embedding checkpoint for {video_id}: {str(e)}")
+            return None
+
+    def mark_stored(self, video_id: str, collection_name: str):
+        """
+        Record that the video's chunks are committed to the vector store
+        """
+        self._update_status(video_id, 'stored', collection_name=collection_name, evicted=False)
+
+    def mark_unstored(self, video_id: str):
+        """
+        Roll a stored video back to 'embedded', e.g. after its collection was wiped
+        """
+        if self.has_reached(video_id, 'stored'):
+            self._update_status(video_id, 'embedded')
+
+    def mark_evicted(self, video_id: str):
+        """
+        Keep an evicted video's chunks and embeddings so processing it again skips the
+        fetch and embed; reindexing leaves it out until then
+        """
+        if self.has_reached(video_id, 'embedded'):
+            self._update_status(video_id, 'embedded', evicted=True)
+        else:
+            self.delete(video_id)
+
+    def is_evicted(self, video_id: str) -> bool:
+        return bool((self.get_status(video_id) or {}).get('evicted'))
+
+    def list_videos(self) -> List[str]:
+        if not os.path.isdir(self.base_path):
+            return []
+        return sorted(
+            name for name in os.listdir(self.base_path)
+            if os.path.exists(self._path(name, "status.json"))
+        )
+
+    def video_bytes(self, video_id: str) -> int:
+        """
+        Disk space used by a video's checkpoints
+        """
+        total = 0
+        video_dir = self._video_dir(video_id)
+        if os.path.isdir(video_dir):
+            for name in os.listdir(video_dir):
+                total += os.path.getsize(os.path.join(video_dir, name))
+        return total
+
+    def delete(self, video_id: str):
+        shutil.rmtree(self._video_dir(video_id), ignore_errors=True)
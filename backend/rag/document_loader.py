@@ -1,48 +1,78 @@
-from youtube_transcript_api import YouTubeTranscriptApi, TranscriptsDisabled, NoTranscriptFound, VideoUnavailable
+from youtube_transcript_api import TranscriptsDisabled, NoTranscriptFound, VideoUnavailable
 from xml.etree.ElementTree import ParseError
 import json
 import os
+import threading
 from typing import Optional, Dict, Any
 from utils.youtube_utils import extract_video_id
+from utils.metrics import record_cache_lookup
+from rag.transcript_source import YouTubeTranscriptSource, NegativeCache
+from rag.transcript_files import iter_transcript_segments, file_video_id
 from app.config import Config
 
 
+class TranscriptUnavailable(Exception):
+    """
+    A permanent transcript failure whose message is shown to the caller as is
+    """
+
+
 class DocumentLoader:
-    def __init__(self):
+    def __init__(self, transcript_source=None, negative_cache: NegativeCache = None,
+                 fetch_concurrency: int = None):
         self.transcripts_path = Config.TRANSCRIPTS_PATH
+        # Anything with list_transcripts(video_id) works, e.g. an offline stub
+        self.transcript_source = transcript_source or YouTubeTranscriptSource()
+        self.negative_cache = negative_cache or NegativeCache()
+        # Per process: ingestion worker processes each get a share of the configured limit
+        self.fetch_limiter = threading.BoundedSemaphore(fetch_concurrency or Config.TRANSCRIPT_FETCH_CONCURRENCY)
 
     def load_transcript(self, youtube_url: str) -> Dict[str, Any]:
+        video_id = extract_video_id(youtube_url)
         try:
-            video_id = extract_video_id(youtube_url)
             if not video_id:
                 raise ValueError("❌ Invalid YouTube URL")
 
             transcript_file = os.path.join(self.transcripts_path, f"{video_id}.json")
-            if os.path.exists(transcript_file):
+            cached = os.path.exists(transcript_file)
+            record_cache_lookup('transcript', cached)
+            if cached:
                 print(f"📄 Loading cached transcript for video: {video_id}")
                 with open(transcript_file, 'r', encoding='utf-8') as f:
                     return json.load(f)
 
-            print(f"🎬 Fetching transcript for video: {video_id}")
-            transcripts = YouTubeTranscriptApi.list_transcripts(video_id)
+            # Known permanent failures are answered without calling YouTube again
+            failure = self.negative_cache.get(video_id)
+            record_cache_lookup('transcript_negative', failure is not None)
+            if failure:
+                print(f"🚫 Cached transcript failure for video: {video_id}")
+                raise TranscriptUnavailable(failure)
+
+            with self.fetch_limiter:
+                print(f"🎬 Fetching transcript for video: {video_id}")
+                transcripts = self.transcript_source.list_transcripts(video_id)
 
-            try:
-                transcript = transcripts.find_manually_created_transcript(['en'])
-                print("✅ Using manually created English transcript.")
-            except NoTranscriptFound:
                 try:
-                    transcript = transcripts.find_generated_transcript(['en'])
-                    print("⚠️ Using auto-generated English transcript.")
+                    transcript = transcripts.find_manually_created_transcript(['en'])
+                    print("✅ Using manually created English transcript.")
                 except NoTranscriptFound:
-                    raise Exception("❌ No transcript available in English.")
+                    try:
+                        transcript = transcripts.find_generated_transcript(['en'])
+                        print("⚠️ Using auto-generated English transcript.")
+                    except NoTranscriptFound:
+                        self.negative_cache.put(video_id, "❌ No transcript available in English.")
+                        raise TranscriptUnavailable("❌ No transcript available in English.")
 
-            # ✅ SAFE FETCH WITH PARSE HANDLING
-            try:
-                transcript_list = transcript.fetch()
-                if not transcript_list or len(transcript_list) == 0:
-                    raise Exception("❌ Transcript fetch succeeded but returned empty. Possibly a YouTube error.")
-            except ParseError as pe:
-                raise Exception(f"❌ XML Parse Error while processing transcript: {str(pe)}")
+                # ✅ SAFE FETCH WITH PARSE HANDLING
+                try:
+                    transcript_list = transcript.fetch()
+                    if hasattr(transcript_list, 'to_raw_data'):
+                        # youtube-transcript-api >= 1.0 returns snippet objects
+                        transcript_list = transcript_list.to_raw_data()
+                    if not transcript_list or len(transcript_list) == 0:
+                        raise Exception("❌ Transcript fetch succeeded but returned empty. Possibly a YouTube error.")
+                except ParseError as pe:
+                    raise Exception(f"❌ XML Parse Error while processing transcript: {str(pe)}")
 
             full_text = ""
             timestamps = []
@@ -70,17 +100,73 @@ class DocumentLoader:
             return document_data
 
         except VideoUnavailable:
+            self.negative_cache.put(video_id, "❌ Video is unavailable.")
             raise Exception("❌ Video is unavailable.")
         except TranscriptsDisabled:
+            self.negative_cache.put(video_id, "❌ Transcripts are disabled for this video.")
             raise Exception("❌ Transcripts are disabled for this video.")
         except NoTranscriptFound:
+            self.negative_cache.put(video_id, "❌ No transcript found.")
             raise Exception("❌ No transcript found.")
         except ParseError as pe:
             raise Exception(f"❌ XML Parse Error while processing transcript: {str(pe)}")
+        except TranscriptUnavailable:
+            # Same message on a negative-cache hit as on the failure that was cached
+            raise
         except Exception as e:
             print(f"❌ General error: {str(e)}")
             raise Exception(f"Failed to load transcript: {str(e)}")
 
+    def load_transcript_file(self, path: str, video_id: str = None) -> Dict[str, Any]:
+        """
+        Load a local SRT, VTT or transcript JSON file, streaming its segments, and cache it
+        like a fetched transcript under its stable video_id
+        """
+        try:
+            video_id = video_id or file_video_id(path)
+            transcript_file = os.path.join(self.transcripts_path, f"{video_id}.json")
+            cached = os.path.exists(transcript_file) and os.path.abspath(transcript_file) != os.path.abspath(path)
+            record_cache_lookup('transcript', cached)
+            if cached:
+                print(f"📄 Loading cached transcript for video: {video_id}")
+                with open(transcript_file, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+
+            print(f"📂 Reading transcript file: {path}")
+            texts = []
+            timestamps = []
+            for segment in iter_transcript_segments(path):
+                texts.append(segment['text'])
+                timestamps.append(segment)
+            if not timestamps:
+                raise Exception("❌ Transcript file contains no captions.")
+
+            document_data = {
+                'video_id': video_id,
+                'url': path,
+                'full_text': " ".join(texts).strip(),
+                'timestamps': timestamps,
+                'total_segments': len(timestamps)
+            }
+
+            with open(transcript_file, 'w', encoding='utf-8') as f:
+                json.dump(document_data, f, indent=2, ensure_ascii=False)
+
+            print(f"✅ Transcript file loaded. Total segments: {len(timestamps)}")
+            return document_data
+
+        except Exception as e:
+            print(f"❌ Error reading transcript file: {str(e)}")
+            raise Exception(f"Failed to load transcript file: {str(e)}")
+
+    def cache_transcript(self, document_data: Dict[str, Any]):
+        """
+        Store document data obtained elsewhere (e.g. an index bundle) as the cached transcript
+        """
+        transcript_file = os.path.join(self.transcripts_path, f"{document_data['video_id']}.json")
+        with open(transcript_file, 'w', encoding='utf-8') as f:
+            json.dump(document_data, f, indent=2, ensure_ascii=False)
+
     def get_cached_transcript(self, video_id: str) -> Optional[Dict[str, Any]]:
         transcript_file = os.path.join(self.transcripts_path, f"{video_id}.json")
         if os.path.exists(transcript_file):
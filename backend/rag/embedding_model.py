@@ -1,19 +1,45 @@
-from sentence_transformers import SentenceTransformer
 import numpy as np
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple
+from rag.query_batcher import QueryBatcher
+from rag.embedding_cache import EmbeddingCache
+from utils.metrics import record_cache_lookup
 from app.config import Config
 
 class EmbeddingModel:
-    def __init__(self, model_name: str = None):
+    def __init__(self, model_name: str = None, server_address: str = None):
         self.model_name = model_name or Config.EMBEDDING_MODEL
+        self.server_address = server_address or Config.EMBEDDING_SERVER_ADDRESS
+        self.model = None
+        self.client = None
+        self._info = None
+        self.query_batcher = QueryBatcher(self._encode) if Config.QUERY_BATCHING_ENABLED else None
+        self.embedding_cache = EmbeddingCache() if Config.EMBEDDING_CACHE_ENABLED else None
+        
+        if self.server_address:
+            # Delegate encoding to the shared embedding server
+            from rag.embedding_server import EmbeddingClient
+            self.client = EmbeddingClient(self.server_address)
+            print(f"Using embedding server at {self.server_address}")
+            return
+        
         print(f"Loading embedding model: {self.model_name}")
         try:
+            # Imported here: torch and transformers dominate startup and are not needed in client mode
+            from sentence_transformers import SentenceTransformer
             self.model = SentenceTransformer(self.model_name)
             print("Embedding model loaded successfully")
         except Exception as e:
             print(f"Error loading embedding model: {str(e)}")
             raise Exception(f"Failed to load embedding model: {str(e)}")
     
+    def _encode(self, texts: List[str], show_progress_bar: bool = False) -> np.ndarray:
+        """
+        Encode texts locally or through the embedding server
+        """
+        if self.client:
+            return self.client.encode(texts, self.model_name)
+        return self.model.encode(texts, show_progress_bar=show_progress_bar)
+    
     def generate_embeddings(self, texts: List[str]) -> List[List[float]]:
         """
         Generate embeddings for a list of texts
@@ -22,7 +48,7 @@ class EmbeddingModel:
             print(f"Generating embeddings for {len(texts)} texts...")
             
             # Generate embeddings
-            embeddings = self.model.encode(texts, show_progress_bar=True)
+            embeddings = self._encode(texts, show_progress_bar=True)
             
             # Convert to list of lists
             embeddings_list = [embedding.tolist() for embedding in embeddings]
@@ -34,12 +60,58 @@ class EmbeddingModel:
             print(f"Error generating embeddings: {str(e)}")
             raise Exception(f"Failed to generate embeddings: {str(e)}")
     
+    def generate_embedding_array(self, texts: List[str]) -> np.ndarray:
+        """
+        Generate embeddings for a list of texts as one float32 array
+        """
+        try:
+            return np.asarray(self._encode(texts), dtype=np.float32)
+        except Exception as e:
+            print(f"Error generating embeddings: {str(e)}")
+            raise Exception(f"Failed to generate embeddings: {str(e)}")
+    
+    def generate_embeddings_cached(self, texts: List[str]) -> Tuple[np.ndarray, Dict[str, Any]]:
+        """
+        Generate embeddings through the content-addressed cache; only misses reach the model
+        """
+        if not self.embedding_cache or not texts:
+            return self.generate_embedding_array(texts), {'hits': 0, 'misses': len(texts), 'hit_ratio': 0.0}
+        
+        cached = self.embedding_cache.get_many(self.model_name, texts)
+        
+        # Encode each distinct missing text once, even if it repeats within the batch
+        missing_texts = list(dict.fromkeys(text for i, text in enumerate(texts) if i not in cached))
+        computed = {}
+        if missing_texts:
+            missing_embeddings = self.generate_embedding_array(missing_texts)
+            self.embedding_cache.put_many(self.model_name, missing_texts, missing_embeddings)
+            computed = dict(zip(missing_texts, missing_embeddings))
+        
+        embeddings = np.stack([
+            cached[i] if i in cached else computed[text]
+            for i, text in enumerate(texts)
+        ]).astype(np.float32, copy=False)
+        
+        hits = len(cached)
+        record_cache_lookup('embedding', True, hits)
+        record_cache_lookup('embedding', False, len(texts) - hits)
+        stats = {
+            'hits': hits,
+            'misses': len(texts) - hits,
+            'encoded': len(missing_texts),
+            'hit_ratio': round(hits / len(texts), 4)
+        }
+        print(f"Embedding cache: {hits}/{len(texts)} hits")
+        return embeddings, stats
+    
     def generate_single_embedding(self, text: str) -> List[float]:
         """
         Generate embedding for a single text
         """
         try:
-            embedding = self.model.encode([text])
+            if self.query_batcher:
+                return self.query_batcher.encode(text).tolist()
+            embedding = self._encode([text])
             return embedding[0].tolist()
         except Exception as e:
             print(f"Error generating single embedding: {str(e)}")
@@ -53,8 +125,9 @@ class EmbeddingModel:
             # Extract texts from chunks
             texts = [chunk['text'] for chunk in chunks]
             
-            # Generate embeddings
-            embeddings = self.generate_embeddings(texts)
+            # Generate embeddings, reusing cached ones
+            embeddings, _ = self.generate_embeddings_cached(texts)
+            embeddings = embeddings.tolist()
             
             # Add embeddings to chunks
             embedded_chunks = []
@@ -119,19 +192,37 @@ class EmbeddingModel:
             print(f"Error finding similar chunks: {str(e)}")
             return []
     
+    def close(self):
+        """
+        Stop the query batcher thread, which otherwise keeps this model alive
+        """
+        if self.query_batcher:
+            self.query_batcher.close()
+    
+    def get_batching_stats(self) -> Dict[str, Any]:
+        """
+        Get query micro-batching statistics
+        """
+        if not self.query_batcher:
+            return {'enabled': False}
+        return {'enabled': True, **self.query_batcher.get_stats()}
+    
     def get_model_info(self) -> Dict[str, Any]:
         """
         Get information about the embedding model
         """
         try:
-            # Get a sample embedding to determine dimensions
-            sample_embedding = self.generate_single_embedding("test")
-            
-            return {
-                'model_name': self.model_name,
-                'embedding_dimension': len(sample_embedding),
-                'max_sequence_length': self.model.max_seq_length if hasattr(self.model, 'max_seq_length') else 'Unknown'
-            }
+            # Static for the model's lifetime, so look it up once and never encode for it
+            if self._info is None:
+                if self.client:
+                    self._info = self.client.info(self.model_name)
+                else:
+                    self._info = {
+                        'model_name': self.model_name,
+                        'embedding_dimension': self.model.get_sentence_embedding_dimension(),
+                        'max_sequence_length': self.model.max_seq_length if hasattr(self.model, 'max_seq_length') else 'Unknown'
+                    }
+            return dict(self._info)
         except Exception as e:
             print(f"Error getting model info: {str(e)}")
             return {'model_name': self.model_name, 'error': str(e)}
\ No newline at end of file
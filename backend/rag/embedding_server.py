@@ -0,0 +1,199 @@
+"""
+Shared embedding service.
+
+One process owns the SentenceTransformer model and serves encode requests to
+every API worker over a local socket, so model memory per node stays constant
+however many uvicorn workers run. Start it from the backend directory:
+
+    python -m rag.embedding_server --address data/embedding.sock
+
+and point the API workers at it with EMBEDDING_SERVER_ADDRESS.
+
+Messages are JSON, and embeddings travel as raw float32 bytes, so nothing received
+is ever unpickled. A TCP address needs EMBEDDING_SERVER_AUTHKEY; a Unix socket is
+only reachable by the owning user and may run without it.
+"""
+import argparse
+import json
+import os
+import threading
+from multiprocessing.connection import Listener, Client
+from typing import List, Dict, Any, Optional, Union, Tuple
+import numpy as np
+from app.config import Config
+
+
+def parse_address(address: str) -> Union[str, Tuple[str, int]]:
+    """
+    Turn "host:port" into a TCP address and anything else into a Unix socket path
+    """
+    host, sep, port = address.rpartition(":")
+    if sep and port.isdigit():
+        return (host or "127.0.0.1", int(port))
+    return address
+
+
+def _authkey(address: Union[str, Tuple[str, int]], authkey: str = None) -> Optional[bytes]:
+    """
+    Handshake key for an address; TCP without a key is refused
+    """
+    authkey = authkey or Config.EMBEDDING_SERVER_AUTHKEY
+    if not authkey and not isinstance(address, str):
+        raise ValueError("EMBEDDING_SERVER_AUTHKEY must be set to use a TCP embedding server address")
+    return authkey.encode() if authkey else None
+
+
+def _send_json(conn, message: Dict[str, Any]):
+    conn.send_bytes(json.dumps(message).encode("utf-8"))
+
+
+def _recv_json(conn) -> Dict[str, Any]:
+    return json.loads(conn.recv_bytes().decode("utf-8"))
+
+
+class EmbeddingServer:
+    def __init__(self, address: str = None, model_name: str = None, authkey: str = None):
+        self.address = parse_address(address or Config.EMBEDDING_SERVER_ADDRESS)
+        self.authkey = _authkey(self.address, authkey)
+        self.model_name = model_name or Config.EMBEDDING_MODEL
+
+        self._models = {}
+        self._models_lock = threading.Lock()
+        self.model = self._get_model(self.model_name)
+
+    def _get_model(self, model_name: str = None):
+        """
+        The default model, or another one loaded on first request (e.g. during an embedding migration)
+        """
+        model_name = model_name or self.model_name
+        with self._models_lock:
+            if model_name not in self._models:
+                from sentence_transformers import SentenceTransformer
+                print(f"Loading embedding model: {model_name}")
+                self._models[model_name] = SentenceTransformer(model_name)
+            return self._models[model_name]
+
+    def _info(self, model_name: str = None) -> Dict[str, Any]:
+        model = self._get_model(model_name)
+        return {
+            'model_name': model_name or self.model_name,
+            'embedding_dimension': model.get_sentence_embedding_dimension(),
+            'max_sequence_length': getattr(model, 'max_seq_length', 'Unknown'),
+            'served_by': 'embedding_server',
+            'server_pid': os.getpid()
+        }
+
+    def serve_forever(self):
+        """
+        Accept worker connections and serve each on its own thread
+        """
+        previous_umask = None
+        if isinstance(self.address, str):
+            os.makedirs(os.path.dirname(self.address) or ".", exist_ok=True)
+            if os.path.exists(self.address):
+                os.remove(self.address)
+            # Create the socket owner-only from the start rather than chmod-ing it afterwards
+            previous_umask = os.umask(0o177)
+
+        try:
+            listener = Listener(self.address, authkey=self.authkey)
+        finally:
+            if previous_umask is not None:
+                os.umask(previous_umask)
+
+        with listener:
+            print(f"Embedding server listening on {self.address}")
+            while True:
+                try:
+                    conn = listener.accept()
+                except Exception as e:
+                    print(f"Rejected embedding client: {str(e)}")
+                    continue
+                threading.Thread(target=self._handle, args=(conn,), daemon=True).start()
+
+    def _handle(self, conn):
+        with conn:
+            while True:
+                try:
+                    request = _recv_json(conn)
+                except (EOFError, OSError):
+                    return
+                except ValueError:
+                    print("Dropping embedding client that sent a malformed request")
+                    return
+
+                try:
+                    command = request.get('command')
+                    if command == 'encode':
+                        model = self._get_model(request.get('model'))
+                        texts = [str(text) for text in request['texts']]
+                        embeddings = np.ascontiguousarray(
+                            model.encode(texts, convert_to_numpy=True), dtype=np.float32
+                        )
+                        # Header then the raw matrix
+                        _send_json(conn, {'status': 'ok', 'shape': list(embeddings.shape)})
+                        conn.send_bytes(embeddings.tobytes())
+                    elif command == 'info':
+                        _send_json(conn, {'status': 'ok', 'result': self._info(request.get('model'))})
+                    else:
+                        _send_json(conn, {'status': 'error', 'error': f"Unknown command: {command}"})
+                except Exception as e:
+                    print(f"Error serving embedding request: {str(e)}")
+                    _send_json(conn, {'status': 'error', 'error': str(e)})
+
+
+class EmbeddingClient:
+    """
+    Client for EmbeddingServer; keeps one connection per calling thread
+    """
+    def __init__(self, address: str = None, authkey: str = None):
+        self.address = parse_address(address or Config.EMBEDDING_SERVER_ADDRESS)
+        self.authkey = _authkey(self.address, authkey)
+        self._local = threading.local()
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = Client(self.address, authkey=self.authkey)
+            self._local.conn = conn
+        return conn
+
+    def _request(self, request: Dict[str, Any]) -> Any:
+        for attempt in range(2):
+            try:
+                conn = self._connection()
+                _send_json(conn, request)
+                response = _recv_json(conn)
+                if response.get('status') == 'ok' and request['command'] == 'encode':
+                    shape = tuple(response['shape'])
+                    response['result'] = np.frombuffer(conn.recv_bytes(), dtype=np.float32).reshape(shape).copy()
+                break
+            except (EOFError, OSError, ConnectionError):
+                # Server restarted or connection dropped; reconnect once
+                self._local.conn = None
+                if attempt:
+                    raise
+
+        if response.get('status') != 'ok':
+            raise Exception(f"Embedding server error: {response.get('error')}")
+        return response['result']
+
+    def encode(self, texts: List[str], model_name: str = None) -> np.ndarray:
+        return self._request({'command': 'encode', 'texts': list(texts), 'model': model_name})
+
+    def info(self, model_name: str = None) -> Dict[str, Any]:
+        return self._request({'command': 'info', 'model': model_name})
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve embeddings to local API workers")
+    parser.add_argument("--address", default=Config.EMBEDDING_SERVER_ADDRESS or "data/embedding.sock",
+                        help="Unix socket path or host:port")
+    parser.add_argument("--model", default=Config.EMBEDDING_MODEL)
+    args = parser.parse_args(argv)
+
+    EmbeddingServer(args.address, args.model).serve_forever()
+
+
+if __name__ == "__main__":
+    main()
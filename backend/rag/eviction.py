@@ -0,0 +1,262 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import Callable, List, Dict, Any, Optional
+from app.config import Config
+
+
+def estimate_footprint(chunks: List[Dict[str, Any]], embedding_dim: int,
+                       checkpoint_bytes: int = 0, cached_text_chars: int = 0) -> Dict[str, int]:
+    """
+    Estimate what evicting a stored video frees: disk for vectors, documents and (unless
+    eviction keeps them) checkpoints; memory for its share of the loaded HNSW index plus
+    any transcript kept in process
+    """
+    vector_bytes = len(chunks) * embedding_dim * 4
+    text_bytes = sum(len(chunk['text'].encode("utf-8")) for chunk in chunks)
+    if Config.EVICTION_KEEP_CHECKPOINTS:
+        checkpoint_bytes = 0
+    return {
+        'chunk_count': len(chunks),
+        'disk_bytes': int(vector_bytes * Config.EVICTION_INDEX_OVERHEAD) + text_bytes + checkpoint_bytes,
+        'memory_bytes': int(vector_bytes * Config.EVICTION_INDEX_OVERHEAD) + cached_text_chars * 3
+    }
+
+
+class AccessTracker:
+    """
+    Per-video last-access times and estimated footprints, persisted in SQLite.
+    Reads are recorded in memory and flushed in batches to keep them off the hot path.
+    """
+    def __init__(self, path: str = None, flush_interval: float = None):
+        self.path = path or Config.ACCESS_TRACKER_PATH
+        self.flush_interval = Config.ACCESS_FLUSH_INTERVAL_SECONDS if flush_interval is None else flush_interval
+        self._lock = threading.Lock()
+        self._pending: Dict[str, float] = {}
+        self._last_flush = time.time()
+
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS videos ("
+            " video_id TEXT PRIMARY KEY,"
+            " last_access REAL NOT NULL,"
+            " access_count INTEGER NOT NULL DEFAULT 0,"
+            " chunk_count INTEGER NOT NULL DEFAULT 0,"
+            " disk_bytes INTEGER NOT NULL DEFAULT 0,"
+            " memory_bytes INTEGER NOT NULL DEFAULT 0)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_videos_last_access ON videos (last_access)")
+        self._conn.commit()
+
+    def touch(self, video_id: str):
+        """
+        Record a read of a video
+        """
+        now = time.time()
+        with self._lock:
+            self._pending[video_id] = now
+            if now - self._last_flush >= self.flush_interval:
+                self._flush_locked()
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        if self._pending:
+            self._conn.executemany(
+                "INSERT INTO videos (video_id, last_access, access_count) VALUES (?, ?, 1) "
+                "ON CONFLICT(video_id) DO UPDATE SET "
+                "last_access = MAX(last_access, excluded.last_access), access_count = access_count + 1",
+                list(self._pending.items())
+            )
+            self._conn.commit()
+            self._pending.clear()
+        self._last_flush = time.time()
+
+    def record_video(self, video_id: str, chunk_count: int, disk_bytes: int, memory_bytes: int,
+                     last_access: float = None):
+        """
+        Store the footprint of a newly ingested video and count it as accessed
+        """
+        with self._lock:
+            self._pending.pop(video_id, None)
+            self._conn.execute(
+                "INSERT INTO videos (video_id, last_access, access_count, chunk_count, disk_bytes, memory_bytes) "
+                "VALUES (?, ?, 1, ?, ?, ?) "
+                "ON CONFLICT(video_id) DO UPDATE SET last_access = excluded.last_access, "
+                "chunk_count = excluded.chunk_count, disk_bytes = excluded.disk_bytes, "
+                "memory_bytes = excluded.memory_bytes",
+                (video_id, time.time() if last_access is None else last_access,
+                 chunk_count, disk_bytes, memory_bytes)
+            )
+            self._conn.commit()
+
+    def forget(self, video_ids: List[str]):
+        with self._lock:
+            for video_id in video_ids:
+                self._pending.pop(video_id, None)
+            self._conn.executemany("DELETE FROM videos WHERE video_id = ?", [(v,) for v in video_ids])
+            self._conn.commit()
+
+    def least_recently_used(self) -> List[Dict[str, Any]]:
+        """
+        All tracked videos, least recently used first
+        """
+        with self._lock:
+            self._flush_locked()
+            rows = self._conn.execute(
+                "SELECT video_id, last_access, access_count, chunk_count, disk_bytes, memory_bytes "
+                "FROM videos ORDER BY last_access ASC"
+            ).fetchall()
+        columns = ['video_id', 'last_access', 'access_count', 'chunk_count', 'disk_bytes', 'memory_bytes']
+        return [dict(zip(columns, row)) for row in rows]
+
+    def most_used(self, limit: int) -> List[str]:
+        """
+        IDs of the most frequently read videos, most recent first among ties
+        """
+        with self._lock:
+            self._flush_locked()
+            rows = self._conn.execute(
+                "SELECT video_id FROM videos ORDER BY access_count DESC, last_access DESC LIMIT ?", (limit,)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def get_last_access(self, video_id: str) -> Optional[float]:
+        with self._lock:
+            if video_id in self._pending:
+                return self._pending[video_id]
+            row = self._conn.execute(
+                "SELECT last_access FROM videos WHERE video_id = ?", (video_id,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def get_stats(self) -> Dict[str, int]:
+        with self._lock:
+            videos, disk_bytes, memory_bytes = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(disk_bytes), 0), COALESCE(SUM(memory_bytes), 0) FROM videos"
+            ).fetchone()
+        return {'tracked_videos': videos, 'disk_bytes': disk_bytes, 'memory_bytes': memory_bytes}
+
+
+class VideoEvictor:
+    """
+    Evict least-recently-used videos until the estimated disk and memory footprints
+    fit their quotas. Evicted vectors leave free space in the store that new videos
+    reuse; `python -m rag.maintenance compact` returns it to the filesystem. What
+    the forget callback keeps (checkpoints, transcripts) is up to the caller.
+    """
+    def __init__(self, vector_store, access_tracker: AccessTracker, forget: Callable[[str], None],
+                 disk_quota_bytes: int = None, memory_quota_bytes: int = None):
+        self.vector_store = vector_store
+        self.access_tracker = access_tracker
+        self.forget = forget
+        self.disk_quota = Config.EVICTION_DISK_QUOTA_BYTES if disk_quota_bytes is None else disk_quota_bytes
+        self.memory_quota = Config.EVICTION_MEMORY_QUOTA_BYTES if memory_quota_bytes is None else memory_quota_bytes
+        self._lock = threading.Lock()
+        self._stats = {'runs': 0, 'evicted_videos': 0, 'evicted_chunks': 0}
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.disk_quota or self.memory_quota)
+
+    def backfill(self, default_chunk_chars: int = None) -> int:
+        """
+        Start tracking videos stored before access tracking existed, as the coldest entries,
+        and fill in footprints for videos only known from reads (touch records no footprint)
+        """
+        default_chunk_chars = default_chunk_chars or Config.CHUNK_SIZE
+        tracked = {video['video_id']: video for video in self.access_tracker.least_recently_used()}
+        indexed = self.vector_store.video_collection.get(include=['metadatas', 'embeddings'])
+        embeddings = indexed['embeddings'] if indexed['embeddings'] is not None else []
+        added = 0
+        for video_id, metadata, embedding in zip(indexed['ids'], indexed['metadatas'] or [], embeddings):
+            existing = tracked.get(video_id)
+            if existing and existing['disk_bytes']:
+                continue
+            chunk_count = metadata.get('chunk_count', 0)
+            vector_bytes = chunk_count * len(embedding) * 4
+            # Unknown access history: treat them as never read
+            self.access_tracker.record_video(
+                video_id,
+                chunk_count,
+                int(vector_bytes * Config.EVICTION_INDEX_OVERHEAD) + chunk_count * default_chunk_chars,
+                int(vector_bytes * Config.EVICTION_INDEX_OVERHEAD),
+                last_access=existing['last_access'] if existing else 0.0
+            )
+            added += 1
+        if added:
+            print(f"Recorded footprints for {added} untracked videos")
+        return added
+
+    def plan(self, protect: List[str] = None) -> Dict[str, Any]:
+        """
+        Pick the least recently used videos to evict; protected videos are never chosen
+        """
+        protect = set(protect or [])
+        videos = self.access_tracker.least_recently_used()
+        disk = sum(video['disk_bytes'] for video in videos)
+        memory = sum(video['memory_bytes'] for video in videos)
+
+        selected = []
+        for video in videos:
+            over_disk = self.disk_quota and disk > self.disk_quota
+            over_memory = self.memory_quota and memory > self.memory_quota
+            if not (over_disk or over_memory):
+                break
+            if video['video_id'] in protect:
+                continue
+            selected.append(video)
+            disk -= video['disk_bytes']
+            memory -= video['memory_bytes']
+
+        return {
+            'videos': selected,
+            'projected_disk_bytes': disk,
+            'projected_memory_bytes': memory
+        }
+
+    def run(self, protect: List[str] = None, dry_run: bool = False) -> Dict[str, Any]:
+        """
+        Evict videos until both quotas are met and clear all state cached for them
+        """
+        if not self.enabled:
+            return {'enabled': False, 'evicted': []}
+
+        with self._lock:
+            plan = self.plan(protect)
+            video_ids = [video['video_id'] for video in plan['videos']]
+            if video_ids and not dry_run:
+                deleted = self.vector_store.delete_videos(video_ids)
+                # A video the delete missed stays tracked (and evictable) while it is still stored
+                gone = [video_id for video_id in video_ids
+                        if video_id in deleted or not self.vector_store.video_exists(video_id)]
+                for video_id in deleted:
+                    self.forget(video_id)
+                self.access_tracker.forget(gone)
+                self._stats['evicted_videos'] += len(deleted)
+                self._stats['evicted_chunks'] += sum(deleted.values())
+                video_ids = list(deleted)
+                print(f"🧊 Evicted {len(video_ids)} cold videos to stay within quota")
+            self._stats['runs'] += 1
+
+        return {
+            'enabled': True,
+            'dry_run': dry_run,
+            'evicted': video_ids,
+            'projected_disk_bytes': plan['projected_disk_bytes'],
+            'projected_memory_bytes': plan['projected_memory_bytes']
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'enabled': self.enabled,
+            'disk_quota_bytes': self.disk_quota,
+            'memory_quota_bytes': self.memory_quota,
+            **self._stats,
+            **self.access_tracker.get_stats()
+        }
@@ -0,0 +1,221 @@
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from typing import List, Dict, Any
+import numpy as np
+from rag.document_loader import DocumentLoader
+from rag.text_splitter import TextSplitter
+from rag.embedding_model import EmbeddingModel
+from rag.checkpoint_store import CheckpointStore
+from utils.metrics import track_stage
+from app.config import Config
+
+
+class IngestionPipeline:
+    """
+    Transcript fetch, split and embed for one video; storage stays with the caller.
+    Split and embed results are checkpointed so a retry resumes after the last completed stage.
+    """
+    def __init__(self, document_loader: DocumentLoader = None, text_splitter: TextSplitter = None,
+                 embedding_model: EmbeddingModel = None, checkpoint_store: CheckpointStore = None):
+        self.document_loader = document_loader or DocumentLoader()
+        self.text_splitter = text_splitter or TextSplitter()
+        self.embedding_model = embedding_model or EmbeddingModel()
+        self.checkpoint_store = checkpoint_store or CheckpointStore()
+
+    def _split_settings(self) -> Dict[str, Any]:
+        return {
+            'chunk_size': self.text_splitter.chunk_size,
+            'chunk_overlap': self.text_splitter.chunk_overlap
+        }
+
+    @contextmanager
+    def _stage(self, stage: str, timings: Dict[str, float]):
+        started = time.perf_counter()
+        with track_stage(stage):
+            yield
+        timings[stage] = time.perf_counter() - started
+
+    def prepare(self, url_info: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Load, split and embed a validated video; embeddings come back as one float32 array
+        """
+        timings = {}
+        video_id = url_info['video_id']
+        resumed = []
+
+        print(f"🎬 Loading transcript for video: {video_id}")
+        with self._stage("transcript_fetch", timings):
+            if url_info.get('transcript_file'):
+                document_data = self.document_loader.load_transcript_file(url_info['transcript_file'], video_id)
+            else:
+                document_data = self.document_loader.load_transcript(url_info['clean_url'])
+
+        settings = self._split_settings()
+        chunks = self.checkpoint_store.load_chunks(video_id, settings)
+        if chunks is not None:
+            print(f"♻️ Resuming from split checkpoint ({len(chunks)} chunks)")
+            resumed.append('split')
+        else:
+            print("✂️ Splitting text into chunks...")
+            with self._stage("split", timings):
+                chunks = self.text_splitter.split_text(document_data['full_text'])
+            self.checkpoint_store.save_chunks(video_id, chunks, settings)
+
+        embeddings = None
+        cache_stats = None
+        if resumed:
+            embeddings = self.checkpoint_store.load_embeddings(video_id, self.embedding_model.model_name)
+            if embeddings is not None and len(embeddings) != len(chunks):
+                embeddings = None
+        if embeddings is not None:
+            print("♻️ Resuming from embedding checkpoint")
+            resumed.append('embed')
+        else:
+            print("🧠 Generating embeddings...")
+            with self._stage("embed", timings):
+                embeddings, cache_stats = self.embedding_model.generate_embeddings_cached(
+                    [chunk['text'] for chunk in chunks]
+                )
+            self.checkpoint_store.save_embeddings(video_id, embeddings, self.embedding_model.model_name)
+
+        return {
+            'document_data': document_data,
+            'chunks': chunks,
+            'embeddings': embeddings,
+            'embedding_model': self.embedding_model.model_name,
+            'stage_seconds': timings,
+            'resumed_stages': resumed,
+            'embedding_cache': cache_stats
+        }
+
+
+def attach_embeddings(chunks, embeddings: np.ndarray):
+    """
+    Combine chunks with their embedding rows into the format VectorStore.add_documents expects
+    """
+    rows = embeddings.tolist()
+    embedded_chunks = []
+    for chunk, embedding in zip(chunks, rows):
+        embedded_chunk = chunk.copy()
+        embedded_chunk['embedding'] = embedding
+        embedded_chunks.append(embedded_chunk)
+    return embedded_chunks
+
+
+def rebuildable_videos(checkpoint_store: CheckpointStore, model_name: str) -> List[str]:
+    """
+    Videos whose checkpoints hold chunks and matching embeddings from model_name;
+    evicted videos are left out
+    """
+    rebuildable = []
+    for video_id in checkpoint_store.list_videos():
+        status = checkpoint_store.get_status(video_id) or {}
+        shape = status.get('embedding_shape')
+        if status.get('evicted'):
+            continue
+        if checkpoint_store.has_reached(video_id, 'embedded') and status.get('model_name') == model_name \
+                and shape and shape[0] == status.get('chunk_count'):
+            rebuildable.append(video_id)
+    return rebuildable
+
+
+def reindex_from_checkpoints(vector_store, checkpoint_store: CheckpointStore, model_name: str,
+                             video_ids: List[str] = None) -> Dict[str, Any]:
+    """
+    Re-add checkpointed videos to the vector store from their stored embeddings, without
+    re-embedding. By default every checkpointed video that was not evicted.
+    """
+    summary = {'reindexed': [], 'already_present': [], 'skipped': []}
+    if video_ids is None:
+        video_ids = [v for v in checkpoint_store.list_videos() if not checkpoint_store.is_evicted(v)]
+
+    for video_id in video_ids:
+        chunks = checkpoint_store.load_chunks(video_id)
+        embeddings = checkpoint_store.load_embeddings(video_id, model_name)
+        if chunks is None or embeddings is None or len(embeddings) != len(chunks):
+            summary['skipped'].append(video_id)
+            continue
+
+        if vector_store.video_exists(video_id):
+            checkpoint_store.mark_stored(video_id, vector_store.collection_name)
+            summary['already_present'].append(video_id)
+            continue
+
+        if vector_store.add_documents(video_id, attach_embeddings(chunks, embeddings), model_name):
+            checkpoint_store.mark_stored(video_id, vector_store.collection_name)
+            summary['reindexed'].append(video_id)
+        else:
+            summary['skipped'].append(video_id)
+
+    print(f"Reindexed {len(summary['reindexed'])} videos from checkpoints")
+    return summary
+
+
+# Per-process pipeline, created once by the pool initializer so the model stays warm
+_worker_pipeline = None
+
+
+def _init_worker(torch_threads: int, model_name: str = None, workers: int = 1):
+    global _worker_pipeline
+    try:
+        import torch
+        torch.set_num_threads(torch_threads)
+    except ImportError:
+        pass
+    Config.ensure_directories()
+    # TRANSCRIPT_FETCH_CONCURRENCY is a per-node budget, shared out across the worker processes
+    document_loader = DocumentLoader(fetch_concurrency=max(1, Config.TRANSCRIPT_FETCH_CONCURRENCY // workers))
+    _worker_pipeline = IngestionPipeline(document_loader=document_loader, embedding_model=EmbeddingModel(model_name))
+
+
+def _prepare_in_worker(url_info: Dict[str, Any], model_name: str = None) -> Dict[str, Any]:
+    # Follow the active collection's model after an embedding migration switch
+    if model_name and model_name != _worker_pipeline.embedding_model.model_name:
+        _worker_pipeline.embedding_model = EmbeddingModel(model_name)
+    return _worker_pipeline.prepare(url_info)
+
+
+def _worker_pid() -> int:
+    return os.getpid()
+
+
+class IngestionWorkerPool:
+    """
+    Pool of worker processes, each holding its own warm ingestion pipeline
+    """
+    def __init__(self, workers: int = None, torch_threads: int = None, model_name: str = None):
+        self.workers = workers or Config.INGESTION_WORKERS
+        self.torch_threads = torch_threads or Config.INGESTION_WORKER_TORCH_THREADS or \
+            max(1, (os.cpu_count() or 1) // self.workers)
+
+        # spawn, not fork: forking a process that already holds torch/chromadb threads is unsafe
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.torch_threads, model_name, self.workers)
+        )
+        print(f"Ingestion worker pool started with {self.workers} processes "
+              f"({self.torch_threads} torch threads each)")
+
+    def prepare(self, url_info: Dict[str, Any], model_name: str = None) -> Dict[str, Any]:
+        """
+        Run IngestionPipeline.prepare in a worker process and wait for the result
+        """
+        return self._executor.submit(_prepare_in_worker, url_info, model_name).result()
+
+    def warm_up(self):
+        """
+        Start every worker process and load its model ahead of the first request
+        """
+        futures = [self._executor.submit(_worker_pid) for _ in range(self.workers)]
+        return sorted({future.result() for future in futures})
+
+    def pending_tasks(self) -> int:
+        return self._executor._work_ids.qsize()
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True, cancel_futures=True)
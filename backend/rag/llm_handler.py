@@ -1,7 +1,30 @@
-import google.generativeai as genai
-from typing import Dict, Any, Optional
+from typing import List, Dict, Any, Optional
+from utils.tracing import span
+from rag.prompt_cache import PromptCache
 from app.config import Config
 
+# Instruction preamble shared by every contextual chat prompt
+CHAT_INSTRUCTIONS = """You are an AI assistant that helps users understand YouTube video content. You have access to the transcript of a YouTube video and can answer questions based on that content.
+
+Instructions:
+1. Answer the user's question based primarily on the provided video transcript context
+2. Be accurate and only use information from the provided context
+3. If the context doesn't contain enough information to answer the question, say so clearly
+4. Provide clear, concise, and helpful responses
+5. If relevant, you can reference specific parts of the video content
+6. Maintain a friendly and helpful tone
+
+"""
+
+SUMMARY_INSTRUCTIONS = """Please provide a comprehensive summary of this YouTube video transcript. 
+            
+Key points to include:
+1. Main topic/theme of the video
+2. Key points discussed
+3. Important insights or conclusions
+4. Structure/flow of the content
+"""
+
 class LLMHandler:
     def __init__(self):
         self.api_key = Config.GEMINI_API_KEY
@@ -13,32 +36,47 @@ class LLMHandler:
             raise ValueError("GEMINI_API_KEY not found in environment variables")
         
         try:
-            # Configure Gemini API
-            genai.configure(api_key=self.api_key)
+            # Imported here so importing the app stays fast; the SDK is loaded during warm-up
+            import google.generativeai as genai
+            self.genai = genai
+            
+            # Configure Gemini API (optionally against a local stand-in endpoint)
+            if Config.GEMINI_API_ENDPOINT:
+                genai.configure(
+                    api_key=self.api_key,
+                    transport="rest",
+                    client_options={"api_endpoint": Config.GEMINI_API_ENDPOINT}
+                )
+            else:
+                genai.configure(api_key=self.api_key)
             self.model = genai.GenerativeModel(self.model_name)
+            self.prompt_cache = PromptCache(self.model_name) if Config.LLM_CONTEXT_CACHING else None
             print(f"Gemini model '{self.model_name}' initialized successfully")
         except Exception as e:
             print(f"Error initializing Gemini model: {str(e)}")
             raise Exception(f"Failed to initialize Gemini model: {str(e)}")
     
-    def generate_response(self, query: str, context: str, video_id: str = None) -> Dict[str, Any]:
+    def generate_response(self, query: str, context: str, video_id: str = None,
+                          video_ids: List[str] = None, history: str = None) -> Dict[str, Any]:
         """
-        Generate response using Gemini with context from video transcript
+        Generate response using Gemini with context from one or more video transcripts
         """
         try:
-            # Create prompt with context
-            prompt = self._create_prompt(query, context, video_id)
+            # Create prompt with context. The instruction preamble is far below the
+            # provider's minimum cacheable size, so chat prompts are sent in full.
+            prompt = self._create_prompt(query, context, video_id, video_ids, history)
             
             print(f"Generating response for query: '{query[:50]}...'")
             
             # Generate response
-            response = self.model.generate_content(
-                prompt,
-                generation_config=genai.types.GenerationConfig(
-                    max_output_tokens=self.max_tokens,
-                    temperature=self.temperature,
+            with span("llm.generate_response", model=self.model_name, prompt_length=len(prompt)):
+                response = self.model.generate_content(
+                    prompt,
+                    generation_config=self.genai.types.GenerationConfig(
+                        max_output_tokens=self.max_tokens,
+                        temperature=self.temperature,
+                    )
                 )
-            )
             
             if response.text:
                 print("Response generated successfully")
@@ -67,19 +105,15 @@ class LLMHandler:
                 'error': str(e)
             }
     
-    def _create_prompt(self, query: str, context: str, video_id: str = None) -> str:
+    def _create_prompt(self, query: str, context: str, video_id: str = None,
+                       video_ids: List[str] = None, history: str = None) -> str:
         """
         Create a well-structured prompt for the LLM
         """
-        base_prompt = """You are an AI assistant that helps users understand YouTube video content. You have access to the transcript of a YouTube video and can answer questions based on that content.
-
-Instructions:
-1. Answer the user's question based primarily on the provided video transcript context
-2. Be accurate and only use information from the provided context
-3. If the context doesn't contain enough information to answer the question, say so clearly
-4. Provide clear, concise, and helpful responses
-5. If relevant, you can reference specific parts of the video content
-6. Maintain a friendly and helpful tone
+        base_prompt = CHAT_INSTRUCTIONS
+        
+        if video_ids and len(video_ids) > 1:
+            base_prompt += f"""The context below comes from {len(video_ids)} different videos. Each excerpt is labelled with its video ID; when the question compares the videos, attribute each point to the video it came from.
 
 """
         
@@ -91,37 +125,52 @@ Instructions:
         else:
             context_prompt = "No specific video context was found for this query.\n\n"
         
+        history_prompt = f"""Conversation so far:
+{history}
+
+""" if history else ""
+        
         user_prompt = f"""User Question: {query}
 
 Please provide a comprehensive answer based on the video transcript context above."""
         
-        return base_prompt + context_prompt + user_prompt
+        return base_prompt + context_prompt + history_prompt + user_prompt
     
     def generate_summary(self, full_transcript: str, video_id: str = None) -> Dict[str, Any]:
         """
         Generate a summary of the entire video transcript
         """
         try:
-            prompt = f"""Please provide a comprehensive summary of this YouTube video transcript. 
-            
-Key points to include:
-1. Main topic/theme of the video
-2. Key points discussed
-3. Important insights or conclusions
-4. Structure/flow of the content
+            # Same truncation with or without the cache, so both paths summarize the same text
+            transcript = full_transcript[:Config.SUMMARY_TRANSCRIPT_MAX_CHARS]
 
+            # The transcript is cached per video, so repeat requests only send the short ask
+            model = None
+            if self.prompt_cache and video_id:
+                model = self.prompt_cache.get_model(
+                    f"video:{video_id}",
+                    SUMMARY_INSTRUCTIONS,
+                    [f"Transcript:\n{transcript}"]
+                )
+            
+            if model:
+                prompt = "Please provide a clear and structured summary."
+            else:
+                model = self.model
+                prompt = f"""{SUMMARY_INSTRUCTIONS}
 Transcript:
-{full_transcript[:8000]}...  # Limit to avoid token limits
+{transcript}
 
 Please provide a clear and structured summary."""
 
-            response = self.model.generate_content(
-                prompt,
-                generation_config=genai.types.GenerationConfig(
-                    max_output_tokens=500,
-                    temperature=0.3,
+            with span("llm.generate_summary", model=self.model_name, prompt_length=len(prompt)):
+                response = model.generate_content(
+                    prompt,
+                    generation_config=self.genai.types.GenerationConfig(
+                        max_output_tokens=500,
+                        temperature=0.3,
+                    )
                 )
-            )
             
             if response.text:
                 return {
@@ -144,24 +193,26 @@ Please provide a clear and structured summary."""
                 'error': str(e)
             }
     
-    def chat_without_context(self, query: str) -> Dict[str, Any]:
+    def chat_without_context(self, query: str, history: str = None) -> Dict[str, Any]:
         """
         Generate response without video context (general chat)
         """
         try:
+            history_prompt = f"Conversation so far:\n{history}\n\n" if history else ""
             prompt = f"""You are a helpful AI assistant. The user is asking a general question not related to any specific video content.
 
-User Question: {query}
+{history_prompt}User Question: {query}
 
 Please provide a helpful and informative response."""
 
-            response = self.model.generate_content(
-                prompt,
-                generation_config=genai.types.GenerationConfig(
-                    max_output_tokens=self.max_tokens,
-                    temperature=self.temperature,
+            with span("llm.chat_without_context", model=self.model_name, prompt_length=len(prompt)):
+                response = self.model.generate_content(
+                    prompt,
+                    generation_config=self.genai.types.GenerationConfig(
+                        max_output_tokens=self.max_tokens,
+                        temperature=self.temperature,
+                    )
                 )
-            )
             
             if response.text:
                 return {
@@ -184,6 +235,44 @@ Please provide a helpful and informative response."""
                 'error': str(e)
             }
     
+    def summarize_conversation(self, previous_summary: str, turns: str) -> str:
+        """
+        Fold older conversation turns into the rolling session summary
+        """
+        try:
+            prompt = f"""Update the running summary of a conversation between a user and an assistant about YouTube video content. Keep facts, names, the questions asked and conclusions reached; drop pleasantries. Reply with the updated summary only.
+
+Current summary:
+{previous_summary or "(none)"}
+
+New messages:
+{turns}"""
+
+            with span("llm.summarize_conversation", model=self.model_name, prompt_length=len(prompt)):
+                response = self.model.generate_content(
+                    prompt,
+                    generation_config=self.genai.types.GenerationConfig(
+                        max_output_tokens=Config.SESSION_SUMMARY_MAX_TOKENS,
+                        temperature=0.2,
+                    )
+                )
+            
+            if response.text:
+                return response.text.strip()
+            return previous_summary
+            
+        except Exception as e:
+            print(f"Error summarizing conversation: {str(e)}")
+            # Keep the newest material rather than losing it entirely
+            return f"{previous_summary}\n{turns}".strip()
+    
+    def invalidate_video_cache(self, video_id: str):
+        """
+        Drop any provider-side cached context for a video
+        """
+        if self.prompt_cache:
+            self.prompt_cache.invalidate(f"video:{video_id}")
+    
     def get_model_info(self) -> Dict[str, Any]:
         """
         Get information about the LLM model
@@ -192,5 +281,6 @@ Please provide a helpful and informative response."""
             'model_name': self.model_name,
             'max_tokens': self.max_tokens,
             'temperature': self.temperature,
-            'api_configured': bool(self.api_key)
+            'api_configured': bool(self.api_key),
+            'context_caching': self.prompt_cache.get_stats() if self.prompt_cache else {'enabled': False}
         }
\ No newline at end of file
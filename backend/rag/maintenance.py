@@ -0,0 +1,281 @@
+"""
+Offline maintenance for the Chroma vector store. Run with the API stopped:
+
+    python -m rag.maintenance compact
+"""
+import argparse
+import json
+import os
+import shutil
+import sqlite3
+import statistics
+import time
+import uuid
+from typing import List, Dict, Any
+import chromadb
+from rag.vector_store import read_active_index, DEFAULT_COLLECTION_NAME, SQLITE_FILENAME
+from rag.sharding import shard_paths
+from app.config import Config
+
+# Name suffixes of the fresh copy and the set-aside original while a collection is rebuilt
+COMPACT_SUFFIX = "__compact"
+BACKUP_SUFFIX = "__backup"
+
+
+def directory_size(path: str) -> int:
+    """
+    Total size in bytes of all files under path
+    """
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+def _close_client(client):
+    """
+    Release the client's SQLite handles so the file can be vacuumed
+    """
+    try:
+        client._system.stop()
+    except Exception:
+        pass
+    try:
+        chromadb.api.client.SharedSystemClient.clear_system_cache()
+    except Exception:
+        pass
+
+
+def _collection_names(client) -> set:
+    return {c.name if hasattr(c, 'name') else c for c in client.list_collections()}
+
+
+def _batch_size(client) -> int:
+    try:
+        return client.get_max_batch_size()
+    except Exception:
+        return 5000
+
+
+def sample_probe_embeddings(collection, count: int) -> List[List[float]]:
+    """
+    Use stored embeddings as probe queries so latency can be measured without the model
+    """
+    if count <= 0 or collection.count() == 0:
+        return []
+    results = collection.get(limit=count, include=['embeddings'])
+    return [list(embedding) for embedding in results['embeddings']]
+
+
+def measure_search_latency(collection, probes: List[List[float]], top_k: int = None) -> Dict[str, float]:
+    """
+    Median and mean query latency over the probe embeddings
+    """
+    top_k = top_k or Config.TOP_K_CHUNKS
+    if not probes:
+        return {}
+    timings = []
+    for probe in probes:
+        started = time.perf_counter()
+        collection.query(query_embeddings=[probe], n_results=top_k, include=['distances'])
+        timings.append((time.perf_counter() - started) * 1000)
+    return {
+        'median_ms': round(statistics.median(timings), 3),
+        'mean_ms': round(statistics.fmean(timings), 3)
+    }
+
+
+def rebuild_collection(client, name: str) -> int:
+    """
+    Copy a collection into a fresh one and swap it in, leaving a compact HNSW index
+    without the tombstones of deleted vectors. Returns the number of records copied.
+    The swap only renames, so a crash at any point leaves either the original or the
+    complete copy for recover_interrupted_rebuilds to restore.
+    """
+    source = client.get_collection(name)
+    temp_name = f"{name}{COMPACT_SUFFIX}"
+    backup_name = f"{name}{BACKUP_SUFFIX}"
+    target = client.create_collection(name=temp_name, metadata=source.metadata)
+
+    batch_size = _batch_size(client)
+    copied = 0
+    offset = 0
+    while True:
+        page = source.get(limit=batch_size, offset=offset,
+                          include=['embeddings', 'documents', 'metadatas'])
+        if not page['ids']:
+            break
+        target.add(
+            ids=page['ids'],
+            embeddings=page['embeddings'],
+            documents=page['documents'],
+            metadatas=page['metadatas']
+        )
+        copied += len(page['ids'])
+        offset += len(page['ids'])
+
+    # Move the original aside, swap the full copy in, and only then drop the original
+    source.modify(name=backup_name)
+    target.modify(name=name)
+    client.delete_collection(backup_name)
+    return copied
+
+
+def recover_interrupted_rebuilds(client) -> Dict[str, str]:
+    """
+    Finish or roll back collection rebuilds interrupted by a crash, judged by which of
+    the original, its copy and its backup survived. Returns the action per collection.
+    """
+    names = _collection_names(client)
+    bases = {name[:-len(suffix)] for name in names for suffix in (COMPACT_SUFFIX, BACKUP_SUFFIX)
+             if name.endswith(suffix)}
+    actions = {}
+    for name in sorted(bases):
+        temp_name = f"{name}{COMPACT_SUFFIX}"
+        backup_name = f"{name}{BACKUP_SUFFIX}"
+        if name in names:
+            # The original, or the already swapped-in copy, is in place: a leftover copy is
+            # partial and a leftover backup is the replaced original
+            for leftover in (temp_name, backup_name):
+                if leftover in names:
+                    client.delete_collection(leftover)
+            actions[name] = 'cleaned_up'
+        elif backup_name in names:
+            # Crashed between moving the original aside and swapping the copy in
+            client.get_collection(backup_name).modify(name=name)
+            if temp_name in names:
+                client.delete_collection(temp_name)
+            actions[name] = 'rolled_back'
+        else:
+            # Only a copy survived (older releases dropped the original before the rename);
+            # it is complete, since the swap starts after the last record is copied
+            client.get_collection(temp_name).modify(name=name)
+            actions[name] = 'finished'
+        print(f"♻️ Recovered interrupted rebuild of '{name}': {actions[name]}")
+    return actions
+
+
+def remove_orphaned_segments(persist_directory: str) -> int:
+    """
+    Delete segment directories no longer referenced by the Chroma catalog.
+    Returns the number of bytes removed.
+    """
+    sqlite_path = os.path.join(persist_directory, SQLITE_FILENAME)
+    with sqlite3.connect(sqlite_path) as conn:
+        live = {row[0] for row in conn.execute("SELECT id FROM segments")}
+
+    removed = 0
+    for entry in os.listdir(persist_directory):
+        path = os.path.join(persist_directory, entry)
+        if not os.path.isdir(path) or entry in live:
+            continue
+        try:
+            uuid.UUID(entry)
+        except ValueError:
+            continue
+        removed += directory_size(path)
+        shutil.rmtree(path)
+    return removed
+
+
+def vacuum_sqlite(persist_directory: str):
+    """
+    Rewrite the Chroma SQLite file to return free pages to the filesystem
+    """
+    sqlite_path = os.path.join(persist_directory, SQLITE_FILENAME)
+    conn = sqlite3.connect(sqlite_path)
+    try:
+        conn.execute("VACUUM")
+    finally:
+        conn.close()
+
+
+def compact_vector_store(persist_directory: str = None, collection_name: str = None,
+                         probe_queries: int = 50) -> Dict[str, Any]:
+    """
+    Compact the store, or each of its shards in turn
+    """
+    persist_directory = persist_directory or Config.VECTOR_STORE_PATH
+    active_index = read_active_index(persist_directory)
+    collection_name = collection_name or active_index.get('collection_name', DEFAULT_COLLECTION_NAME)
+    shards = active_index.get('shards', 1)
+    if shards <= 1:
+        return compact_directory(persist_directory, collection_name, probe_queries)
+
+    reports = [compact_directory(path, collection_name, probe_queries)
+               for path in shard_paths(persist_directory, shards)]
+    return {
+        'persist_directory': persist_directory,
+        'shards': reports,
+        'bytes_before': sum(report['bytes_before'] for report in reports),
+        'bytes_after': sum(report['bytes_after'] for report in reports),
+        'bytes_reclaimed': sum(report['bytes_reclaimed'] for report in reports)
+    }
+
+
+def compact_directory(persist_directory: str, collection_name: str, probe_queries: int = 50) -> Dict[str, Any]:
+    """
+    Rebuild the transcript and centroid collections, drop orphaned segment files and
+    vacuum SQLite; reports bytes reclaimed and search latency before and after
+    """
+    size_before = directory_size(persist_directory)
+
+    client = chromadb.PersistentClient(path=persist_directory)
+    recovered = recover_interrupted_rebuilds(client)
+    collection = client.get_collection(collection_name)
+    probes = sample_probe_embeddings(collection, probe_queries)
+    latency_before = measure_search_latency(collection, probes)
+
+    names = _collection_names(client)
+    rebuilt = {}
+    for name in (collection_name, f"{collection_name}_videos"):
+        if name in names:
+            print(f"🔧 Rebuilding collection '{name}'...")
+            rebuilt[name] = rebuild_collection(client, name)
+    _close_client(client)
+
+    orphaned_bytes = remove_orphaned_segments(persist_directory)
+    print("🧹 Vacuuming SQLite...")
+    vacuum_sqlite(persist_directory)
+
+    client = chromadb.PersistentClient(path=persist_directory)
+    latency_after = measure_search_latency(client.get_collection(collection_name), probes)
+    _close_client(client)
+
+    size_after = directory_size(persist_directory)
+    return {
+        'persist_directory': persist_directory,
+        'collections_rebuilt': rebuilt,
+        'recovered': recovered,
+        'bytes_before': size_before,
+        'bytes_after': size_after,
+        'bytes_reclaimed': size_before - size_after,
+        'orphaned_segment_bytes': orphaned_bytes,
+        'probe_queries': len(probes),
+        'search_latency_before': latency_before,
+        'search_latency_after': latency_after
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Vector store maintenance (run with the API stopped)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    compact = subparsers.add_parser("compact", help="rebuild index segments and vacuum SQLite")
+    compact.add_argument("--path", default=Config.VECTOR_STORE_PATH)
+    compact.add_argument("--collection", default=None, help="defaults to the active collection")
+    compact.add_argument("--probe-queries", type=int, default=50)
+    args = parser.parse_args(argv)
+
+    if args.command == "compact":
+        report = compact_vector_store(args.path, args.collection, args.probe_queries)
+        print(json.dumps(report, indent=2))
+        print(f"✅ Reclaimed {report['bytes_reclaimed'] / (1024 * 1024):.1f} MiB")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,185 @@
+import threading
+import time
+from typing import Callable, List, Dict, Any, Optional
+from rag.embedding_model import EmbeddingModel
+from rag.vector_store import VectorStore, IndexSnapshot
+from rag.retriever import Retriever
+from utils.tracing import span
+from app.config import Config
+
+
+class EmbeddingMigration:
+    """
+    Re-embed every stored video into a new versioned collection for another embedding
+    model while the active collection keeps serving, then switch atomically.
+
+    Videos are copied in throttled passes until source and target agree; the last
+    catch-up and the switch run under the vector store's write lock so no ingest or
+    delete is lost. The target collection is recorded on disk, so after a restart the
+    migration reopens it (see resume) and skips videos it already holds.
+    """
+    def __init__(self, vector_store: VectorStore, retriever: Retriever,
+                 on_switch: Callable[[EmbeddingModel], None] = None,
+                 chunks_per_second: float = None, batch_size: int = None):
+        self.vector_store = vector_store
+        self.retriever = retriever
+        self.on_switch = on_switch
+        self.chunks_per_second = chunks_per_second or Config.MIGRATION_CHUNKS_PER_SECOND
+        self.batch_size = batch_size or Config.MIGRATION_BATCH_SIZE
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.status: Dict[str, Any] = {'state': 'idle'}
+
+    def start(self, model_name: str, collection_name: str = None) -> Dict[str, Any]:
+        """
+        Start migrating to model_name in the background
+        """
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return {'error': 'A migration is already running', **self.status}
+            if model_name == self.vector_store.model_name:
+                return {'error': f"Collection '{self.vector_store.collection_name}' already uses {model_name}"}
+
+            # Reopen the partly filled target of an interrupted migration to the same model;
+            # one left behind by a migration to another model is dropped
+            pending = self.vector_store.read_migration_target()
+            resumed = False
+            if pending.get('embedding_model') == model_name and collection_name in (None, pending['collection_name']):
+                collection_name = pending['collection_name']
+                resumed = True
+            elif pending.get('collection_name'):
+                self.vector_store.drop_collections(pending['collection_name'])
+            collection_name = collection_name or self.vector_store.next_collection_name()
+            self.vector_store.save_migration_target(collection_name, model_name)
+
+            self.status = {
+                'state': 'starting',
+                'embedding_model': model_name,
+                'source_collection': self.vector_store.collection_name,
+                'target_collection': collection_name,
+                'resumed': resumed,
+                'videos_total': 0,
+                'videos_done': 0,
+                'chunks_done': 0,
+                'started_at': time.time()
+            }
+            self._thread = threading.Thread(
+                target=self._run, args=(model_name, self.status['target_collection']),
+                name="embedding-migration", daemon=True
+            )
+            self._thread.start()
+            return dict(self.status)
+
+    def resume(self) -> Optional[Dict[str, Any]]:
+        """
+        Restart a migration interrupted by a process restart; None when there is none
+        """
+        pending = self.vector_store.read_migration_target()
+        if not pending:
+            return None
+        if pending['embedding_model'] == self.vector_store.model_name:
+            # Switched before the state was cleared
+            self.vector_store.clear_migration_target()
+            return None
+        print(f"🔁 Resuming embedding migration to {pending['embedding_model']} "
+              f"into '{pending['collection_name']}'")
+        return self.start(pending['embedding_model'], pending['collection_name'])
+
+    def get_status(self) -> Dict[str, Any]:
+        status = dict(self.status)
+        if status.get('state') == 'running' and status.get('started_at'):
+            elapsed = time.time() - status['started_at']
+            status['chunks_per_second'] = round(status['chunks_done'] / elapsed, 1) if elapsed else 0.0
+        return status
+
+    def _run(self, model_name: str, collection_name: str):
+        try:
+            with span("migration.run", embedding_model=model_name, target=collection_name):
+                model = EmbeddingModel(model_name)
+                target = self.vector_store.open_snapshot(collection_name, model_name)
+                self.status['state'] = 'running'
+
+                # Copy passes without blocking writers; each pass picks up what changed meanwhile
+                for _ in range(Config.MIGRATION_MAX_PASSES):
+                    if not self._sync(model, target):
+                        break
+
+                # Final catch-up and switch, with writes held off
+                self.status['state'] = 'switching'
+                with self.vector_store.write_lock:
+                    self._sync(model, target)
+                    previous_model = self.retriever.model_for(self.vector_store.model_name)
+                    self.retriever.register_model(previous_model)
+                    self.retriever.register_model(model)
+                    self.vector_store.activate(target)
+                    self.vector_store.clear_migration_target()
+                    if self.on_switch:
+                        self.on_switch(model)
+
+                self.status.update({'state': 'switched', 'finished_at': time.time()})
+                print(f"✅ Embedding migration to {model_name} complete")
+
+                # Let queries that encoded with the old model finish before dropping it
+                time.sleep(Config.MIGRATION_DRAIN_SECONDS)
+                if previous_model.model_name != model_name:
+                    self.retriever.unregister_model(previous_model.model_name)
+
+        except Exception as e:
+            print(f"❌ Embedding migration failed: {str(e)}")
+            self.status.update({'state': 'failed', 'error': str(e), 'finished_at': time.time()})
+
+    def _sync(self, model: EmbeddingModel, target: IndexSnapshot) -> int:
+        """
+        Bring target in line with the active collection; returns the number of videos changed
+        """
+        source = self.vector_store.snapshot()
+        if source.video_collection.count() == 0 and source.collection.count() > 0:
+            self.vector_store.rebuild_video_index(source)
+
+        source_videos = set(self.vector_store.list_videos(source))
+        target_videos = set(self.vector_store.list_videos(target))
+        pending = sorted(source_videos - target_videos)
+        removed = sorted(target_videos - source_videos)
+
+        if removed:
+            self.vector_store.delete_videos(removed, snapshot=target)
+        self.status['videos_total'] = len(source_videos)
+        self.status['videos_done'] = len(source_videos) - len(pending)
+        for video_id in pending:
+            self._migrate_video(video_id, source, target, model)
+            self.status['videos_done'] += 1
+        return len(pending) + len(removed)
+
+    def _migrate_video(self, video_id: str, source: IndexSnapshot, target: IndexSnapshot,
+                       model: EmbeddingModel):
+        """
+        Re-embed one video's stored chunks with the new model, at a throttled rate
+        """
+        results = source.collection.get(where={"video_id": video_id}, include=['documents', 'metadatas'])
+        chunks = sorted(
+            (
+                {'id': metadata['chunk_id'], 'text': document, 'length': metadata.get('length', len(document))}
+                for document, metadata in zip(results['documents'], results['metadatas'])
+            ),
+            key=lambda chunk: chunk['id']
+        )
+        if not chunks:
+            return
+
+        embedded_chunks: List[Dict[str, Any]] = []
+        for start in range(0, len(chunks), self.batch_size):
+            batch = chunks[start:start + self.batch_size]
+            started = time.perf_counter()
+            embeddings, _ = model.generate_embeddings_cached([chunk['text'] for chunk in batch])
+            for chunk, embedding in zip(batch, embeddings.tolist()):
+                embedded_chunks.append({**chunk, 'embedding': embedding})
+
+            # Throttle so the migration leaves CPU for live traffic
+            min_seconds = len(batch) / self.chunks_per_second
+            elapsed = time.perf_counter() - started
+            if elapsed < min_seconds:
+                time.sleep(min_seconds - elapsed)
+
+        if not self.vector_store.add_documents(video_id, embedded_chunks, model.model_name, snapshot=target):
+            raise Exception(f"Failed to store re-embedded chunks for video {video_id}")
+        self.status['chunks_done'] += len(chunks)
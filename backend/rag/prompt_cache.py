@@ -0,0 +1,154 @@
+import datetime
+import hashlib
+import threading
+import time
+from typing import List, Dict, Any, Optional, Set
+from utils.metrics import record_cache_lookup
+from app.config import Config
+
+# Rough characters per token, used to skip content under the provider's minimum size
+CHARS_PER_TOKEN = 4
+
+
+class PromptCache:
+    """
+    Provider-side cached content (Gemini context caching) for large stable prompt
+    prefixes such as per-video transcripts, keyed by name and content hash
+    """
+    def __init__(self, model_name: str, ttl_seconds: int = None, retry_after_seconds: int = None,
+                 min_tokens: int = None, max_entries: int = None):
+        self.model_name = model_name
+        self.ttl = ttl_seconds or Config.LLM_CACHE_TTL_SECONDS
+        self.retry_after = retry_after_seconds or Config.LLM_CACHE_RETRY_AFTER_SECONDS
+        self.min_tokens = Config.LLM_CACHE_MIN_TOKENS if min_tokens is None else min_tokens
+        self.max_entries = max_entries or Config.LLM_CACHE_MAX_ENTRIES
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._failures: Dict[str, float] = {}
+        # Keys being created right now; concurrent misses wait instead of creating duplicates
+        self._pending: Dict[str, threading.Event] = {}
+        # Pending keys invalidated mid-flight; their new cache is deleted instead of stored
+        self._invalidated: Set[str] = set()
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'created': 0, 'failed': 0, 'invalidated': 0,
+                       'evicted': 0, 'too_small': 0}
+
+    def get_model(self, key: str, system_instruction: str,
+                  contents: List[str] = None) -> Optional[Any]:
+        """
+        Get a model bound to cached content for key, creating the cache on first use.
+        Returns None when caching is unavailable or the content is too small to cache,
+        so the caller can send the full prompt.
+        """
+        parts = [system_instruction] + list(contents or [])
+        if sum(len(part) for part in parts) < self.min_tokens * CHARS_PER_TOKEN:
+            with self._lock:
+                self._stats['too_small'] += 1
+            return None
+        digest = hashlib.sha256("\0".join(parts).encode("utf-8")).hexdigest()
+
+        while True:
+            now = time.time()
+            with self._lock:
+                entry = self._entries.get(key)
+                # Refresh a little before the provider-side TTL runs out
+                if entry and entry['digest'] == digest and entry['expires_at'] - 60 > now:
+                    self._stats['hits'] += 1
+                    record_cache_lookup('llm_context', True)
+                    return entry['model']
+                if self._failures.get(key, 0) > now:
+                    return None
+                pending = self._pending.get(key)
+                if pending is None:
+                    self._pending[key] = threading.Event()
+                    self._stats['misses'] += 1
+                    stale = self._entries.pop(key, None)
+                    break
+            # Another request is creating this key; use its result once it is done
+            if not pending.wait(timeout=60):
+                return None
+
+        record_cache_lookup('llm_context', False)
+        try:
+            if stale:
+                self._delete(key, stale)
+            return self._create(key, digest, system_instruction, contents)
+        finally:
+            with self._lock:
+                self._invalidated.discard(key)
+                self._pending.pop(key).set()
+
+    def _create(self, key: str, digest: str, system_instruction: str,
+                contents: List[str] = None) -> Optional[Any]:
+        now = time.time()
+        try:
+            import google.generativeai as genai
+            cached_content = genai.caching.CachedContent.create(
+                model=self.model_name,
+                display_name=f"youtube-rag:{key}"[:128],
+                system_instruction=system_instruction,
+                contents=contents or None,
+                ttl=datetime.timedelta(seconds=self.ttl)
+            )
+            model = genai.GenerativeModel.from_cached_content(cached_content=cached_content)
+        except Exception as e:
+            # e.g. model without caching support
+            print(f"Context caching unavailable for '{key}': {str(e)}")
+            with self._lock:
+                self._failures = {k: v for k, v in self._failures.items() if v > now}
+                self._failures[key] = now + self.retry_after
+                self._stats['failed'] += 1
+            return None
+
+        with self._lock:
+            invalidated = key in self._invalidated
+            if not invalidated:
+                self._entries[key] = {
+                    'digest': digest,
+                    'cached_content': cached_content,
+                    'model': model,
+                    'expires_at': now + self.ttl
+                }
+                self._failures.pop(key, None)
+                self._stats['created'] += 1
+            evicted = []
+            if len(self._entries) > self.max_entries:
+                # Drop the entries closest to expiry
+                victims = sorted(self._entries.items(), key=lambda item: item[1]['expires_at'])
+                for victim_key, victim in victims[:len(self._entries) - self.max_entries]:
+                    del self._entries[victim_key]
+                    evicted.append((victim_key, victim))
+                self._stats['evicted'] += len(evicted)
+        for victim_key, victim in evicted:
+            self._delete(victim_key, victim)
+        if invalidated:
+            self._delete(key, {'cached_content': cached_content})
+            print(f"Dropped cached context '{key}' invalidated during creation")
+            return None
+        print(f"Created cached context '{key}'")
+        return model
+
+    def _delete(self, key: str, entry: Dict[str, Any]):
+        try:
+            entry['cached_content'].delete()
+        except Exception as e:
+            print(f"Error deleting cached context '{key}': {str(e)}")
+
+    def invalidate(self, key: str):
+        """
+        Drop a cached context locally and on the provider side
+        """
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            self._failures.pop(key, None)
+            if key in self._pending:
+                self._invalidated.add(key)
+                self._stats['invalidated'] += 1
+        if not entry:
+            return
+        self._delete(key, entry)
+        with self._lock:
+            self._stats['invalidated'] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {'entries': len(self._entries), **self._stats}
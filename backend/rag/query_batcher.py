@@ -0,0 +1,114 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, List, Dict, Any
+import numpy as np
+from utils.metrics import observe_query_batch
+from app.config import Config
+
+
+class QueryBatcher:
+    """
+    Collect concurrent query texts for a short window and encode them in one forward pass
+    """
+    def __init__(self, encode_fn: Callable[[List[str]], np.ndarray],
+                 max_batch_size: int = None, window_ms: float = None):
+        self.encode_fn = encode_fn
+        self.max_batch_size = max_batch_size or Config.QUERY_BATCH_MAX_SIZE
+        self.window = (Config.QUERY_BATCH_WINDOW_MS if window_ms is None else window_ms) / 1000.0
+
+        self._queue = queue.Queue()
+        self._worker = None
+        self._start_lock = threading.Lock()
+        self._closed = False
+
+        self._stats_lock = threading.Lock()
+        self._batches = 0
+        self._queries = 0
+        self._max_seen = 0
+        self._size_counts: Dict[int, int] = {}
+
+    def encode(self, text: str) -> np.ndarray:
+        """
+        Queue a single text and block until its embedding is ready
+        """
+        future = Future()
+        with self._start_lock:
+            if self._closed:
+                raise RuntimeError("Query batcher is closed")
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name="query-batcher", daemon=True)
+                self._worker.start()
+            self._queue.put((text, future))
+        return future.result()
+
+    def close(self, timeout: float = 5.0):
+        """
+        Encode what is already queued, then stop the worker thread so the model can be released
+        """
+        with self._start_lock:
+            if self._closed:
+                return
+            self._closed = True
+            worker = self._worker
+            if worker is not None:
+                self._queue.put(None)
+        if worker is not None:
+            worker.join(timeout)
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch = [first]
+            deadline = time.monotonic() + self.window
+
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            texts = [text for text, _ in batch]
+            try:
+                embeddings = self.encode_fn(texts)
+                for (_, future), embedding in zip(batch, embeddings):
+                    future.set_result(embedding)
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+
+            self._record(len(batch))
+
+    def _record(self, size: int):
+        observe_query_batch(size)
+        with self._stats_lock:
+            self._batches += 1
+            self._queries += size
+            self._max_seen = max(self._max_seen, size)
+            self._size_counts[size] = self._size_counts.get(size, 0) + 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get batch-size statistics
+        """
+        with self._stats_lock:
+            return {
+                'window_ms': self.window * 1000,
+                'max_batch_size': self.max_batch_size,
+                'batches': self._batches,
+                'queries': self._queries,
+                'avg_batch_size': round(self._queries / self._batches, 2) if self._batches else 0.0,
+                'largest_batch': self._max_seen,
+                'batch_size_counts': dict(sorted(self._size_counts.items()))
+            }
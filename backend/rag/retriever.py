@@ -1,30 +1,130 @@
+import threading
 from typing import List, Dict, Any
 from rag.embedding_model import EmbeddingModel
 from rag.vector_store import VectorStore
+from utils.metrics import observe_retrieval_depth
+from utils.text_processing import estimate_tokens
+from utils.tracing import span
 from app.config import Config
 
+
+def select_depth(similarities: List[float], min_k: int = None, max_k: int = None,
+                 score_gap: float = None, mass_fraction: float = None) -> int:
+    """
+    Choose how many of the (descending) candidate scores to keep: cut at the first
+    drop of at least score_gap, or once the kept chunks hold mass_fraction of the
+    relevance mass above the weakest candidate, whichever comes first.
+    Flat score distributions (broad questions) keep more; a clear winner keeps few.
+    """
+    min_k = min_k or Config.ADAPTIVE_MIN_CHUNKS
+    max_k = max_k or Config.ADAPTIVE_MAX_CHUNKS
+    score_gap = score_gap or Config.ADAPTIVE_SCORE_GAP
+    mass_fraction = mass_fraction or Config.ADAPTIVE_MASS_FRACTION
+
+    scores = similarities[:max_k]
+    if len(scores) <= min_k:
+        return len(scores)
+
+    gap_k = len(scores)
+    for i in range(len(scores) - 1):
+        if scores[i] - scores[i + 1] >= score_gap:
+            gap_k = i + 1
+            break
+
+    floor = scores[-1]
+    weights = [score - floor for score in scores]
+    total = sum(weights)
+    mass_k = len(scores)
+    if total > 0:
+        kept = 0.0
+        for i, weight in enumerate(weights):
+            kept += weight
+            if kept >= mass_fraction * total:
+                mass_k = i + 1
+                break
+
+    return max(min_k, min(gap_k, mass_k, max_k))
+
 class Retriever:
-    def __init__(self):
-        self.embedding_model = EmbeddingModel()
-        self.vector_store = VectorStore()
+    def __init__(self, embedding_model: EmbeddingModel = None, vector_store: VectorStore = None):
+        # Share the caller's model and store instead of loading a second copy
+        self.embedding_model = embedding_model or EmbeddingModel()
+        self.vector_store = vector_store or VectorStore()
         self.top_k = Config.TOP_K_CHUNKS
+        self.adaptive = Config.ADAPTIVE_RETRIEVAL
+        self._depth_lock = threading.Lock()
+        self._depth_stats = {'queries': 0, 'chunks_kept': 0, 'prompt_tokens_saved': 0}
+        # Extra query models, e.g. the outgoing one while queries drain after a migration switch
+        self._models: Dict[str, EmbeddingModel] = {}
+    
+    def register_model(self, embedding_model: EmbeddingModel):
+        self._models[embedding_model.model_name] = embedding_model
+    
+    def unregister_model(self, model_name: str):
+        """
+        Drop an extra query model and stop its batcher so it can be released
+        """
+        model = self._models.pop(model_name, None)
+        if model is not None and model is not self.embedding_model:
+            model.close()
+    
+    def model_for(self, model_name: str) -> EmbeddingModel:
+        """
+        The query model matching a collection's embedding model. Raises rather than
+        encode with another model, whose vectors would not match the collection.
+        """
+        if self.embedding_model.model_name == model_name:
+            return self.embedding_model
+        model = self._models.get(model_name)
+        if model is None:
+            raise ValueError(f"No query model loaded for collection embedding model '{model_name}'")
+        return model
+    
+    def _encode_query(self, query: str):
+        """
+        Encode a query with the model of the active collection; returns the embedding
+        and the snapshot it must be searched against
+        """
+        snapshot = self.vector_store.snapshot()
+        with span("embedding.encode_query", query_length=len(query)):
+            embedding = self.model_for(snapshot.model_name).generate_single_embedding(query)
+        return embedding, snapshot
     
     def retrieve_context(self, query: str, video_id: str = None) -> Dict[str, Any]:
         """
         Retrieve relevant context for a given query
         """
+        with span("retriever.retrieve_context", video_id=video_id, top_k=self.top_k):
+            return self._retrieve_context(query, video_id)
+    
+    def retrieve_multi_context(self, query: str, video_ids: List[str], top_k: int = None) -> Dict[str, Any]:
+        """
+        Retrieve the global top-k chunks across several videos with a single filtered query
+        """
+        top_k = top_k or Config.MULTI_VIDEO_TOP_K
+        with span("retriever.retrieve_multi_context", videos=len(video_ids), top_k=top_k):
+            return self._retrieve_context(query, video_ids=video_ids, top_k=top_k)
+    
+    def _retrieve_context(self, query: str, video_id: str = None, video_ids: List[str] = None,
+                          top_k: int = None) -> Dict[str, Any]:
         try:
             print(f"Retrieving context for query: '{query[:50]}...'")
             
             # Generate embedding for the query
-            query_embedding = self.embedding_model.generate_single_embedding(query)
+            query_embedding, snapshot = self._encode_query(query)
             
-            # Search for similar chunks in vector store
+            # Search for similar chunks in vector store; adaptive mode fetches up to
+            # the maximum depth and trims by score distribution
+            top_k = top_k or self.top_k
             similar_chunks = self.vector_store.search_similar(
                 query_embedding=query_embedding,
                 video_id=video_id,
-                top_k=self.top_k
+                top_k=max(top_k, Config.ADAPTIVE_MAX_CHUNKS) if self.adaptive else top_k,
+                video_ids=video_ids,
+                snapshot=snapshot
             )
+            if self.adaptive and similar_chunks:
+                similar_chunks = self._apply_adaptive_depth(similar_chunks, top_k)
             
             if not similar_chunks:
                 print("No relevant context found")
@@ -32,7 +132,8 @@ class Retriever:
                     'context': "",
                     'relevant_chunks': [],
                     'query': query,
-                    'video_id': video_id
+                    'video_id': video_id,
+                    'video_ids': video_ids
                 }
             
             # Combine relevant chunks into context
@@ -40,11 +141,16 @@ class Retriever:
             relevant_chunks = []
             
             for chunk in similar_chunks:
-                context_parts.append(chunk['text'])
+                if video_ids:
+                    # Label excerpts so the LLM can attribute and compare them
+                    context_parts.append(f"[Video {chunk['metadata']['video_id']}]\n{chunk['text']}")
+                else:
+                    context_parts.append(chunk['text'])
                 relevant_chunks.append({
                     'text': chunk['text'][:200] + "..." if len(chunk['text']) > 200 else chunk['text'],
                     'similarity': round(chunk['similarity'], 3),
-                    'chunk_id': chunk['metadata']['chunk_id']
+                    'chunk_id': chunk['metadata']['chunk_id'],
+                    'video_id': chunk['metadata']['video_id']
                 })
             
             # Join context with separators
@@ -57,6 +163,7 @@ class Retriever:
                 'relevant_chunks': relevant_chunks,
                 'query': query,
                 'video_id': video_id,
+                'video_ids': video_ids,
                 'total_chunks': len(similar_chunks)
             }
             
@@ -70,6 +177,82 @@ class Retriever:
                 'error': str(e)
             }
     
+    def _apply_adaptive_depth(self, similar_chunks: List[Dict[str, Any]], top_k: int) -> List[Dict[str, Any]]:
+        """
+        Trim candidates to the adaptive depth and account for prompt tokens saved
+        against the fixed top-k
+        """
+        depth = select_depth(
+            [chunk['similarity'] for chunk in similar_chunks],
+            max_k=max(top_k, Config.ADAPTIVE_MAX_CHUNKS)
+        )
+        kept = similar_chunks[:depth]
+        saved = sum(estimate_tokens(chunk['text']) for chunk in similar_chunks[:top_k]) - \
+            sum(estimate_tokens(chunk['text']) for chunk in kept)
+        
+        observe_retrieval_depth(depth)
+        with self._depth_lock:
+            self._depth_stats['queries'] += 1
+            self._depth_stats['chunks_kept'] += depth
+            self._depth_stats['prompt_tokens_saved'] += saved
+        return kept
+    
+    def get_depth_stats(self) -> Dict[str, Any]:
+        """
+        Adaptive depth statistics; tokens saved are relative to the fixed top-k (negative
+        when broad questions were given more context)
+        """
+        with self._depth_lock:
+            stats = dict(self._depth_stats)
+        queries = stats['queries']
+        return {
+            'enabled': self.adaptive,
+            'queries': queries,
+            'avg_chunks': round(stats['chunks_kept'] / queries, 2) if queries else 0.0,
+            'avg_prompt_tokens_saved': round(stats['prompt_tokens_saved'] / queries, 1) if queries else 0.0,
+            'fixed_top_k': self.top_k
+        }
+    
+    def search_corpus(self, query: str, max_videos: int = None, per_video_top_n: int = None) -> Dict[str, Any]:
+        """
+        Search every processed video and group the best hits by video
+        """
+        with span("retriever.search_corpus"):
+            try:
+                query_embedding, snapshot = self._encode_query(query)
+                
+                groups = self.vector_store.search_corpus(query_embedding, max_videos, per_video_top_n, snapshot)
+                
+                results = []
+                for group in groups:
+                    results.append({
+                        'video_id': group['video_id'],
+                        'score': round(group['score'], 3),
+                        'hits': [
+                            {
+                                'text': hit['text'][:200] + "..." if len(hit['text']) > 200 else hit['text'],
+                                'similarity': round(hit['similarity'], 3),
+                                'chunk_id': hit['metadata']['chunk_id']
+                            }
+                            for hit in group['hits']
+                        ]
+                    })
+                
+                return {
+                    'query': query,
+                    'results': results,
+                    'total_videos': len(results)
+                }
+                
+            except Exception as e:
+                print(f"Error searching corpus: {str(e)}")
+                return {
+                    'query': query,
+                    'results': [],
+                    'total_videos': 0,
+                    'error': str(e)
+                }
+    
     def retrieve_with_threshold(self, query: str, video_id: str = None, 
                               similarity_threshold: float = 0.5) -> Dict[str, Any]:
         """
@@ -127,18 +310,20 @@ class Retriever:
                 'error': str(e)
             }
     
-    def get_retrieval_stats(self) -> Dict[str, Any]:
+    def get_retrieval_stats(self, vector_stats: Dict[str, Any] = None) -> Dict[str, Any]:
         """
-        Get statistics about the retrieval system
+        Get statistics about the retrieval system; pass vector_stats to reuse
+        collection stats the caller already has
         """
         try:
-            vector_stats = self.vector_store.get_collection_stats()
+            vector_stats = vector_stats or self.vector_store.get_collection_stats()
             embedding_info = self.embedding_model.get_model_info()
             
             return {
                 'vector_store': vector_stats,
                 'embedding_model': embedding_info,
-                'top_k_chunks': self.top_k
+                'top_k_chunks': self.top_k,
+                'adaptive_depth': self.get_depth_stats()
             }
             
         except Exception as e:
@@ -0,0 +1,146 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Callable, List, Dict, Any, Optional
+from utils.text_processing import estimate_tokens
+from app.config import Config
+
+
+class ChatSession:
+    def __init__(self, session_id: str):
+        self.session_id = session_id
+        self.summary = ""
+        self.turns: List[Dict[str, str]] = []
+        self.updated_at = time.time()
+        self.compactions = 0
+        self.compacting = False
+        self.lock = threading.Lock()
+
+    def history_tokens(self) -> int:
+        return estimate_tokens(self.summary) + sum(
+            estimate_tokens(turn['query']) + estimate_tokens(turn['response']) for turn in self.turns
+        )
+
+
+def format_turns(turns: List[Dict[str, str]]) -> str:
+    return "\n".join(f"User: {turn['query']}\nAssistant: {turn['response']}" for turn in turns)
+
+
+class SessionStore:
+    """
+    Server-side chat sessions whose history is compacted into a rolling summary
+    once it passes a token budget
+    """
+    def __init__(self, token_budget: int = None, keep_recent_turns: int = None,
+                 max_sessions: int = None, ttl_seconds: float = None):
+        self.token_budget = token_budget or Config.SESSION_HISTORY_TOKEN_BUDGET
+        self.keep_recent_turns = Config.SESSION_KEEP_RECENT_TURNS if keep_recent_turns is None else keep_recent_turns
+        self.max_sessions = max_sessions or Config.SESSION_MAX_SESSIONS
+        self.ttl = ttl_seconds or Config.SESSION_TTL_SECONDS
+        self._sessions: "OrderedDict[str, ChatSession]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_create(self, session_id: Optional[str] = None) -> ChatSession:
+        """
+        Get a live session by ID, or start a new one. Unknown or expired IDs are never
+        adopted; the new session gets a server-minted ID the caller must return to the client
+        """
+        now = time.time()
+        with self._lock:
+            session = self._sessions.get(session_id) if session_id else None
+            if session and now - session.updated_at > self.ttl:
+                del self._sessions[session_id]
+                session = None
+
+            if session is None:
+                session = ChatSession(uuid.uuid4().hex)
+                self._sessions[session.session_id] = session
+                while len(self._sessions) > self.max_sessions:
+                    self._sessions.popitem(last=False)
+            else:
+                self._sessions.move_to_end(session.session_id)
+
+            session.updated_at = now
+            return session
+
+    def build_history(self, session: ChatSession) -> str:
+        """
+        Render the summary and recent turns for the prompt, never exceeding the token budget
+        """
+        with session.lock:
+            summary = session.summary
+            turns = list(session.turns)
+
+        parts = []
+        budget = self.token_budget - estimate_tokens(summary)
+        recent = []
+        # Walk back from the newest turn; anything older than the budget allows is
+        # left for the pending compaction to fold into the summary
+        for turn in reversed(turns):
+            text = format_turns([turn])
+            cost = estimate_tokens(text)
+            if cost > budget:
+                break
+            recent.append(text)
+            budget -= cost
+
+        if summary:
+            parts.append(f"Summary of earlier conversation:\n{summary}")
+        if recent:
+            parts.append("Recent messages:\n" + "\n".join(reversed(recent)))
+        return "\n\n".join(parts)
+
+    def add_turn(self, session: ChatSession, query: str, response: str) -> bool:
+        """
+        Record a completed exchange; returns True when the session needs compaction
+        """
+        with session.lock:
+            session.turns.append({'query': query, 'response': response})
+            session.updated_at = time.time()
+            return session.history_tokens() > self.token_budget
+
+    def compact(self, session: ChatSession, summarize: Callable[[str, str], str]):
+        """
+        Fold all but the most recent turns into the rolling summary
+        """
+        with session.lock:
+            if session.compacting or session.history_tokens() <= self.token_budget:
+                return
+            cutoff = max(0, len(session.turns) - self.keep_recent_turns)
+            old_turns = session.turns[:cutoff]
+            previous_summary = session.summary
+            if not old_turns:
+                return
+            session.compacting = True
+
+        try:
+            new_summary = summarize(previous_summary, format_turns(old_turns))
+
+            # Cap the summary itself so it cannot crowd out the recent turns
+            max_chars = Config.SESSION_SUMMARY_MAX_TOKENS * 4
+            if len(new_summary) > max_chars:
+                new_summary = new_summary[-max_chars:]
+
+            with session.lock:
+                # Turns may have been appended while summarizing; only drop the ones folded in
+                session.turns = session.turns[len(old_turns):]
+                session.summary = new_summary
+                session.compactions += 1
+            print(f"Compacted {len(old_turns)} turns of session {session.session_id}")
+        finally:
+            with session.lock:
+                session.compacting = False
+
+    def delete(self, session_id: str) -> bool:
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            sessions = list(self._sessions.values())
+        return {
+            'active_sessions': len(sessions),
+            'token_budget': self.token_budget,
+            'total_compactions': sum(session.compactions for session in sessions)
+        }
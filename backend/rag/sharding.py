@@ -0,0 +1,188 @@
+import hashlib
+import heapq
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional
+
+# Result keys merged across shards for get() and query()
+RESULT_KEYS = ('ids', 'documents', 'metadatas', 'embeddings', 'distances')
+
+
+def shard_index(video_id: str, shards: int) -> int:
+    """
+    Stable shard for a video (Python's hash() is salted per process, so use md5)
+    """
+    return int(hashlib.md5(video_id.encode("utf-8")).hexdigest(), 16) % shards
+
+
+def shard_paths(persist_directory: str, shards: int) -> List[str]:
+    return [os.path.join(persist_directory, f"shard_{i:02d}") for i in range(shards)]
+
+
+class ShardedCollection:
+    """
+    One logical collection spread over the same-named collection in every shard.
+    Writes are routed by the video_id in their metadata; reads filtered by video_id go
+    to the owning shards only, and unfiltered queries fan out in parallel and are merged
+    by distance. Mirrors the subset of the Chroma collection API the vector store uses.
+    """
+    def __init__(self, collections: List[Any], pool: ThreadPoolExecutor):
+        self.shards = collections
+        self.pool = pool
+
+    @property
+    def name(self) -> str:
+        return self.shards[0].name
+
+    @property
+    def metadata(self) -> Optional[Dict[str, Any]]:
+        return self.shards[0].metadata
+
+    def _route(self, video_ids: List[str]) -> Dict[int, List[str]]:
+        routed: Dict[int, List[str]] = {}
+        for video_id in video_ids:
+            routed.setdefault(shard_index(video_id, len(self.shards)), []).append(video_id)
+        return routed
+
+    def _targets(self, where: Optional[Dict[str, Any]]) -> List[tuple]:
+        """
+        (shard, where) pairs for a filter: only owning shards for a video_id filter, else all
+        """
+        condition = (where or {}).get('video_id')
+        if isinstance(condition, str):
+            return [(self.shards[shard_index(condition, len(self.shards))], where)]
+        if isinstance(condition, dict) and '$in' in condition and len(where) == 1:
+            return [
+                (self.shards[shard], {"video_id": {"$in": video_ids}})
+                for shard, video_ids in self._route(condition['$in']).items()
+            ]
+        return [(shard, where) for shard in self.shards]
+
+    def _map(self, fn, items: List[Any]) -> List[Any]:
+        if len(items) == 1:
+            return [fn(items[0])]
+        return list(self.pool.map(fn, items))
+
+    def _write(self, method: str, ids: List[str], metadatas: List[Dict[str, Any]], **columns):
+        grouped: Dict[int, List[int]] = {}
+        for position, metadata in enumerate(metadatas):
+            grouped.setdefault(shard_index(metadata['video_id'], len(self.shards)), []).append(position)
+        for shard, positions in grouped.items():
+            getattr(self.shards[shard], method)(
+                ids=[ids[p] for p in positions],
+                metadatas=[metadatas[p] for p in positions],
+                **{key: [values[p] for p in positions] for key, values in columns.items() if values is not None}
+            )
+
+    def add(self, ids: List[str], metadatas: List[Dict[str, Any]], embeddings=None, documents=None):
+        self._write('add', ids, metadatas, embeddings=embeddings, documents=documents)
+
+    def upsert(self, ids: List[str], metadatas: List[Dict[str, Any]], embeddings=None, documents=None):
+        self._write('upsert', ids, metadatas, embeddings=embeddings, documents=documents)
+
+    def delete(self, ids: List[str] = None, where: Dict[str, Any] = None):
+        if ids is not None:
+            # Chunk and centroid IDs do not name their shard; deleting a missing ID is a no-op
+            self._map(lambda shard: shard.delete(ids=ids), self.shards)
+        else:
+            self._map(lambda target: target[0].delete(where=target[1]), self._targets(where))
+
+    def count(self) -> int:
+        return sum(self._map(lambda shard: shard.count(), self.shards))
+
+    def shard_counts(self) -> List[int]:
+        return self._map(lambda shard: shard.count(), self.shards)
+
+    def get(self, ids: List[str] = None, where: Dict[str, Any] = None, limit: int = None,
+            offset: int = None, include: List[str] = None) -> Dict[str, Any]:
+        kwargs = {}
+        if include is not None:
+            kwargs['include'] = include
+        if ids is not None:
+            targets = [(shard, where) for shard in self.shards]
+            kwargs['ids'] = ids
+        else:
+            targets = self._targets(where)
+        if limit is not None:
+            # Every shard may hold the first rows of the merged page
+            kwargs['limit'] = (offset or 0) + limit
+
+        results = self._map(lambda target: target[0].get(where=target[1], **kwargs), targets)
+        merged = self._merge(results)
+        if limit is not None or offset:
+            start = offset or 0
+            end = start + limit if limit is not None else None
+            for key in RESULT_KEYS:
+                if merged.get(key) is not None:
+                    merged[key] = merged[key][start:end]
+        return merged
+
+    def query(self, query_embeddings: List[List[float]], n_results: int = 10,
+              where: Dict[str, Any] = None, include: List[str] = None) -> Dict[str, Any]:
+        include = list(include or ['documents', 'metadatas', 'distances'])
+        if 'distances' not in include:
+            include.append('distances')
+
+        def query_shard(target):
+            shard, shard_where = target
+            if shard.count() == 0:
+                return None
+            return shard.query(query_embeddings=query_embeddings, n_results=n_results,
+                               where=shard_where, include=include)
+
+        results = [r for r in self._map(query_shard, self._targets(where)) if r is not None]
+        merged = {key: [] for key in RESULT_KEYS if key == 'ids' or key in include}
+        for query_position in range(len(query_embeddings)):
+            rows = []
+            for result in results:
+                for i, distance in enumerate(result['distances'][query_position]):
+                    rows.append((distance, result, i))
+            best = heapq.nsmallest(n_results, rows, key=lambda row: row[0])
+            for key in merged:
+                merged[key].append([row[1][key][query_position][row[2]] for row in best])
+        return merged
+
+    @staticmethod
+    def _merge(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+        merged: Dict[str, Any] = {}
+        for key in RESULT_KEYS:
+            values = [result.get(key) for result in results]
+            if any(value is not None for value in values):
+                merged[key] = [row for value in values if value is not None for row in value]
+            else:
+                merged[key] = None
+        return merged
+
+
+class ShardedClient:
+    """
+    N independent PersistentClient directories presented as one client, so ingestion
+    writes and chat reads on different videos hit different SQLite files and HNSW indexes
+    """
+    def __init__(self, paths: List[str]):
+        import chromadb
+        self.paths = paths
+        self.clients = []
+        for path in paths:
+            os.makedirs(path, exist_ok=True)
+            self.clients.append(chromadb.PersistentClient(path=path))
+        self.pool = ThreadPoolExecutor(max_workers=len(paths), thread_name_prefix="vector-shard")
+
+    def get_or_create_collection(self, name: str, metadata: Dict[str, Any] = None) -> ShardedCollection:
+        return ShardedCollection(
+            [client.get_or_create_collection(name=name, metadata=metadata) for client in self.clients],
+            self.pool
+        )
+
+    def list_collections(self):
+        return self.clients[0].list_collections()
+
+    def delete_collection(self, name: str):
+        for client in self.clients:
+            client.delete_collection(name)
+
+    def get_max_batch_size(self) -> int:
+        return min(
+            client.get_max_batch_size() if hasattr(client, 'get_max_batch_size') else 5000
+            for client in self.clients
+        )
@@ -0,0 +1,186 @@
+import hashlib
+import json
+import os
+import re
+from typing import Iterator, List, Dict, Any
+
+# Caption formats that can be ingested from disk
+TRANSCRIPT_FILE_EXTENSIONS = ('.srt', '.vtt', '.json')
+
+TIMING_PATTERN = re.compile(
+    r'^\s*((?:\d+:)?\d{1,2}:\d{2}[\.,]\d{1,3})\s*-->\s*((?:\d+:)?\d{1,2}:\d{2}[\.,]\d{1,3})'
+)
+TAG_PATTERN = re.compile(r'<[^>]*>')
+VIDEO_ID_FIELD_PATTERN = re.compile(r'"video_id"\s*:\s*"([^"]+)"')
+# A recorded video_id names cache files and checkpoint directories, so only YouTube IDs are trusted
+YOUTUBE_VIDEO_ID_PATTERN = re.compile(r'^[a-zA-Z0-9_-]{11}$')
+READ_BLOCK_SIZE = 64 * 1024
+
+
+def parse_timestamp(value: str) -> float:
+    """
+    Seconds from an SRT (00:01:02,500) or VTT (00:01:02.500 or 01:02.500) timestamp
+    """
+    parts = value.replace(',', '.').split(':')
+    seconds = float(parts[-1])
+    for multiplier, part in zip((60, 3600), reversed(parts[:-1])):
+        seconds += int(part) * multiplier
+    return seconds
+
+
+def iter_caption_segments(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Stream cues from an SRT or VTT file line by line as {'start', 'duration', 'text'} segments.
+    Cue numbers, VTT headers, NOTE/STYLE blocks and inline tags are dropped, as are cues
+    repeating the previous one (rolling auto-captions).
+    """
+    start = end = None
+    lines: List[str] = []
+    previous_text = None
+    in_cue = False
+
+    def flush():
+        nonlocal previous_text
+        text = " ".join(lines).strip()
+        if start is not None and text and text != previous_text:
+            previous_text = text
+            return {'start': start, 'duration': round(max(0.0, end - start), 3), 'text': text}
+        return None
+
+    with open(path, 'r', encoding='utf-8-sig', errors='replace') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                if in_cue:
+                    segment = flush()
+                    if segment:
+                        yield segment
+                start = end = None
+                lines = []
+                in_cue = False
+                continue
+
+            timing = TIMING_PATTERN.match(line)
+            if timing:
+                start, end = parse_timestamp(timing.group(1)), parse_timestamp(timing.group(2))
+                lines = []
+                in_cue = True
+            elif in_cue:
+                text = TAG_PATTERN.sub('', line).strip()
+                if text:
+                    lines.append(text)
+            # Anything else (WEBVTT header, NOTE/STYLE blocks, cue identifiers) is skipped
+
+        if in_cue:
+            segment = flush()
+            if segment:
+                yield segment
+
+
+def iter_json_segments(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Stream the 'timestamps' entries of a transcript JSON written by DocumentLoader,
+    decoding one segment object at a time instead of the whole document
+    """
+    decoder = json.JSONDecoder()
+    with open(path, 'r', encoding='utf-8-sig') as f:
+        buffer = ""
+        position = -1
+        # Find the opening bracket of the timestamps array
+        while position < 0:
+            block = f.read(READ_BLOCK_SIZE)
+            if not block:
+                return
+            buffer += block
+            match = re.search(r'"timestamps"\s*:\s*\[', buffer)
+            if match:
+                position = match.end()
+            elif len(buffer) > READ_BLOCK_SIZE:
+                # Keep enough tail for a key split across blocks
+                buffer = buffer[-64:]
+        buffer = buffer[position:]
+
+        while True:
+            buffer = buffer.lstrip().lstrip(',').lstrip()
+            if buffer.startswith(']'):
+                return
+            try:
+                segment, end = decoder.raw_decode(buffer)
+            except json.JSONDecodeError:
+                block = f.read(READ_BLOCK_SIZE)
+                if not block:
+                    raise ValueError(f"Truncated transcript JSON: {path}")
+                buffer += block
+                continue
+            buffer = buffer[end:]
+            yield {
+                'start': segment['start'],
+                'duration': segment.get('duration', 0.0),
+                'text': segment['text']
+            }
+
+
+def iter_transcript_segments(path: str) -> Iterator[Dict[str, Any]]:
+    if path.lower().endswith('.json'):
+        return iter_json_segments(path)
+    return iter_caption_segments(path)
+
+
+def file_video_id(path: str) -> str:
+    """
+    Stable video_id for a transcript file: the YouTube id recorded in a DocumentLoader JSON,
+    otherwise derived from the file's content so renames and moves keep the same id
+    """
+    if path.lower().endswith('.json'):
+        with open(path, 'r', encoding='utf-8-sig') as f:
+            match = VIDEO_ID_FIELD_PATTERN.search(f.read(4096))
+        if match and YOUTUBE_VIDEO_ID_PATTERN.match(match.group(1)):
+            return match.group(1)
+
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(READ_BLOCK_SIZE), b''):
+            digest.update(block)
+    return f"file-{digest.hexdigest()[:16]}"
+
+
+def iter_transcript_files(root: str) -> Iterator[str]:
+    """
+    Transcript files under root (or root itself), walked lazily in sorted order
+    """
+    if os.path.isfile(root):
+        yield root
+        return
+    for directory, subdirectories, files in os.walk(root):
+        subdirectories.sort()
+        for name in sorted(files):
+            if name.lower().endswith(TRANSCRIPT_FILE_EXTENSIONS) and not name.endswith('.state.json'):
+                yield os.path.join(directory, name)
+
+
+def transcript_file_info(path: str) -> Dict[str, Any]:
+    """
+    Describe a transcript file the way validate_and_clean_url describes a URL, so it can
+    go through the same ingestion pipeline
+    """
+    if not os.path.isfile(path) or not path.lower().endswith(TRANSCRIPT_FILE_EXTENSIONS):
+        return {'valid': False, 'error': 'Not an SRT, VTT or transcript JSON file', 'original_url': path}
+    try:
+        path = os.path.abspath(path)
+        return {
+            'valid': True,
+            'video_id': file_video_id(path),
+            'original_url': path,
+            'clean_url': path,
+            'transcript_file': path,
+            'message': 'Transcript file accepted'
+        }
+    except Exception as e:
+        return {'valid': False, 'error': f'Error reading transcript file: {str(e)}', 'original_url': path}
+
+
+def is_transcript_path(entry: str) -> bool:
+    """
+    Whether a bulk-ingest input line names transcript files rather than a YouTube video
+    """
+    return os.path.isdir(entry) or (os.path.isfile(entry) and entry.lower().endswith(TRANSCRIPT_FILE_EXTENSIONS))
@@ -0,0 +1,77 @@
+import threading
+import time
+from typing import Optional, Dict, Tuple
+import requests
+from requests.adapters import HTTPAdapter
+from youtube_transcript_api import YouTubeTranscriptApi
+from app.config import Config
+
+
+class YouTubeTranscriptSource:
+    """
+    Transcript listing over one pooled, keep-alive HTTP session
+    """
+    def __init__(self, pool_size: int = None):
+        pool_size = pool_size or Config.TRANSCRIPT_HTTP_POOL_SIZE
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        # youtube-transcript-api >= 1.0 takes the session publicly; older releases
+        # only offer the classmethod, which opens its own connections
+        try:
+            self._api = YouTubeTranscriptApi(http_client=self.session)
+        except TypeError:
+            print("⚠️ youtube-transcript-api < 1.0: transcript fetches will not reuse pooled connections")
+            self._api = None
+
+    def list_transcripts(self, video_id: str):
+        if self._api is not None and hasattr(self._api, 'list'):
+            return self._api.list(video_id)
+        return YouTubeTranscriptApi.list_transcripts(video_id)
+
+
+class NegativeCache:
+    """
+    Remembers permanent transcript failures per video for a limited time
+    """
+    def __init__(self, ttl_seconds: float = None, max_entries: int = 10000):
+        self.ttl = Config.TRANSCRIPT_NEGATIVE_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+        self.max_entries = max_entries
+        self._entries: Dict[str, Tuple[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, video_id: str) -> Optional[str]:
+        """
+        Get the cached failure message for a video, if it has not expired
+        """
+        with self._lock:
+            entry = self._entries.get(video_id)
+            if entry is None:
+                return None
+            message, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[video_id]
+                return None
+            return message
+
+    def put(self, video_id: str, message: str):
+        if self.ttl <= 0:
+            return
+        now = time.monotonic()
+        with self._lock:
+            if len(self._entries) >= self.max_entries:
+                self._entries = {k: v for k, v in self._entries.items() if v[1] >= now}
+                if len(self._entries) >= self.max_entries:
+                    # Still full of live entries: drop the ones closest to expiry
+                    for key, _ in sorted(self._entries.items(), key=lambda item: item[1][1])[:self.max_entries // 10 or 1]:
+                        del self._entries[key]
+            self._entries[video_id] = (message, now + self.ttl)
+
+    def discard(self, video_id: str):
+        with self._lock:
+            self._entries.pop(video_id, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
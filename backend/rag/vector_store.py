@@ -1,105 +1,400 @@
-import chromadb
 import json
 import os
-from typing import List, Dict, Any, Optional
+import re
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Tuple
+import numpy as np
+from rag.sharding import ShardedClient, shard_paths
+from utils.tracing import span
 from app.config import Config
 
+DEFAULT_COLLECTION_NAME = "youtube_transcripts"
+ACTIVE_INDEX_FILENAME = "active_index.json"
+# Target of an embedding migration in progress, so a restart reopens it
+MIGRATION_STATE_FILENAME = "migration.json"
+SQLITE_FILENAME = "chroma.sqlite3"
+
+# A collection pair and the embedding model its vectors came from; swapped as one
+# object so a query never pairs one model's embedding with another model's index
+IndexSnapshot = namedtuple("IndexSnapshot", ["collection_name", "model_name", "collection", "video_collection"])
+
+
+def read_active_index(persist_directory: str = None) -> Dict[str, Any]:
+    """
+    Read the pointer to the collection (and embedding model) currently serving queries
+    """
+    path = os.path.join(persist_directory or Config.VECTOR_STORE_PATH, ACTIVE_INDEX_FILENAME)
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _centroid(embeddings) -> np.ndarray:
+    centroid = np.asarray(embeddings, dtype=np.float32).mean(axis=0)
+    norm = np.linalg.norm(centroid)
+    return centroid / norm if norm > 0 else centroid
+
+
+def versioned_collection_name(collection_name: str, version: int) -> str:
+    return f"{re.sub(r'_v[0-9]+$', '', collection_name)}_v{version}"
+
+
 class VectorStore:
-    def __init__(self, collection_name: str = "youtube_transcripts"):
-        self.collection_name = collection_name
+    def __init__(self, collection_name: str = None):
         self.persist_directory = Config.VECTOR_STORE_PATH
+        active_index = read_active_index(self.persist_directory)
+        if collection_name is None:
+            collection_name = active_index.get('collection_name', DEFAULT_COLLECTION_NAME)
+        # Write lock: lets an embedding migration catch up and switch without missing a write
+        self.write_lock = threading.RLock()
+        self.shards = self._shard_count(active_index)
         
         try:
-            # Initialize ChromaDB client
-            self.client = chromadb.PersistentClient(path=self.persist_directory)
-            print(f"ChromaDB client initialized with path: {self.persist_directory}")
-            
-            # Get or create collection
-            self.collection = self.client.get_or_create_collection(
-                name=self.collection_name,
-                metadata={"description": "YouTube video transcripts for RAG chatbot"}
-            )
-            print(f"Collection '{self.collection_name}' ready")
+            # Initialize ChromaDB client (imported here to keep app import fast)
+            if self.shards > 1:
+                self.client = ShardedClient(shard_paths(self.persist_directory, self.shards))
+                print(f"ChromaDB client initialized with {self.shards} shards under: {self.persist_directory}")
+            else:
+                import chromadb
+                self.client = chromadb.PersistentClient(path=self.persist_directory)
+                print(f"ChromaDB client initialized with path: {self.persist_directory}")
+            
+            # Restore collections left mid-swap by a crashed compaction before opening them
+            from rag.maintenance import recover_interrupted_rebuilds
+            for client in getattr(self.client, 'clients', [self.client]):
+                recover_interrupted_rebuilds(client)
+            
+            model_name = active_index.get('embedding_model') \
+                if active_index.get('collection_name') == collection_name else None
+            self._active = self.open_snapshot(collection_name, model_name)
+            if self.shards > 1 and 'shards' not in active_index:
+                # Pin the layout: video routing depends on the shard count
+                self._write_active_index(self._active)
+            print(f"Collection '{self.collection_name}' ready (embedding model: {self.model_name})")
+            
+            self._search_pool = ThreadPoolExecutor(max_workers=Config.CORPUS_SEARCH_PARALLELISM)
             
         except Exception as e:
             print(f"Error initializing vector store: {str(e)}")
             raise Exception(f"Failed to initialize vector store: {str(e)}")
     
-    def add_documents(self, video_id: str, chunks: List[Dict[str, Any]]) -> bool:
+    def _shard_count(self, active_index: Dict[str, Any]) -> int:
+        """
+        Shard count of an existing store, or the configured one for a new store
+        """
+        if active_index.get('shards'):
+            shards = active_index['shards']
+        elif os.path.exists(os.path.join(self.persist_directory, SQLITE_FILENAME)):
+            # Created before sharding: all videos live in the single top-level client
+            shards = 1
+        else:
+            shards = max(1, Config.VECTOR_STORE_SHARDS)
+        if shards != Config.VECTOR_STORE_SHARDS:
+            print(f"⚠️ Vector store has {shards} shard(s); ignoring VECTOR_STORE_SHARDS={Config.VECTOR_STORE_SHARDS}")
+        return shards
+    
+    @property
+    def collection(self):
+        return self._active.collection
+    
+    @property
+    def video_collection(self):
+        return self._active.video_collection
+    
+    @property
+    def collection_name(self) -> str:
+        return self._active.collection_name
+    
+    @property
+    def model_name(self) -> str:
+        return self._active.model_name
+    
+    def snapshot(self) -> IndexSnapshot:
+        """
+        The collections and embedding model serving queries right now
+        """
+        return self._active
+    
+    def open_snapshot(self, collection_name: str, model_name: str = None) -> IndexSnapshot:
+        """
+        Get or create a collection pair; the embedding model is recorded in its metadata
+        """
+        model_name = model_name or Config.EMBEDDING_MODEL
+        collection = self.client.get_or_create_collection(
+            name=collection_name,
+            metadata={
+                "description": "YouTube video transcripts for RAG chatbot",
+                "embedding_model": model_name
+            }
+        )
+        model_name = (collection.metadata or {}).get("embedding_model", model_name)
+        
+        # One centroid vector per video, used to pick candidate videos for corpus-wide search
+        video_collection = self.client.get_or_create_collection(
+            name=f"{collection_name}_videos",
+            metadata={"description": "Per-video centroid embeddings for corpus search"}
+        )
+        return IndexSnapshot(collection_name, model_name, collection, video_collection)
+    
+    def next_collection_name(self) -> str:
+        """
+        Name for the next versioned collection, e.g. youtube_transcripts_v2
+        """
+        names = {c.name if hasattr(c, 'name') else c for c in self.client.list_collections()}
+        version = 2
+        while versioned_collection_name(self.collection_name, version) in names:
+            version += 1
+        return versioned_collection_name(self.collection_name, version)
+    
+    def read_migration_target(self) -> Dict[str, Any]:
+        """
+        The collection and embedding model of an unfinished migration, if any
+        """
+        path = os.path.join(self.persist_directory, MIGRATION_STATE_FILENAME)
+        if not os.path.exists(path):
+            return {}
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    
+    def save_migration_target(self, collection_name: str, model_name: str):
+        path = os.path.join(self.persist_directory, MIGRATION_STATE_FILENAME)
+        with open(path + ".tmp", 'w', encoding='utf-8') as f:
+            json.dump({'collection_name': collection_name, 'embedding_model': model_name,
+                       'started_at': time.time()}, f)
+        os.replace(path + ".tmp", path)
+    
+    def clear_migration_target(self):
+        path = os.path.join(self.persist_directory, MIGRATION_STATE_FILENAME)
+        if os.path.exists(path):
+            os.remove(path)
+    
+    def drop_collections(self, collection_name: str):
         """
-        Add document chunks to the vector store
+        Delete a collection pair that is not serving queries, e.g. an abandoned migration target
+        """
+        if collection_name == self.collection_name:
+            raise ValueError(f"Refusing to drop the active collection '{collection_name}'")
+        for name in (collection_name, f"{collection_name}_videos"):
+            try:
+                self.client.delete_collection(name)
+            except Exception as e:
+                print(f"Error deleting collection '{name}': {str(e)}")
+    
+    def activate(self, snapshot: IndexSnapshot):
+        """
+        Atomically switch queries and writes to another collection and record it on disk
+        """
+        with self.write_lock:
+            self._write_active_index(snapshot, self._active)
+            self._active = snapshot
+        print(f"Active collection is now '{snapshot.collection_name}' ({snapshot.model_name})")
+    
+    def _write_active_index(self, snapshot: IndexSnapshot, previous: IndexSnapshot = None):
+        pointer = {
+            'collection_name': snapshot.collection_name,
+            'embedding_model': snapshot.model_name,
+            'shards': self.shards,
+            'activated_at': time.time()
+        }
+        if previous is not None:
+            pointer['previous'] = {
+                'collection_name': previous.collection_name,
+                'embedding_model': previous.model_name
+            }
+        path = os.path.join(self.persist_directory, ACTIVE_INDEX_FILENAME)
+        with open(path + ".tmp", 'w', encoding='utf-8') as f:
+            json.dump(pointer, f)
+        os.replace(path + ".tmp", path)
+    
+    def list_videos(self, snapshot: IndexSnapshot = None) -> List[str]:
+        """
+        IDs of all videos with a centroid in the given (or active) collection
+        """
+        active = snapshot or self._active
+        return active.video_collection.get(include=[])['ids']
+    
+    def add_documents(self, video_id: str, chunks: List[Dict[str, Any]], model_name: str = None,
+                      snapshot: IndexSnapshot = None) -> bool:
+        """
+        Add document chunks to the vector store. When model_name is given, the write is
+        refused if it does not match the collection's embedding model.
         """
         try:
-            # Check if video already exists
-            if self.video_exists(video_id):
-                print(f"Video {video_id} already exists in vector store")
-                return True
-            
-            # Prepare data for ChromaDB
-            documents = []
-            embeddings = []
-            ids = []
-            metadatas = []
-            
-            for chunk in chunks:
-                # Create unique ID for each chunk
-                chunk_id = f"{video_id}_{chunk['id']}"
-                
-                documents.append(chunk['text'])
-                embeddings.append(chunk['embedding'])
-                ids.append(chunk_id)
-                metadatas.append({
-                    'video_id': video_id,
-                    'chunk_id': chunk['id'],
-                    'length': chunk['length']
-                })
-            
-            # Add to collection
-            self.collection.add(
-                documents=documents,
-                embeddings=embeddings,
-                ids=ids,
-                metadatas=metadatas
+            with self.write_lock:
+                return self._add_documents(video_id, chunks, model_name, snapshot or self._active)
+        except Exception as e:
+            print(f"Error adding documents to vector store: {str(e)}")
+            return False
+    
+    def _add_documents(self, video_id: str, chunks: List[Dict[str, Any]], model_name: Optional[str],
+                       active: IndexSnapshot) -> bool:
+        if model_name and model_name != active.model_name:
+            print(f"Refusing {model_name} embeddings for collection '{active.collection_name}' "
+                  f"({active.model_name})")
+            return False
+        
+        # Check if video already exists
+        if self.video_exists(video_id, active):
+            print(f"Video {video_id} already exists in vector store")
+            return True
+        
+        # Prepare data for ChromaDB
+        documents = []
+        embeddings = []
+        ids = []
+        metadatas = []
+        
+        for chunk in chunks:
+            # Create unique ID for each chunk
+            chunk_id = f"{video_id}_{chunk['id']}"
+            
+            documents.append(chunk['text'])
+            embeddings.append(chunk['embedding'])
+            ids.append(chunk_id)
+            metadatas.append({
+                'video_id': video_id,
+                'chunk_id': chunk['id'],
+                'length': chunk['length']
+            })
+        
+        # Add to collection
+        active.collection.add(
+            documents=documents,
+            embeddings=embeddings,
+            ids=ids,
+            metadatas=metadatas
+        )
+        self._update_video_centroid(video_id, embeddings, active)
+        
+        print(f"Added {len(chunks)} chunks for video {video_id} to vector store")
+        return True
+
+    def add_videos(self, videos: Dict[str, Tuple[List[Dict[str, Any]], np.ndarray]], model_name: str,
+                   snapshot: IndexSnapshot = None) -> List[str]:
+        """
+        Bulk-load videos whose chunks already have embeddings (e.g. from exported bundles),
+        writing all of them in max-size batches. Videos already stored are left alone.
+        Returns the IDs that were added. Raises if the write fails, after removing any
+        chunks this call already added.
+        """
+        if not videos:
+            return []
+        with self.write_lock, span("vector_store.add_videos", videos=len(videos)):
+            active = snapshot or self._active
+            if model_name != active.model_name:
+                raise ValueError(f"Refusing {model_name} embeddings for collection "
+                                 f"'{active.collection_name}' ({active.model_name})")
+            
+            present = set(active.video_collection.get(ids=list(videos), include=[])['ids'])
+            added = [video_id for video_id in videos if video_id not in present]
+            
+            ids, documents, metadatas, embedding_blocks = [], [], [], []
+            for video_id in added:
+                chunks, embeddings = videos[video_id]
+                for chunk in chunks:
+                    ids.append(f"{video_id}_{chunk['id']}")
+                    documents.append(chunk['text'])
+                    metadatas.append({
+                        'video_id': video_id,
+                        'chunk_id': chunk['id'],
+                        'length': chunk['length']
+                    })
+                embedding_blocks.append(np.asarray(embeddings, dtype=np.float32))
+            if not ids:
+                return []
+            embeddings = np.concatenate(embedding_blocks)
+            
+            batch_size = self.client.get_max_batch_size() \
+                if hasattr(self.client, 'get_max_batch_size') else 5000
+            try:
+                for start in range(0, len(ids), batch_size):
+                    end = start + batch_size
+                    active.collection.add(
+                        ids=ids[start:end],
+                        documents=documents[start:end],
+                        embeddings=embeddings[start:end].tolist(),
+                        metadatas=metadatas[start:end]
+                    )
+                active.video_collection.upsert(
+                    ids=added,
+                    embeddings=[_centroid(videos[video_id][1]).tolist() for video_id in added],
+                    metadatas=[{'video_id': video_id, 'chunk_count': len(videos[video_id][0])} for video_id in added]
+                )
+            except Exception as e:
+                print(f"Error bulk-loading videos: {str(e)}")
+                try:
+                    active.collection.delete(ids=ids)
+                except Exception as cleanup_error:
+                    print(f"Error removing partially loaded chunks: {str(cleanup_error)}")
+                raise
+        
+        print(f"Bulk-loaded {len(ids)} chunks for {len(added)} videos")
+        return added
+    
+    def export_video(self, video_id: str, snapshot: IndexSnapshot = None) -> Optional[Dict[str, Any]]:
+        """
+        A video's chunks in order with their stored embeddings, or None if it is not stored
+        """
+        try:
+            active = snapshot or self._active
+            results = active.collection.get(
+                where={"video_id": video_id},
+                include=['documents', 'metadatas', 'embeddings']
             )
+            if not results['ids']:
+                return None
             
-            print(f"Added {len(chunks)} chunks for video {video_id} to vector store")
-            return True
+            order = sorted(range(len(results['ids'])), key=lambda i: results['metadatas'][i]['chunk_id'])
+            chunks = [
+                {
+                    'id': results['metadatas'][i]['chunk_id'],
+                    'text': results['documents'][i],
+                    'length': results['metadatas'][i].get('length', len(results['documents'][i]))
+                }
+                for i in order
+            ]
+            embeddings = np.asarray(results['embeddings'], dtype=np.float32)[order]
+            return {'chunks': chunks, 'embeddings': embeddings, 'embedding_model': active.model_name}
             
         except Exception as e:
-            print(f"Error adding documents to vector store: {str(e)}")
-            return False
+            print(f"Error exporting video {video_id}: {str(e)}")
+            return None
     
     def search_similar(self, query_embedding: List[float], 
                       video_id: str = None, 
-                      top_k: int = None) -> List[Dict[str, Any]]:
+                      top_k: int = None,
+                      video_ids: List[str] = None,
+                      snapshot: IndexSnapshot = None) -> List[Dict[str, Any]]:
         """
-        Search for similar documents in the vector store
+        Search for similar documents in the vector store, optionally restricted
+        to one video or to a set of videos (one query, global top-k)
         """
         try:
             top_k = top_k or Config.TOP_K_CHUNKS
+            active = snapshot or self._active
             
-            # Prepare where clause for filtering by video_id if provided
-            where_clause = {"video_id": video_id} if video_id else None
+            # Prepare where clause for filtering by video_id(s) if provided
+            if video_ids and len(video_ids) > 1:
+                where_clause = {"video_id": {"$in": list(video_ids)}}
+            elif video_ids:
+                where_clause = {"video_id": video_ids[0]}
+            else:
+                where_clause = {"video_id": video_id} if video_id else None
             
             # Query the collection
-            results = self.collection.query(
-                query_embeddings=[query_embedding],
-                n_results=top_k,
-                where=where_clause,
-                include=['documents', 'metadatas', 'distances']
-            )
+            with span("vector_store.search_similar", video_id=video_id, top_k=top_k):
+                results = active.collection.query(
+                    query_embeddings=[query_embedding],
+                    n_results=top_k,
+                    where=where_clause,
+                    include=['documents', 'metadatas', 'distances']
+                )
             
-            # Format results
-            similar_chunks = []
-            if results['documents'] and results['documents'][0]:
-                for i in range(len(results['documents'][0])):
-                    chunk = {
-                        'text': results['documents'][0][i],
-                        'metadata': results['metadatas'][0][i],
-                        'distance': results['distances'][0][i],
-                        'similarity': 1 - results['distances'][0][i]  # Convert distance to similarity
-                    }
-                    similar_chunks.append(chunk)
+            similar_chunks = self._format_query_results(results)
             
             print(f"Found {len(similar_chunks)} similar chunks")
             return similar_chunks
@@ -108,12 +403,127 @@ class VectorStore:
             print(f"Error searching vector store: {str(e)}")
             return []
     
-    def video_exists(self, video_id: str) -> bool:
+    def _format_query_results(self, results: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Convert a single-query ChromaDB result into chunk dicts
+        """
+        similar_chunks = []
+        if results['documents'] and results['documents'][0]:
+            for i in range(len(results['documents'][0])):
+                chunk = {
+                    'text': results['documents'][0][i],
+                    'metadata': results['metadatas'][0][i],
+                    'distance': results['distances'][0][i],
+                    'similarity': 1 - results['distances'][0][i]  # Convert distance to similarity
+                }
+                similar_chunks.append(chunk)
+        return similar_chunks
+    
+    def _update_video_centroid(self, video_id: str, embeddings: List[List[float]],
+                               active: IndexSnapshot = None):
+        """
+        Store the normalized mean of a video's chunk embeddings
+        """
+        active = active or self._active
+        if len(embeddings) == 0:
+            return
+        active.video_collection.upsert(
+            ids=[video_id],
+            embeddings=[_centroid(embeddings).tolist()],
+            metadatas=[{'video_id': video_id, 'chunk_count': len(embeddings)}]
+        )
+    
+    def rebuild_video_index(self, snapshot: IndexSnapshot = None) -> int:
+        """
+        Recompute centroids for videos that are missing one (e.g. ingested before corpus search existed)
+        """
+        active = snapshot or self._active
+        indexed = set(active.video_collection.get(include=[])['ids'])
+        all_metadata = active.collection.get(include=['metadatas'])
+        missing = {m['video_id'] for m in all_metadata['metadatas'] or []} - indexed
+        
+        for video_id in missing:
+            results = active.collection.get(where={"video_id": video_id}, include=['embeddings'])
+            self._update_video_centroid(video_id, results['embeddings'], active)
+        
+        if missing:
+            print(f"Built corpus-search centroids for {len(missing)} videos")
+        return len(missing)
+    
+    def search_corpus(self, query_embedding: List[float], max_videos: int = None,
+                      per_video_top_n: int = None, snapshot: IndexSnapshot = None) -> List[Dict[str, Any]]:
+        """
+        Search the whole corpus and return the best hits grouped by video.
+        Candidate videos come from the centroid index, plus the videos of the best chunks
+        corpus-wide so a single strong chunk is not lost to a far-off centroid; each
+        candidate then gets an exact per-video top-n query, run in parallel.
+        """
+        try:
+            max_videos = max_videos or Config.CORPUS_SEARCH_MAX_VIDEOS
+            per_video_top_n = per_video_top_n or Config.CORPUS_SEARCH_PER_VIDEO_TOP_N
+            active = snapshot or self._active
+            
+            if active.video_collection.count() == 0 and active.collection.count() > 0:
+                self.rebuild_video_index(active)
+            
+            video_count = active.video_collection.count()
+            if video_count == 0:
+                return []
+            
+            with span("vector_store.search_corpus.candidates", max_videos=max_videos):
+                candidates = active.video_collection.query(
+                    query_embeddings=[query_embedding],
+                    n_results=min(video_count, max_videos * Config.CORPUS_SEARCH_CANDIDATE_FACTOR),
+                    include=['metadatas']
+                )
+            candidate_ids = candidates['ids'][0] if candidates['ids'] else []
+            
+            chunk_count = active.collection.count()
+            if Config.CORPUS_SEARCH_GLOBAL_CHUNKS > 0 and chunk_count > 0:
+                with span("vector_store.search_corpus.global_chunks"):
+                    strongest = active.collection.query(
+                        query_embeddings=[query_embedding],
+                        n_results=min(chunk_count, Config.CORPUS_SEARCH_GLOBAL_CHUNKS),
+                        include=['metadatas']
+                    )
+                metadatas = strongest['metadatas'][0] if strongest['metadatas'] else []
+                candidate_ids = list(dict.fromkeys(
+                    candidate_ids + [metadata['video_id'] for metadata in metadatas]
+                ))
+            
+            def search_video(video_id: str) -> Dict[str, Any]:
+                results = active.collection.query(
+                    query_embeddings=[query_embedding],
+                    n_results=per_video_top_n,
+                    where={"video_id": video_id},
+                    include=['documents', 'metadatas', 'distances']
+                )
+                hits = self._format_query_results(results)
+                return {
+                    'video_id': video_id,
+                    'score': max((hit['similarity'] for hit in hits), default=0.0),
+                    'hits': hits
+                }
+            
+            with span("vector_store.search_corpus.per_video", candidates=len(candidate_ids)):
+                groups = list(self._search_pool.map(search_video, candidate_ids))
+            
+            groups = [group for group in groups if group['hits']]
+            groups.sort(key=lambda group: group['score'], reverse=True)
+            
+            print(f"Corpus search matched {len(groups)} videos")
+            return groups[:max_videos]
+            
+        except Exception as e:
+            print(f"Error searching corpus: {str(e)}")
+            return []
+    
+    def video_exists(self, video_id: str, snapshot: IndexSnapshot = None) -> bool:
         """
         Check if a video already exists in the vector store
         """
         try:
-            results = self.collection.get(
+            results = (snapshot or self._active).collection.get(
                 where={"video_id": video_id},
                 limit=1
             )
@@ -122,6 +532,17 @@ class VectorStore:
             print(f"Error checking if video exists: {str(e)}")
             return False
     
+    def count_video_chunks(self, video_id: str) -> int:
+        """
+        Count the chunks stored for a video without fetching their documents
+        """
+        try:
+            results = self.collection.get(where={"video_id": video_id}, include=[])
+            return len(results['ids'])
+        except Exception as e:
+            print(f"Error counting video chunks: {str(e)}")
+            return 0
+    
     def get_video_chunks(self, video_id: str) -> List[Dict[str, Any]]:
         """
         Get all chunks for a specific video
@@ -151,45 +572,68 @@ class VectorStore:
         """
         Delete all chunks for a specific video
         """
+        deleted = self.delete_videos([video_id])
+        if video_id in deleted:
+            print(f"Deleted {deleted[video_id]} chunks for video {video_id}")
+            return True
+        print(f"No chunks found for video {video_id}")
+        return False
+    
+    def delete_videos(self, video_ids: List[str], snapshot: IndexSnapshot = None) -> Dict[str, int]:
+        """
+        Delete all chunks for many videos with one metadata lookup.
+        Returns the number of chunks deleted per video that was found.
+        """
+        video_ids = list(dict.fromkeys(video_ids))
+        if not video_ids:
+            return {}
         try:
-            # Get all IDs for the video
-            results = self.collection.get(
-                where={"video_id": video_id}
-            )
-            
-            if results['ids']:
-                self.collection.delete(
-                    ids=results['ids']
-                )
-                print(f"Deleted {len(results['ids'])} chunks for video {video_id}")
-                return True
-            else:
-                print(f"No chunks found for video {video_id}")
-                return False
+            where_clause = {"video_id": {"$in": video_ids}} if len(video_ids) > 1 \
+                else {"video_id": video_ids[0]}
+            with self.write_lock, span("vector_store.delete_videos", videos=len(video_ids)):
+                active = snapshot or self._active
+                results = active.collection.get(where=where_clause, include=['metadatas'])
+                
+                deleted: Dict[str, int] = {}
+                for metadata in results['metadatas'] or []:
+                    deleted[metadata['video_id']] = deleted.get(metadata['video_id'], 0) + 1
                 
+                ids = results['ids']
+                batch_size = self.client.get_max_batch_size() \
+                    if hasattr(self.client, 'get_max_batch_size') else 5000
+                for start in range(0, len(ids), batch_size):
+                    active.collection.delete(ids=ids[start:start + batch_size])
+                if deleted:
+                    active.video_collection.delete(ids=list(deleted))
+            
+            print(f"Deleted {len(ids)} chunks across {len(deleted)} videos")
+            return deleted
+            
         except Exception as e:
             print(f"Error deleting video chunks: {str(e)}")
-            return False
+            return {}
     
     def get_collection_stats(self) -> Dict[str, Any]:
         """
         Get statistics about the collection
         """
         try:
-            count = self.collection.count()
+            active = self._active
+            count = active.collection.count()
             
-            # Get unique video count
-            all_metadata = self.collection.get(include=['metadatas'])
-            unique_videos = set()
-            if all_metadata['metadatas']:
-                for metadata in all_metadata['metadatas']:
-                    unique_videos.add(metadata['video_id'])
+            # One centroid per video, so this is a count rather than a metadata scan
+            unique_videos = active.video_collection.count()
             
-            return {
+            stats = {
                 'total_chunks': count,
-                'unique_videos': len(unique_videos),
-                'collection_name': self.collection_name
+                'unique_videos': unique_videos,
+                'collection_name': self.collection_name,
+                'embedding_model': self.model_name,
+                'shards': self.shards
             }
+            if self.shards > 1:
+                stats['shard_chunks'] = active.collection.shard_counts()
+            return stats
             
         except Exception as e:
             print(f"Error getting collection stats: {str(e)}")
@@ -200,14 +644,13 @@ class VectorStore:
         Clear all data from the collection
         """
         try:
-            # Delete the collection
-            self.client.delete_collection(self.collection_name)
-            
-            # Recreate the collection
-            self.collection = self.client.get_or_create_collection(
-                name=self.collection_name,
-                metadata={"description": "YouTube video transcripts for RAG chatbot"}
-            )
+            with self.write_lock:
+                # Delete the collections
+                self.client.delete_collection(self.collection_name)
+                self.client.delete_collection(self.video_collection.name)
+                
+                # Recreate the collections
+                self._active = self.open_snapshot(self.collection_name, self.model_name)
             
             print(f"Collection '{self.collection_name}' cleared")
             return True
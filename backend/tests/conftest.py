@@ -0,0 +1,16 @@
+import os
+import sys
+import pytest
+
+# Tests run from backend/ imports, like the app itself
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import Config
+
+
+@pytest.fixture
+def transcripts_path(tmp_path, monkeypatch):
+    path = tmp_path / "transcripts"
+    path.mkdir()
+    monkeypatch.setattr(Config, "TRANSCRIPTS_PATH", str(path))
+    return path
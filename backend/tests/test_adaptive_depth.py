@@ -0,0 +1,70 @@
+import pytest
+from app.config import Config
+from rag.retriever import Retriever, select_depth
+
+
+def chunks_for(similarities, text="x" * 40):
+    return [{'text': text, 'similarity': score, 'metadata': {'video_id': "abcdefghijk", 'chunk_id': i}}
+            for i, score in enumerate(similarities)]
+
+
+def test_flat_scores_keep_the_max_depth():
+    assert select_depth([0.8] * 12, min_k=2, max_k=10, score_gap=0.08, mass_fraction=0.8) == 10
+
+
+def test_sharp_gap_cuts_after_the_leaders():
+    scores = [0.90, 0.88, 0.87, 0.60, 0.58, 0.57, 0.55]
+    assert select_depth(scores, min_k=2, max_k=10, score_gap=0.08, mass_fraction=1.0) == 3
+
+
+def test_mass_fraction_cuts_a_steady_decline():
+    scores = [0.9, 0.85, 0.8, 0.75, 0.7, 0.65, 0.6, 0.55, 0.5]
+    # Weights above the weakest score are 0.4, 0.35, ...; 80% of the mass is reached at the 5th
+    assert select_depth(scores, min_k=2, max_k=10, score_gap=0.08, mass_fraction=0.8) == 5
+
+
+def test_clear_winner_is_raised_to_min_depth():
+    scores = [0.95, 0.40, 0.39, 0.38]
+    assert select_depth(scores, min_k=2, max_k=10, score_gap=0.08, mass_fraction=0.8) == 2
+
+
+@pytest.mark.parametrize("scores, expected", [
+    ([], 0),
+    ([0.9], 1),
+    ([0.9, 0.1], 2),
+])
+def test_fewer_candidates_than_min_depth_keeps_them_all(scores, expected):
+    assert select_depth(scores, min_k=3, max_k=10, score_gap=0.08, mass_fraction=0.8) == expected
+
+
+def test_config_defaults_are_used(monkeypatch):
+    monkeypatch.setattr(Config, "ADAPTIVE_MIN_CHUNKS", 1)
+    monkeypatch.setattr(Config, "ADAPTIVE_MAX_CHUNKS", 4)
+    monkeypatch.setattr(Config, "ADAPTIVE_SCORE_GAP", 0.5)
+    monkeypatch.setattr(Config, "ADAPTIVE_MASS_FRACTION", 0.8)
+    assert select_depth([0.9] * 6) == 4
+    assert select_depth([0.9, 0.2, 0.1]) == 1
+
+
+def test_apply_adaptive_depth_trims_and_counts_saved_tokens():
+    retriever = Retriever(embedding_model=object(), vector_store=object())
+    candidates = chunks_for([0.90, 0.88, 0.87, 0.60, 0.58, 0.57])
+
+    kept = retriever._apply_adaptive_depth(candidates, top_k=5)
+
+    assert kept == candidates[:3]
+    stats = retriever.get_depth_stats()
+    assert stats['queries'] == 1 and stats['avg_chunks'] == 3
+    # Two fewer 10-token chunks than the fixed top-5
+    assert stats['avg_prompt_tokens_saved'] == 20
+
+
+def test_apply_adaptive_depth_can_go_past_top_k_for_flat_scores():
+    retriever = Retriever(embedding_model=object(), vector_store=object())
+    candidates = chunks_for([0.8] * 12)
+
+    kept = retriever._apply_adaptive_depth(candidates, top_k=5)
+
+    assert len(kept) == Config.ADAPTIVE_MAX_CHUNKS
+    # Broad questions get more context than the fixed top-k
+    assert retriever.get_depth_stats()['avg_prompt_tokens_saved'] == -50
@@ -0,0 +1,110 @@
+import numpy as np
+import pytest
+from rag.bundles import bundle_path, export_videos, import_bundles, read_bundle
+
+MODEL = "all-MiniLM-L6-v2"
+VIDEO_ID = "abcdefghijk"
+CHUNKS = [{'id': 0, 'text': "first chunk", 'length': 11}, {'id': 1, 'text': "zweiter Abschnitt ü", 'length': 19}]
+TRANSCRIPT = {'video_id': VIDEO_ID, 'url': f"https://www.youtube.com/watch?v={VIDEO_ID}",
+              'full_text': "first chunk zweiter Abschnitt ü", 'segments': []}
+
+
+class FakeVectorStore:
+    def __init__(self, model_name=MODEL, stored=None):
+        self.model_name = model_name
+        self.stored = dict(stored or {})
+
+    def export_video(self, video_id):
+        if video_id not in self.stored:
+            return None
+        chunks, embeddings = self.stored[video_id]
+        return {'chunks': chunks, 'embeddings': embeddings, 'embedding_model': self.model_name}
+
+    def add_videos(self, videos, model_name):
+        assert model_name == self.model_name
+        added = [video_id for video_id in videos if video_id not in self.stored]
+        for video_id in added:
+            self.stored[video_id] = videos[video_id]
+        return added
+
+
+class FakeDocumentLoader:
+    def __init__(self, transcripts=None):
+        self.transcripts = dict(transcripts or {})
+
+    def get_cached_transcript(self, video_id):
+        return self.transcripts.get(video_id)
+
+    def cache_transcript(self, document_data):
+        self.transcripts[document_data['video_id']] = document_data
+
+
+class FakeAccessTracker:
+    def __init__(self):
+        self.recorded = {}
+
+    def record_video(self, video_id, **footprint):
+        self.recorded[video_id] = footprint
+
+
+@pytest.fixture
+def embeddings():
+    return np.random.default_rng(0).standard_normal((len(CHUNKS), 8)).astype(np.float32)
+
+
+def test_export_import_round_trip(tmp_path, embeddings):
+    source = FakeVectorStore(stored={VIDEO_ID: (CHUNKS, embeddings)})
+    summary = export_videos(source, [VIDEO_ID, "missingvid0"], str(tmp_path),
+                            FakeDocumentLoader({VIDEO_ID: TRANSCRIPT}))
+    assert summary['exported'] == [VIDEO_ID]
+    assert summary['missing'] == ["missingvid0"]
+
+    target = FakeVectorStore()
+    loader = FakeDocumentLoader()
+    tracker = FakeAccessTracker()
+    result = import_bundles(target, [str(tmp_path)], loader, tracker)
+
+    assert result['loaded'] == [VIDEO_ID] and result['skipped'] == {}
+    chunks, loaded = target.stored[VIDEO_ID]
+    assert chunks == CHUNKS
+    assert loaded.dtype == np.float32
+    np.testing.assert_array_equal(loaded, embeddings)
+    assert loader.transcripts[VIDEO_ID] == TRANSCRIPT
+    assert tracker.recorded[VIDEO_ID]['chunk_count'] == len(CHUNKS)
+
+    # A second import finds the video already stored
+    again = import_bundles(target, [str(tmp_path)])
+    assert again['loaded'] == [] and again['already_present'] == [VIDEO_ID]
+
+
+def test_float16_bundle_loads_close_to_original(tmp_path, embeddings):
+    source = FakeVectorStore(stored={VIDEO_ID: (CHUNKS, embeddings)})
+    export_videos(source, [VIDEO_ID], str(tmp_path), float16=True)
+
+    bundle = read_bundle(bundle_path(str(tmp_path), VIDEO_ID))
+    assert bundle['manifest']['embedding_dtype'] == "float16"
+    assert bundle['document_data'] is None
+    assert bundle['embeddings'].dtype == np.float32
+    np.testing.assert_allclose(bundle['embeddings'], embeddings, atol=1e-2)
+
+
+def test_bundle_for_other_model_is_skipped(tmp_path, embeddings):
+    export_videos(FakeVectorStore(stored={VIDEO_ID: (CHUNKS, embeddings)}), [VIDEO_ID], str(tmp_path))
+
+    target = FakeVectorStore(model_name="all-mpnet-base-v2")
+    result = import_bundles(target, [str(tmp_path)])
+    assert result['loaded'] == [] and target.stored == {}
+    assert "Embedded with" in result['skipped'][bundle_path(str(tmp_path), VIDEO_ID)]
+
+
+def test_tampered_embeddings_fail_verification(tmp_path, embeddings):
+    export_videos(FakeVectorStore(stored={VIDEO_ID: (CHUNKS, embeddings)}), [VIDEO_ID], str(tmp_path))
+    path = bundle_path(str(tmp_path), VIDEO_ID)
+    with np.load(path) as data:
+        arrays = {name: data[name] for name in data.files}
+    arrays['embeddings'] = arrays['embeddings'] + 1
+    with open(path, 'wb') as f:
+        np.savez_compressed(f, **arrays)
+
+    result = import_bundles(FakeVectorStore(), [path])
+    assert result['skipped'][path] == "Embedding checksum mismatch"
@@ -0,0 +1,133 @@
+import json
+import pytest
+from youtube_transcript_api import NoTranscriptFound, TranscriptsDisabled, VideoUnavailable
+from rag.document_loader import DocumentLoader
+from rag.transcript_source import NegativeCache
+
+VIDEO_ID = "dQw4w9WgXcQ"
+VIDEO_URL = f"https://www.youtube.com/watch?v={VIDEO_ID}"
+SEGMENTS = [
+    {'text': 'hello there', 'start': 0.0, 'duration': 1.5},
+    {'text': 'general kenobi', 'start': 1.5, 'duration': 2.0}
+]
+
+
+class StubTranscript:
+    def __init__(self, segments):
+        self.segments = segments
+
+    def fetch(self):
+        return list(self.segments)
+
+
+class StubTranscriptList:
+    def __init__(self, video_id, manual=None, generated=None):
+        self.video_id = video_id
+        self.manual = manual
+        self.generated = generated
+
+    def find_manually_created_transcript(self, languages):
+        if self.manual is None:
+            raise NoTranscriptFound(self.video_id, languages, self)
+        return self.manual
+
+    def find_generated_transcript(self, languages):
+        if self.generated is None:
+            raise NoTranscriptFound(self.video_id, languages, self)
+        return self.generated
+
+
+class StubSource:
+    """
+    Stands in for YouTubeTranscriptSource: returns a transcript list or raises the given error
+    """
+    def __init__(self, result):
+        self.result = result
+        self.calls = 0
+
+    def list_transcripts(self, video_id):
+        self.calls += 1
+        if isinstance(self.result, Exception):
+            raise self.result
+        return self.result
+
+
+def make_loader(result):
+    source = StubSource(result)
+    return DocumentLoader(transcript_source=source, negative_cache=NegativeCache(ttl_seconds=60)), source
+
+
+def test_load_transcript_builds_and_caches_document(transcripts_path):
+    loader, source = make_loader(StubTranscriptList(VIDEO_ID, manual=StubTranscript(SEGMENTS)))
+
+    document = loader.load_transcript(VIDEO_URL)
+
+    assert document['video_id'] == VIDEO_ID
+    assert document['full_text'] == "hello there general kenobi"
+    assert document['total_segments'] == 2
+    with open(transcripts_path / f"{VIDEO_ID}.json", encoding='utf-8') as f:
+        assert json.load(f) == document
+
+    assert loader.load_transcript(VIDEO_URL) == document
+    assert source.calls == 1
+
+
+def test_load_transcript_falls_back_to_generated(transcripts_path):
+    loader, _ = make_loader(StubTranscriptList(VIDEO_ID, generated=StubTranscript(SEGMENTS)))
+    assert loader.load_transcript(VIDEO_URL)['total_segments'] == 2
+
+
+def test_load_transcript_without_english_transcript_is_negatively_cached(transcripts_path):
+    loader, source = make_loader(StubTranscriptList(VIDEO_ID))
+
+    with pytest.raises(Exception) as first:
+        loader.load_transcript(VIDEO_URL)
+    with pytest.raises(Exception) as second:
+        loader.load_transcript(VIDEO_URL)
+
+    assert str(first.value) == str(second.value) == "❌ No transcript available in English."
+
+    assert source.calls == 1
+    assert not (transcripts_path / f"{VIDEO_ID}.json").exists()
+
+
+@pytest.mark.parametrize("error, message", [
+    (VideoUnavailable(VIDEO_ID), "Video is unavailable"),
+    (TranscriptsDisabled(VIDEO_ID), "Transcripts are disabled"),
+])
+def test_load_transcript_permanent_failures_are_negatively_cached(transcripts_path, error, message):
+    loader, source = make_loader(error)
+
+    with pytest.raises(Exception, match=message) as first:
+        loader.load_transcript(VIDEO_URL)
+    assert loader.negative_cache.get(VIDEO_ID) is not None
+
+    with pytest.raises(Exception, match=message) as second:
+        loader.load_transcript(VIDEO_URL)
+    assert str(second.value) == str(first.value)
+    assert source.calls == 1
+
+
+def test_load_transcript_transient_failure_is_not_cached(transcripts_path):
+    loader, source = make_loader(ConnectionError("connection reset"))
+
+    with pytest.raises(Exception, match="connection reset"):
+        loader.load_transcript(VIDEO_URL)
+    assert loader.negative_cache.get(VIDEO_ID) is None
+
+    with pytest.raises(Exception):
+        loader.load_transcript(VIDEO_URL)
+    assert source.calls == 2
+
+
+def test_load_transcript_empty_fetch_fails(transcripts_path):
+    loader, _ = make_loader(StubTranscriptList(VIDEO_ID, manual=StubTranscript([])))
+    with pytest.raises(Exception, match="returned empty"):
+        loader.load_transcript(VIDEO_URL)
+
+
+def test_load_transcript_invalid_url(transcripts_path):
+    loader, source = make_loader(StubTranscriptList(VIDEO_ID))
+    with pytest.raises(Exception, match="Invalid YouTube URL"):
+        loader.load_transcript("https://example.com/not-a-video")
+    assert source.calls == 0
@@ -0,0 +1,159 @@
+import numpy as np
+import pytest
+from app.config import Config
+from rag.checkpoint_store import CheckpointStore
+from rag.eviction import AccessTracker, VideoEvictor, estimate_footprint
+from rag.ingestion import rebuildable_videos, reindex_from_checkpoints
+
+MODEL = "all-MiniLM-L6-v2"
+CHUNKS = [{'id': 0, 'text': "first chunk", 'length': 11}, {'id': 1, 'text': "second chunk", 'length': 12}]
+
+
+class FakeVideoCollection:
+    def __init__(self, videos):
+        self.videos = videos
+
+    def get(self, include=None):
+        return {
+            'ids': list(self.videos),
+            'metadatas': [{'video_id': v, 'chunk_count': n} for v, n in self.videos.items()],
+            'embeddings': [[0.1] * 4 for _ in self.videos]
+        }
+
+
+class FakeVectorStore:
+    collection_name = "youtube_transcripts"
+
+    def __init__(self, videos=None, stored=None):
+        self.video_collection = FakeVideoCollection(videos or {})
+        self.stored = dict(stored or {})
+        self.failing_deletes = set()
+
+    def video_exists(self, video_id):
+        return video_id in self.stored
+
+    def add_documents(self, video_id, chunks, model_name):
+        self.stored[video_id] = chunks
+        return True
+
+    def delete_videos(self, video_ids):
+        return {video_id: len(self.stored.pop(video_id)) for video_id in video_ids
+                if video_id in self.stored and video_id not in self.failing_deletes}
+
+
+@pytest.fixture
+def tracker(tmp_path):
+    return AccessTracker(path=str(tmp_path / "access.sqlite3"), flush_interval=0)
+
+
+@pytest.fixture
+def checkpoints(tmp_path):
+    store = CheckpointStore(base_path=str(tmp_path / "checkpoints"))
+    for video_id in ("aaaaaaaaaaa", "bbbbbbbbbbb"):
+        store.save_chunks(video_id, CHUNKS)
+        store.save_embeddings(video_id, np.ones((2, 4), dtype=np.float32), MODEL)
+        store.mark_stored(video_id, FakeVectorStore.collection_name)
+    return store
+
+
+def test_backfill_adds_untracked_videos_as_coldest(tracker):
+    evictor = VideoEvictor(FakeVectorStore({"aaaaaaaaaaa": 10}), tracker, lambda video_id: None)
+
+    assert evictor.backfill() == 1
+    [video] = tracker.least_recently_used()
+    assert video['last_access'] == 0.0
+    assert video['chunk_count'] == 10
+    assert video['disk_bytes'] > 0
+
+
+def test_backfill_fills_footprint_of_touched_videos(tracker):
+    tracker.touch("aaaaaaaaaaa")
+    tracker.flush()
+    last_access = tracker.get_last_access("aaaaaaaaaaa")
+    evictor = VideoEvictor(FakeVectorStore({"aaaaaaaaaaa": 10}), tracker, lambda video_id: None)
+
+    assert evictor.backfill() == 1
+    [video] = tracker.least_recently_used()
+    assert video['disk_bytes'] > 0 and video['memory_bytes'] > 0
+    assert video['last_access'] == last_access
+    assert video['access_count'] == 1
+
+
+def test_backfill_leaves_recorded_footprints_alone(tracker):
+    tracker.record_video("aaaaaaaaaaa", chunk_count=3, disk_bytes=100, memory_bytes=50)
+    evictor = VideoEvictor(FakeVectorStore({"aaaaaaaaaaa": 10}), tracker, lambda video_id: None)
+
+    assert evictor.backfill() == 0
+    assert tracker.least_recently_used()[0]['disk_bytes'] == 100
+
+
+def test_run_evicts_least_recently_used_until_within_quota(tracker):
+    tracker.record_video("aaaaaaaaaaa", 1, disk_bytes=100, memory_bytes=0, last_access=1.0)
+    tracker.record_video("bbbbbbbbbbb", 1, disk_bytes=100, memory_bytes=0, last_access=2.0)
+    forgotten = []
+    store = FakeVectorStore(stored={"aaaaaaaaaaa": CHUNKS, "bbbbbbbbbbb": CHUNKS})
+    evictor = VideoEvictor(store, tracker, forgotten.append, disk_quota_bytes=150)
+
+    result = evictor.run()
+
+    assert result['evicted'] == ["aaaaaaaaaaa"]
+    assert forgotten == ["aaaaaaaaaaa"]
+    assert [video['video_id'] for video in tracker.least_recently_used()] == ["bbbbbbbbbbb"]
+    assert evictor.get_stats()['evicted_chunks'] == len(CHUNKS)
+
+
+def test_run_keeps_tracking_videos_whose_delete_failed(tracker):
+    tracker.record_video("aaaaaaaaaaa", 1, disk_bytes=100, memory_bytes=0, last_access=1.0)
+    tracker.record_video("bbbbbbbbbbb", 1, disk_bytes=100, memory_bytes=0, last_access=2.0)
+    store = FakeVectorStore(stored={"aaaaaaaaaaa": CHUNKS, "bbbbbbbbbbb": CHUNKS})
+    store.failing_deletes.add("aaaaaaaaaaa")
+    forgotten = []
+    evictor = VideoEvictor(store, tracker, forgotten.append, disk_quota_bytes=150)
+
+    assert evictor.run()['evicted'] == []
+    assert forgotten == []
+    assert len(tracker.least_recently_used()) == 2
+    assert evictor.get_stats()['evicted_videos'] == 0
+
+
+def test_run_stops_tracking_videos_no_longer_stored(tracker):
+    tracker.record_video("aaaaaaaaaaa", 1, disk_bytes=100, memory_bytes=0, last_access=1.0)
+    evictor = VideoEvictor(FakeVectorStore(), tracker, lambda video_id: None, disk_quota_bytes=50)
+
+    assert evictor.run()['evicted'] == []
+    assert tracker.least_recently_used() == []
+
+
+@pytest.mark.parametrize("keep_checkpoints, counted", [(True, 0), (False, 1000)])
+def test_footprint_counts_checkpoints_only_when_eviction_frees_them(monkeypatch, keep_checkpoints, counted):
+    monkeypatch.setattr(Config, "EVICTION_KEEP_CHECKPOINTS", keep_checkpoints)
+    without = estimate_footprint(CHUNKS, 4)
+    with_checkpoints = estimate_footprint(CHUNKS, 4, checkpoint_bytes=1000)
+    assert with_checkpoints['disk_bytes'] - without['disk_bytes'] == counted
+
+
+def test_evicted_checkpoints_are_kept_but_not_reindexed(checkpoints):
+    checkpoints.mark_evicted("aaaaaaaaaaa")
+
+    assert checkpoints.is_evicted("aaaaaaaaaaa")
+    assert checkpoints.load_embeddings("aaaaaaaaaaa", MODEL) is not None
+    assert rebuildable_videos(checkpoints, MODEL) == ["bbbbbbbbbbb"]
+
+    summary = reindex_from_checkpoints(FakeVectorStore(), checkpoints, MODEL)
+    assert summary['reindexed'] == ["bbbbbbbbbbb"]
+
+
+def test_storing_an_evicted_video_again_clears_the_mark(checkpoints):
+    checkpoints.mark_evicted("aaaaaaaaaaa")
+    checkpoints.mark_stored("aaaaaaaaaaa", FakeVectorStore.collection_name)
+
+    assert not checkpoints.is_evicted("aaaaaaaaaaa")
+    assert "aaaaaaaaaaa" in rebuildable_videos(checkpoints, MODEL)
+
+
+def test_mark_evicted_drops_incomplete_checkpoints(tmp_path):
+    store = CheckpointStore(base_path=str(tmp_path / "checkpoints"))
+    store.save_chunks("aaaaaaaaaaa", CHUNKS)
+
+    store.mark_evicted("aaaaaaaaaaa")
+    assert store.list_videos() == []
@@ -0,0 +1,192 @@
+import threading
+import numpy as np
+import pytest
+from app.config import Config
+from rag import migration
+from rag.migration import EmbeddingMigration
+from rag.vector_store import VectorStore, IndexSnapshot
+
+OLD_MODEL = "old-model"
+NEW_MODEL = "new-model"
+VIDEO_IDS = [f"video{i:06d}" for i in range(6)]
+
+
+class FakeCollection:
+    """
+    In-memory stand-in for a Chroma collection: rows of id -> (document, metadata, embedding)
+    """
+    def __init__(self):
+        self.rows = {}
+
+    def get(self, where=None, include=None, ids=None):
+        rows = [(row_id, row) for row_id, row in self.rows.items()
+                if (ids is None or row_id in ids)
+                and (where is None or row[1]['video_id'] == where['video_id'])]
+        return {
+            'ids': [row_id for row_id, _ in rows],
+            'documents': [row[0] for _, row in rows],
+            'metadatas': [row[1] for _, row in rows],
+            'embeddings': [row[2] for _, row in rows]
+        }
+
+    def count(self):
+        return len(self.rows)
+
+
+class FakeVectorStore:
+    """
+    Only the calls EmbeddingMigration makes; the migration-state file methods are the real ones
+    """
+    read_migration_target = VectorStore.read_migration_target
+    save_migration_target = VectorStore.save_migration_target
+    clear_migration_target = VectorStore.clear_migration_target
+
+    def __init__(self, persist_directory):
+        self.persist_directory = persist_directory
+        self.write_lock = threading.RLock()
+        self.collections = {}
+        self.dropped = []
+        self.fail_after = None
+        self.writes = 0
+        self._active = self.open_snapshot("youtube_transcripts", OLD_MODEL)
+        for video_id in VIDEO_IDS:
+            self.add_documents(video_id, [{'id': 0, 'text': f"text of {video_id}", 'length': 10,
+                                           'embedding': [1.0]}], snapshot=self._active)
+        self.writes = 0
+
+    @property
+    def model_name(self):
+        return self._active.model_name
+
+    @property
+    def collection_name(self):
+        return self._active.collection_name
+
+    def snapshot(self):
+        return self._active
+
+    def open_snapshot(self, collection_name, model_name=None):
+        for name in (collection_name, f"{collection_name}_videos"):
+            self.collections.setdefault(name, FakeCollection())
+        return IndexSnapshot(collection_name, model_name, self.collections[collection_name],
+                             self.collections[f"{collection_name}_videos"])
+
+    def next_collection_name(self):
+        version = 2
+        while f"youtube_transcripts_v{version}" in self.collections:
+            version += 1
+        return f"youtube_transcripts_v{version}"
+
+    def drop_collections(self, collection_name):
+        self.dropped.append(collection_name)
+
+    def list_videos(self, snapshot=None):
+        return list((snapshot or self._active).video_collection.rows)
+
+    def rebuild_video_index(self, snapshot=None):
+        return 0
+
+    def delete_videos(self, video_ids, snapshot=None):
+        active = snapshot or self._active
+        for video_id in video_ids:
+            active.video_collection.rows.pop(video_id, None)
+            for row_id in [r for r, row in active.collection.rows.items() if row[1]['video_id'] == video_id]:
+                del active.collection.rows[row_id]
+        return {video_id: 1 for video_id in video_ids}
+
+    def add_documents(self, video_id, chunks, model_name=None, snapshot=None):
+        if self.fail_after is not None and self.writes >= self.fail_after:
+            raise RuntimeError("process killed")
+        self.writes += 1
+        active = snapshot or self._active
+        for chunk in chunks:
+            active.collection.rows[f"{video_id}_{chunk['id']}"] = (
+                chunk['text'], {'video_id': video_id, 'chunk_id': chunk['id'], 'length': chunk['length']},
+                chunk['embedding'])
+        active.video_collection.rows[video_id] = ("", {'video_id': video_id}, chunks[0]['embedding'])
+        return True
+
+    def activate(self, snapshot):
+        self._active = snapshot
+
+
+class FakeEmbeddingModel:
+    encoded = []
+
+    def __init__(self, model_name):
+        self.model_name = model_name
+
+    def generate_embeddings_cached(self, texts):
+        FakeEmbeddingModel.encoded.extend(texts)
+        return np.ones((len(texts), 2), dtype=np.float32), {}
+
+
+class FakeRetriever:
+    def __init__(self):
+        self.embedding_model = FakeEmbeddingModel(OLD_MODEL)
+        self.models = {}
+
+    def model_for(self, model_name):
+        return self.embedding_model
+
+    def register_model(self, model):
+        self.models[model.model_name] = model
+
+    def unregister_model(self, model_name):
+        self.models.pop(model_name, None)
+
+
+@pytest.fixture(autouse=True)
+def fast_migration(monkeypatch):
+    monkeypatch.setattr(migration, "EmbeddingModel", FakeEmbeddingModel)
+    monkeypatch.setattr(Config, "MIGRATION_CHUNKS_PER_SECOND", 1_000_000)
+    monkeypatch.setattr(Config, "MIGRATION_DRAIN_SECONDS", 0)
+    FakeEmbeddingModel.encoded = []
+
+
+def run_to_end(embedding_migration):
+    embedding_migration._thread.join(10)
+    return embedding_migration.get_status()
+
+
+def test_interrupted_migration_resumes_into_the_same_collection(tmp_path):
+    store = FakeVectorStore(str(tmp_path))
+    store.fail_after = 2
+    first = EmbeddingMigration(store, FakeRetriever())
+    first.start(NEW_MODEL)
+    assert run_to_end(first)['state'] == 'failed'
+    target = store.read_migration_target()
+    assert (target['collection_name'], target['embedding_model']) == ("youtube_transcripts_v2", NEW_MODEL)
+
+    # Restart: a new migration object finds the recorded target and only embeds what is missing
+    store.fail_after = None
+    FakeEmbeddingModel.encoded = []
+    resumed = EmbeddingMigration(store, FakeRetriever())
+    status = resumed.resume()
+    assert status['target_collection'] == "youtube_transcripts_v2"
+    assert status['resumed'] is True
+    assert run_to_end(resumed)['state'] == 'switched'
+
+    assert len(FakeEmbeddingModel.encoded) == len(VIDEO_IDS) - 2
+    assert store.collection_name == "youtube_transcripts_v2"
+    assert sorted(store.list_videos()) == VIDEO_IDS
+    assert "youtube_transcripts_v3" not in store.collections
+    assert store.read_migration_target() == {}
+
+
+def test_resume_without_pending_migration_does_nothing(tmp_path):
+    store = FakeVectorStore(str(tmp_path))
+    assert EmbeddingMigration(store, FakeRetriever()).resume() is None
+
+
+def test_migration_to_another_model_drops_the_abandoned_target(tmp_path):
+    store = FakeVectorStore(str(tmp_path))
+    store.save_migration_target("youtube_transcripts_v2", NEW_MODEL)
+    store.open_snapshot("youtube_transcripts_v2", NEW_MODEL)
+
+    embedding_migration = EmbeddingMigration(store, FakeRetriever())
+    status = embedding_migration.start("third-model")
+    run_to_end(embedding_migration)
+
+    assert store.dropped == ["youtube_transcripts_v2"]
+    assert status['resumed'] is False
@@ -0,0 +1,222 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from app.config import Config
+from rag import prompt_cache
+from rag.prompt_cache import PromptCache
+
+MODEL = "models/gemini-1.5-flash-001"
+TRANSCRIPT = "Transcript:\n" + "word " * 20000
+
+
+class StubGemini(BaseHTTPRequestHandler):
+    """
+    Minimal Gemini REST endpoint: cachedContents create/delete and generateContent
+    """
+    def _reply(self, body):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        calls = self.server.calls
+        if self.path.startswith("/v1beta/cachedContents"):
+            calls['create'].append(body)
+            self._reply({
+                'name': f"cachedContents/c{len(calls['create'])}",
+                'model': body.get('model'),
+                'displayName': body.get('displayName'),
+                'createTime': "2026-01-01T00:00:00Z",
+                'updateTime': "2026-01-01T00:00:00Z",
+                'expireTime': "2026-01-01T01:00:00Z",
+                'usageMetadata': {'totalTokenCount': 20000}
+            })
+        else:
+            calls['generate'].append(body)
+            self._reply({'candidates': [{'content': {'parts': [{'text': "stub summary"}], 'role': "model"},
+                                         'finishReason': "STOP", 'index': 0}]})
+
+    def do_DELETE(self):
+        self.server.calls['delete'].append(self.path.split("?")[0])
+        self._reply({})
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def gemini_stub(monkeypatch):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubGemini)
+    server.calls = {'create': [], 'delete': [], 'generate': []}
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    monkeypatch.setattr(Config, "GEMINI_API_KEY", "test-key")
+    monkeypatch.setattr(Config, "GEMINI_API_ENDPOINT", f"http://127.0.0.1:{server.server_port}")
+    monkeypatch.setattr(Config, "GEMINI_MODEL", MODEL)
+    monkeypatch.setattr(Config, "LLM_CONTEXT_CACHING", True)
+    yield server.calls
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def handler(gemini_stub):
+    from rag.llm_handler import LLMHandler
+    return LLMHandler()
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_summary_cache_miss_then_hit(handler, gemini_stub):
+    first = handler.generate_summary(TRANSCRIPT, "abcdefghijk")
+    second = handler.generate_summary(TRANSCRIPT, "abcdefghijk")
+
+    assert first['summary'] == second['summary'] == "stub summary"
+    assert len(gemini_stub['create']) == 1
+    assert all(call.get('cachedContent') == "cachedContents/c1" for call in gemini_stub['generate'])
+    stats = handler.prompt_cache.get_stats()
+    assert (stats['misses'], stats['hits'], stats['entries']) == (1, 1, 1)
+
+
+def test_small_content_is_not_cached(handler, gemini_stub):
+    result = handler.generate_summary("Transcript:\nshort video", "abcdefghijk")
+
+    assert result['summary'] == "stub summary"
+    assert gemini_stub['create'] == []
+    assert 'cachedContent' not in gemini_stub['generate'][0]
+    assert handler.prompt_cache.get_stats()['too_small'] == 1
+
+
+def test_chat_prompts_are_sent_in_full(handler, gemini_stub):
+    handler.generate_response("what is it about?", "some context", "abcdefghijk")
+
+    assert gemini_stub['create'] == []
+    assert 'cachedContent' not in gemini_stub['generate'][0]
+
+
+def test_expired_entry_is_recreated(handler, gemini_stub, monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(prompt_cache.time, "time", clock)
+    handler.generate_summary(TRANSCRIPT, "abcdefghijk")
+
+    clock.now += handler.prompt_cache.ttl
+    handler.generate_summary(TRANSCRIPT, "abcdefghijk")
+
+    assert len(gemini_stub['create']) == 2
+    assert gemini_stub['delete'] == ["/v1beta/cachedContents/c1"]
+    assert gemini_stub['generate'][-1]['cachedContent'] == "cachedContents/c2"
+
+
+def test_changed_content_is_recreated(handler, gemini_stub):
+    handler.generate_summary(TRANSCRIPT, "abcdefghijk")
+    handler.generate_summary(TRANSCRIPT + " more", "abcdefghijk")
+
+    assert len(gemini_stub['create']) == 2
+    assert gemini_stub['delete'] == ["/v1beta/cachedContents/c1"]
+
+
+def test_invalidate_deletes_provider_cache(handler, gemini_stub):
+    handler.generate_summary(TRANSCRIPT, "abcdefghijk")
+    handler.invalidate_video_cache("abcdefghijk")
+
+    assert gemini_stub['delete'] == ["/v1beta/cachedContents/c1"]
+    assert handler.prompt_cache.get_stats()['entries'] == 0
+
+    handler.generate_summary(TRANSCRIPT, "abcdefghijk")
+    assert len(gemini_stub['create']) == 2
+
+
+def test_entries_are_bounded(gemini_stub, handler):
+    cache = PromptCache(MODEL, max_entries=2)
+    for video_id in ("a", "b", "c"):
+        assert cache.get_model(f"video:{video_id}", "Summarize.", [TRANSCRIPT]) is not None
+
+    assert cache.get_stats()['entries'] == 2
+    assert cache.get_stats()['evicted'] == 1
+    assert gemini_stub['delete'] == ["/v1beta/cachedContents/c1"]
+
+
+def test_concurrent_misses_create_once(gemini_stub, handler, monkeypatch):
+    cache = PromptCache(MODEL)
+    entered = threading.Event()
+    release = threading.Event()
+    original_create = cache._create
+
+    def slow_create(*args):
+        entered.set()
+        release.wait(5)
+        return original_create(*args)
+
+    monkeypatch.setattr(cache, "_create", slow_create)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_model("video:a", "Summarize.", [TRANSCRIPT])))
+               for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    entered.wait(5)
+    # Let the other requests reach the in-flight wait before the create finishes
+    time.sleep(0.2)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(gemini_stub['create']) == 1
+    assert len(results) == 4 and all(model is results[0] for model in results)
+    assert cache.get_stats()['hits'] == 3
+
+
+def test_cached_and_uncached_summaries_send_the_same_transcript(gemini_stub, monkeypatch):
+    from rag.llm_handler import LLMHandler
+    monkeypatch.setattr(Config, "SUMMARY_TRANSCRIPT_MAX_CHARS", 50000)
+    LLMHandler().generate_summary(TRANSCRIPT, "abcdefghijk")
+    cached_text = gemini_stub['create'][0]['contents'][0]['parts'][0]['text']
+
+    monkeypatch.setattr(Config, "LLM_CONTEXT_CACHING", False)
+    LLMHandler().generate_summary(TRANSCRIPT, "abcdefghijk")
+    uncached_prompt = gemini_stub['generate'][-1]['contents'][0]['parts'][0]['text']
+
+    assert cached_text == "Transcript:\n" + TRANSCRIPT[:50000]
+    assert cached_text in uncached_prompt
+    assert TRANSCRIPT[:50001] not in uncached_prompt
+
+
+def test_invalidate_during_create_drops_the_new_cache(gemini_stub, handler, monkeypatch):
+    cache = PromptCache(MODEL)
+    entered = threading.Event()
+    release = threading.Event()
+    original_create = cache._create
+
+    def slow_create(*args):
+        entered.set()
+        release.wait(5)
+        return original_create(*args)
+
+    monkeypatch.setattr(cache, "_create", slow_create)
+    results = []
+    thread = threading.Thread(target=lambda: results.append(cache.get_model("video:a", "Summarize.", [TRANSCRIPT])))
+    thread.start()
+    entered.wait(5)
+    cache.invalidate("video:a")
+    release.set()
+    thread.join()
+
+    assert results == [None]
+    assert cache.get_stats()['entries'] == 0
+    assert gemini_stub['delete'] == ["/v1beta/cachedContents/c1"]
+
+    monkeypatch.setattr(cache, "_create", original_create)
+    assert cache.get_model("video:a", "Summarize.", [TRANSCRIPT]) is not None
+    assert len(gemini_stub['create']) == 2
@@ -0,0 +1,72 @@
+import threading
+import numpy as np
+import pytest
+from rag.query_batcher import QueryBatcher
+from rag.retriever import Retriever
+
+
+def encode(texts):
+    return np.array([[float(len(text))] for text in texts])
+
+
+def test_concurrent_queries_share_a_batch():
+    batcher = QueryBatcher(encode, max_batch_size=8, window_ms=50)
+    results = {}
+    threads = [threading.Thread(target=lambda t=text: results.__setitem__(t, batcher.encode(t)))
+               for text in ("a", "bb", "ccc")]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert {text: float(vector[0]) for text, vector in results.items()} == {"a": 1.0, "bb": 2.0, "ccc": 3.0}
+    assert batcher.get_stats()['queries'] == 3
+    batcher.close()
+
+
+def test_close_stops_the_worker_and_rejects_new_queries():
+    batcher = QueryBatcher(encode, window_ms=0)
+    assert float(batcher.encode("abcd")[0]) == 4.0
+    worker = batcher._worker
+
+    batcher.close()
+    assert not worker.is_alive()
+    with pytest.raises(RuntimeError):
+        batcher.encode("late")
+
+
+def test_close_before_first_query():
+    batcher = QueryBatcher(encode)
+    batcher.close()
+    assert batcher._worker is None
+
+
+class FakeModel:
+    def __init__(self, model_name):
+        self.model_name = model_name
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def test_model_for_refuses_unknown_collection_models():
+    retriever = Retriever(FakeModel("current"), vector_store=object())
+    other = FakeModel("other")
+    retriever.register_model(other)
+
+    assert retriever.model_for("current").model_name == "current"
+    assert retriever.model_for("other") is other
+    with pytest.raises(ValueError):
+        retriever.model_for("missing")
+
+
+def test_unregister_closes_the_model():
+    retriever = Retriever(FakeModel("current"), vector_store=object())
+    other = FakeModel("other")
+    retriever.register_model(other)
+
+    retriever.unregister_model("other")
+    assert other.closed
+    with pytest.raises(ValueError):
+        retriever.model_for("other")
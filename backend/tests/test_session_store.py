@@ -0,0 +1,113 @@
+import pytest
+from rag import session_store
+from rag.session_store import SessionStore
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(session_store.time, "time", clock)
+    return clock
+
+
+def test_new_session_gets_minted_id():
+    store = SessionStore()
+    session = store.get_or_create()
+
+    assert len(session.session_id) == 32
+    assert store.get_or_create(session.session_id) is session
+
+
+def test_unknown_id_is_not_adopted():
+    store = SessionStore()
+    session = store.get_or_create("client-chosen-id")
+
+    assert session.session_id != "client-chosen-id"
+    assert store.delete("client-chosen-id") is False
+    assert store.get_stats()['active_sessions'] == 1
+
+
+def test_expired_session_is_replaced(clock):
+    store = SessionStore(ttl_seconds=60)
+    session = store.get_or_create()
+    store.add_turn(session, "hello", "hi there")
+
+    clock.now += 30
+    assert store.get_or_create(session.session_id) is session
+
+    clock.now += 61
+    fresh = store.get_or_create(session.session_id)
+    assert fresh is not session
+    assert fresh.session_id != session.session_id
+    assert fresh.turns == []
+    assert store.get_stats()['active_sessions'] == 1
+
+
+def test_least_recently_used_sessions_are_dropped():
+    store = SessionStore(max_sessions=2)
+    first = store.get_or_create()
+    second = store.get_or_create()
+    # Touching the first session makes the second one the oldest
+    store.get_or_create(first.session_id)
+    store.get_or_create()
+
+    assert store.get_stats()['active_sessions'] == 2
+    assert store.get_or_create(first.session_id) is first
+    assert store.delete(second.session_id) is False
+
+
+def test_compaction_folds_old_turns_into_summary():
+    store = SessionStore(token_budget=50, keep_recent_turns=1)
+    session = store.get_or_create()
+    calls = []
+
+    def summarize(previous, turns):
+        calls.append((previous, turns))
+        return f"summary {len(calls)}"
+
+    assert store.add_turn(session, "q1", "a" * 80) is False
+    assert store.add_turn(session, "q2", "b" * 80) is False
+    assert store.add_turn(session, "q3", "c" * 80) is True
+    store.compact(session, summarize)
+
+    assert calls == [("", f"User: q1\nAssistant: {'a' * 80}\nUser: q2\nAssistant: {'b' * 80}")]
+    assert session.summary == "summary 1"
+    assert [turn['query'] for turn in session.turns] == ["q3"]
+    assert session.compactions == 1
+
+    # The next compaction builds on the previous summary
+    store.add_turn(session, "q4", "d" * 80)
+    store.add_turn(session, "q5", "e" * 80)
+    store.compact(session, summarize)
+    assert calls[1][0] == "summary 1"
+    assert session.summary == "summary 2"
+    assert [turn['query'] for turn in session.turns] == ["q5"]
+
+
+def test_compaction_is_skipped_within_budget():
+    store = SessionStore(token_budget=1000, keep_recent_turns=1)
+    session = store.get_or_create()
+    store.add_turn(session, "q1", "a1")
+    store.add_turn(session, "q2", "a2")
+
+    store.compact(session, lambda previous, turns: pytest.fail("should not summarize"))
+    assert session.summary == "" and len(session.turns) == 2
+
+
+def test_history_stays_within_budget():
+    store = SessionStore(token_budget=40, keep_recent_turns=1)
+    session = store.get_or_create()
+    for i in range(5):
+        store.add_turn(session, f"q{i}", str(i) * 40)
+
+    history = store.build_history(session)
+    assert session_store.estimate_tokens(history) <= 40 + 10
+    assert "q4" in history and "q0" not in history
@@ -0,0 +1,53 @@
+import json
+import pytest
+from app.config import Config
+from utils import tracing
+from utils.tracing import RotatingFileExporter, Trace, span, start_trace
+
+
+@pytest.fixture
+def exporter(tmp_path, monkeypatch):
+    exporter = RotatingFileExporter(path=str(tmp_path / "traces.jsonl"), min_duration_ms=0)
+    monkeypatch.setattr(tracing, "_exporter", exporter)
+    monkeypatch.setattr(Config, "TRACING_ENABLED", True)
+    return exporter
+
+
+def read_traces(exporter):
+    exporter.flush()
+    with open(exporter.path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f]
+
+
+def test_trace_is_written_with_spans(exporter):
+    with start_trace("POST /chat", "client-trace-0001"):
+        with span("retrieve", video_id="abcdefghijk"):
+            pass
+
+    [trace] = read_traces(exporter)
+    assert trace['trace_id'] == "client-trace-0001"
+    assert [s['name'] for s in trace['spans']] == ["retrieve"]
+    assert trace['spans'][0]['attributes'] == {'video_id': "abcdefghijk"}
+
+
+@pytest.mark.parametrize("header", ["short", "x" * 65, "bad id with spaces", "id\nFAKE LOG LINE", ""])
+def test_invalid_client_trace_ids_are_replaced(header):
+    trace = Trace("GET /health", header)
+    assert trace.trace_id != header
+    assert len(trace.trace_id) == 32
+
+
+def test_fast_traces_are_not_written(tmp_path):
+    exporter = RotatingFileExporter(path=str(tmp_path / "traces.jsonl"), min_duration_ms=10_000)
+    exporter.export(Trace("GET /videos"))
+    exporter.flush()
+    assert (tmp_path / "traces.jsonl").read_text() == ""
+
+
+def test_full_queue_drops_traces(tmp_path, monkeypatch):
+    exporter = RotatingFileExporter(path=str(tmp_path / "traces.jsonl"), min_duration_ms=0, queue_size=1)
+    # The writer thread drains the original queue, so this one stays full
+    monkeypatch.setattr(exporter, "_queue", tracing.queue.Queue(maxsize=1))
+    exporter.export(Trace("a"))
+    exporter.export(Trace("b"))
+    assert exporter.dropped == 1
@@ -0,0 +1,117 @@
+import json
+import pytest
+from rag import transcript_files
+from rag.transcript_files import (
+    file_video_id, iter_caption_segments, iter_json_segments, is_transcript_path,
+    iter_transcript_files, parse_timestamp, transcript_file_info
+)
+
+SRT = """1
+00:00:01,000 --> 00:00:03,500
+Hello <i>there</i>
+
+2
+00:00:03,500 --> 00:00:05,000
+General
+Kenobi
+
+3
+00:00:05,000 --> 00:00:06,000
+General
+Kenobi
+"""
+
+VTT = """WEBVTT
+Kind: captions
+
+NOTE a comment
+that spans lines
+
+intro
+00:01.000 --> 00:02.250 align:start
+<c.colorE5E5E5>first cue</c>
+
+01:00:02.250 --> 01:00:04.000
+second cue"""
+
+
+def write(tmp_path, name, content):
+    path = tmp_path / name
+    path.write_text(content, encoding='utf-8')
+    return str(path)
+
+
+@pytest.mark.parametrize("value, seconds", [
+    ("00:01:02,500", 62.5), ("00:01:02.500", 62.5), ("01:02.500", 62.5), ("01:00:00.000", 3600.0)
+])
+def test_parse_timestamp(value, seconds):
+    assert parse_timestamp(value) == seconds
+
+
+def test_srt_cues_are_joined_stripped_and_deduplicated(tmp_path):
+    segments = list(iter_caption_segments(write(tmp_path, "talk.srt", SRT)))
+
+    assert segments == [
+        {'start': 1.0, 'duration': 2.5, 'text': "Hello there"},
+        {'start': 3.5, 'duration': 1.5, 'text': "General Kenobi"}
+    ]
+
+
+def test_vtt_skips_headers_notes_and_identifiers(tmp_path):
+    segments = list(iter_caption_segments(write(tmp_path, "talk.vtt", VTT)))
+
+    assert [segment['text'] for segment in segments] == ["first cue", "second cue"]
+    assert segments[0]['start'] == 1.0
+    assert segments[1]['start'] == 3602.25
+
+
+def test_json_segments_stream_across_read_blocks(tmp_path, monkeypatch):
+    monkeypatch.setattr(transcript_files, "READ_BLOCK_SIZE", 16)
+    timestamps = [{'start': i * 2.0, 'duration': 2.0, 'text': f'segment {i} with "quotes" and ] brackets'} for i in range(20)]
+    path = write(tmp_path, "doc.json", json.dumps({'video_id': "dQw4w9WgXcQ", 'full_text': "x" * 100,
+                                                    'timestamps': timestamps}))
+
+    assert list(iter_json_segments(path)) == timestamps
+
+
+def test_truncated_json_raises(tmp_path):
+    path = write(tmp_path, "doc.json", '{"timestamps": [{"start": 0, "duration": 1, "text": "a"}, {"start"')
+    with pytest.raises(ValueError):
+        list(iter_json_segments(path))
+
+
+def test_file_video_id_uses_recorded_youtube_id(tmp_path):
+    path = write(tmp_path, "doc.json", json.dumps({'video_id': "dQw4w9WgXcQ", 'timestamps': []}))
+    assert file_video_id(path) == "dQw4w9WgXcQ"
+
+
+@pytest.mark.parametrize("video_id", ["../../etc/passwd", "..", "not-a-youtube-id", "a/b/c/d/e/f"])
+def test_file_video_id_ignores_unsafe_recorded_ids(tmp_path, video_id):
+    path = write(tmp_path, "doc.json", json.dumps({'video_id': video_id, 'timestamps': []}))
+
+    derived = file_video_id(path)
+    assert derived.startswith("file-") and len(derived) == 21
+    assert "/" not in derived and ".." not in derived
+
+
+def test_file_video_id_is_content_derived_and_stable(tmp_path):
+    first = write(tmp_path, "a.srt", SRT)
+    moved = write(tmp_path, "renamed.srt", SRT)
+    other = write(tmp_path, "b.srt", SRT + "\n4\n00:00:07,000 --> 00:00:08,000\nmore\n")
+
+    assert file_video_id(first) == file_video_id(moved)
+    assert file_video_id(first) != file_video_id(other)
+
+
+def test_transcript_file_discovery(tmp_path):
+    write(tmp_path, "a.srt", SRT)
+    (tmp_path / "nested").mkdir()
+    write(tmp_path / "nested", "b.vtt", VTT)
+    write(tmp_path, "notes.txt", "ignored")
+    write(tmp_path, "videos.txt.state.json", "{}")
+
+    found = [path.replace(str(tmp_path), "") for path in iter_transcript_files(str(tmp_path))]
+    assert found == ["/a.srt", "/nested/b.vtt"]
+    assert is_transcript_path(str(tmp_path))
+    assert not transcript_file_info(str(tmp_path / "notes.txt"))['valid']
+    assert transcript_file_info(str(tmp_path / "a.srt"))['video_id'].startswith("file-")
@@ -0,0 +1,67 @@
+from rag import transcript_source
+from rag.transcript_source import NegativeCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_negative_cache_returns_message_until_ttl_expires(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(transcript_source.time, "monotonic", clock)
+    cache = NegativeCache(ttl_seconds=60)
+
+    cache.put("abcdefghijk", "❌ Video is unavailable.")
+    assert cache.get("abcdefghijk") == "❌ Video is unavailable."
+
+    clock.now += 59
+    assert cache.get("abcdefghijk") == "❌ Video is unavailable."
+
+    clock.now += 2
+    assert cache.get("abcdefghijk") is None
+    assert len(cache) == 0
+
+
+def test_negative_cache_disabled_with_zero_ttl():
+    cache = NegativeCache(ttl_seconds=0)
+    cache.put("abcdefghijk", "❌ No transcript found.")
+    assert cache.get("abcdefghijk") is None
+    assert len(cache) == 0
+
+
+def test_negative_cache_discard():
+    cache = NegativeCache(ttl_seconds=60)
+    cache.put("abcdefghijk", "❌ No transcript found.")
+    cache.discard("abcdefghijk")
+    assert cache.get("abcdefghijk") is None
+
+
+def test_negative_cache_drops_expired_entries_when_full(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(transcript_source.time, "monotonic", clock)
+    cache = NegativeCache(ttl_seconds=10, max_entries=3)
+    for video_id in ("a", "b", "c"):
+        cache.put(video_id, "failed")
+
+    clock.now += 11
+    cache.put("d", "failed")
+    assert len(cache) == 1
+    assert cache.get("d") == "failed"
+
+
+def test_negative_cache_evicts_soonest_expiring_when_full_of_live_entries(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(transcript_source.time, "monotonic", clock)
+    cache = NegativeCache(ttl_seconds=10, max_entries=3)
+    for video_id in ("a", "b", "c"):
+        cache.put(video_id, "failed")
+        clock.now += 1
+
+    cache.put("d", "failed")
+    assert len(cache) == 3
+    assert cache.get("a") is None
+    assert cache.get("d") == "failed"
@@ -0,0 +1,114 @@
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Tuple
+from prometheus_client import Counter, Gauge, Histogram, CONTENT_TYPE_LATEST, generate_latest
+
+# Pipeline stages: url_validation, transcript_fetch, split, embed, vector_add,
+# retrieve and llm_generate
+STAGE_LATENCY = Histogram(
+    'rag_stage_duration_seconds',
+    'Latency of RAG pipeline stages',
+    ['stage'],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+)
+
+STAGE_ERRORS = Counter(
+    'rag_stage_errors_total',
+    'Pipeline stage calls that raised an exception',
+    ['stage']
+)
+
+CACHE_REQUESTS = Counter(
+    'rag_cache_requests_total',
+    'Cache lookups by cache name and result (hit or miss)',
+    ['cache', 'result']
+)
+
+QUERY_BATCH_SIZE = Histogram(
+    'rag_query_batch_size',
+    'Number of queries encoded per micro-batch',
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128)
+)
+
+RETRIEVAL_DEPTH = Histogram(
+    'rag_retrieval_depth_chunks',
+    'Chunks kept per query by adaptive retrieval',
+    buckets=(1, 2, 3, 4, 5, 6, 8, 10, 12, 16, 24)
+)
+
+EXECUTOR_QUEUE_DEPTH = Gauge(
+    'rag_executor_queue_depth',
+    'Tasks waiting for a free executor worker',
+    ['executor']
+)
+
+
+@lru_cache(maxsize=None)
+def _stage_histogram(stage: str):
+    return STAGE_LATENCY.labels(stage=stage)
+
+
+@lru_cache(maxsize=None)
+def _cache_counter(cache: str, result: str):
+    return CACHE_REQUESTS.labels(cache=cache, result=result)
+
+
+@contextmanager
+def track_stage(stage: str):
+    """
+    Time a pipeline stage and count its failures
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        STAGE_ERRORS.labels(stage=stage).inc()
+        raise
+    finally:
+        _stage_histogram(stage).observe(time.perf_counter() - started)
+
+
+def observe_stage(stage: str, seconds: float):
+    """
+    Record a stage duration that was measured elsewhere
+    """
+    _stage_histogram(stage).observe(seconds)
+
+
+def record_cache_lookup(cache: str, hit: bool, count: int = 1):
+    """
+    Count cache hits or misses for the hit-rate metrics
+    """
+    if count:
+        _cache_counter(cache, 'hit' if hit else 'miss').inc(count)
+
+
+def observe_query_batch(size: int):
+    """
+    Record the size of one query-encoding micro-batch
+    """
+    QUERY_BATCH_SIZE.observe(size)
+
+
+def observe_retrieval_depth(chunks: int):
+    """
+    Record how many chunks adaptive retrieval kept for one query
+    """
+    RETRIEVAL_DEPTH.observe(chunks)
+
+
+def register_executor(name: str, executor):
+    """
+    Expose the pending-task queue depth of an executor; objects with a
+    pending_tasks() method report their own depth
+    """
+    depth = getattr(executor, 'pending_tasks', None) or (lambda: executor._work_queue.qsize())
+    EXECUTOR_QUEUE_DEPTH.labels(executor=name).set_function(depth)
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """
+    Render all metrics in the Prometheus text exposition format
+    """
+    return generate_latest(), CONTENT_TYPE_LATEST
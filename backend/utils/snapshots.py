@@ -0,0 +1,67 @@
+import threading
+import time
+from typing import Callable, Dict, Any, Optional
+from app.config import Config
+
+
+class SnapshotRefresher:
+    """
+    Recompute statistics on a background thread at a fixed interval and serve the
+    latest result, so monitoring scrapes never touch the model or scan the store
+    """
+    def __init__(self, collect: Callable[[], Dict[str, Any]], interval: float = None, name: str = "stats"):
+        self.collect = collect
+        self.interval = interval or Config.STATS_REFRESH_SECONDS
+        self.name = name
+        self._snapshot: Optional[Dict[str, Any]] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def refresh(self):
+        """
+        Collect once and swap in the new snapshot; a failed collection keeps the previous data
+        """
+        started = time.perf_counter()
+        try:
+            data = self.collect()
+            error = None
+        except Exception as e:
+            print(f"Error refreshing {self.name} snapshot: {str(e)}")
+            data = self._snapshot['data'] if self._snapshot else {}
+            error = str(e)
+        self._snapshot = {
+            'data': data,
+            'refreshed_at': time.time(),
+            'refresh_ms': round((time.perf_counter() - started) * 1000, 2),
+            'error': error
+        }
+
+    def start(self):
+        """
+        Take the first snapshot synchronously, then keep refreshing in the background
+        """
+        self.refresh()
+        self._thread = threading.Thread(target=self._run, name=f"{self.name}-refresher", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.refresh()
+
+    def stop(self):
+        self._stop.set()
+
+    def get(self) -> Optional[Dict[str, Any]]:
+        """
+        Latest snapshot with its age, or None before the first refresh
+        """
+        snapshot = self._snapshot
+        if snapshot is None:
+            return None
+        age = time.time() - snapshot['refreshed_at']
+        return {
+            **snapshot,
+            'age_seconds': round(age, 3),
+            # The refresher thread has missed several intervals
+            'stale': age > 3 * self.interval
+        }
@@ -0,0 +1,7 @@
+def estimate_tokens(text: str) -> int:
+    """
+    Rough token count for prompt budgeting (about four characters per token)
+    """
+    if not text:
+        return 0
+    return (len(text) + 3) // 4
@@ -0,0 +1,207 @@
+import contextvars
+import functools
+import json
+import logging
+import os
+import queue
+import re
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from logging.handlers import RotatingFileHandler
+from typing import Optional, Dict, Any, List
+from app.config import Config
+
+TRACE_HEADER = "X-Trace-ID"
+# Client-supplied trace IDs are kept only if they look like one (hex/UUID style)
+TRACE_ID_PATTERN = re.compile(r'^[A-Za-z0-9_-]{8,64}$')
+
+_current_trace = contextvars.ContextVar("current_trace", default=None)
+_current_span = contextvars.ContextVar("current_span", default=None)
+
+
+class Span:
+    __slots__ = ('name', 'span_id', 'parent_id', 'start', 'end', 'attributes', 'error')
+
+    def __init__(self, name: str, parent_id: Optional[str], attributes: Dict[str, Any]):
+        self.name = name
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.start = time.time()
+        self.end = None
+        self.attributes = attributes
+        self.error = None
+
+    def to_dict(self, trace_start: float) -> Dict[str, Any]:
+        return {
+            'name': self.name,
+            'span_id': self.span_id,
+            'parent_id': self.parent_id,
+            'start_offset_ms': round((self.start - trace_start) * 1000, 3),
+            'duration_ms': round(((self.end or time.time()) - self.start) * 1000, 3),
+            'attributes': self.attributes,
+            'error': self.error
+        }
+
+
+def valid_trace_id(trace_id: Optional[str]) -> Optional[str]:
+    """
+    The trace ID if it is safe to log and echo back, otherwise None
+    """
+    if trace_id and TRACE_ID_PATTERN.match(trace_id):
+        return trace_id
+    return None
+
+
+class Trace:
+    def __init__(self, name: str, trace_id: Optional[str] = None):
+        self.name = name
+        self.trace_id = valid_trace_id(trace_id) or uuid.uuid4().hex
+        self.start = time.time()
+        self.end = None
+        self.attributes: Dict[str, Any] = {}
+        self.spans: List[Span] = []
+        self._lock = threading.Lock()
+
+    def add_span(self, span: Span):
+        with self._lock:
+            self.spans.append(span)
+
+    @property
+    def duration_ms(self) -> float:
+        return ((self.end or time.time()) - self.start) * 1000
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            spans = [span.to_dict(self.start) for span in self.spans]
+        return {
+            'trace_id': self.trace_id,
+            'name': self.name,
+            'timestamp': self.start,
+            'duration_ms': round(self.duration_ms, 3),
+            'attributes': self.attributes,
+            'spans': spans
+        }
+
+
+class RotatingFileExporter:
+    """
+    Write finished traces as JSON lines to a size-rotated local file. Serializing and
+    writing happen on a background thread so request handlers never wait on disk.
+    """
+    def __init__(self, path: str = None, max_bytes: int = None, backup_count: int = None,
+                 min_duration_ms: float = None, queue_size: int = None):
+        self.path = path or os.path.join(Config.TRACES_PATH, "traces.jsonl")
+        self.min_duration_ms = Config.TRACE_MIN_DURATION_MS if min_duration_ms is None else min_duration_ms
+        self.dropped = 0
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size or Config.TRACE_EXPORT_QUEUE_SIZE)
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._logger = logging.getLogger(f"trace_exporter.{self.path}")
+        self._logger.setLevel(logging.INFO)
+        self._logger.propagate = False
+        if not self._logger.handlers:
+            handler = RotatingFileHandler(
+                self.path,
+                maxBytes=max_bytes or Config.TRACE_FILE_MAX_BYTES,
+                backupCount=backup_count or Config.TRACE_FILE_BACKUP_COUNT,
+                encoding='utf-8'
+            )
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            self._logger.addHandler(handler)
+
+        self._writer = threading.Thread(target=self._write_loop, name="trace-exporter", daemon=True)
+        self._writer.start()
+
+    def export(self, trace: Trace):
+        if trace.duration_ms < self.min_duration_ms:
+            return
+        try:
+            self._queue.put_nowait(trace)
+        except queue.Full:
+            self.dropped += 1
+
+    def _write_loop(self):
+        while True:
+            trace = self._queue.get()
+            try:
+                self._logger.info(json.dumps(trace.to_dict(), default=str))
+            except Exception as e:
+                print(f"Error exporting trace: {str(e)}")
+            finally:
+                self._queue.task_done()
+
+    def flush(self):
+        """
+        Wait until every queued trace has been written
+        """
+        self._queue.join()
+
+
+_exporter: Optional[RotatingFileExporter] = None
+_exporter_lock = threading.Lock()
+
+
+def get_exporter() -> RotatingFileExporter:
+    global _exporter
+    if _exporter is None:
+        with _exporter_lock:
+            if _exporter is None:
+                _exporter = RotatingFileExporter()
+    return _exporter
+
+
+@contextmanager
+def start_trace(name: str, trace_id: Optional[str] = None):
+    """
+    Open a trace for the current request and export it when it finishes
+    """
+    current = Trace(name, trace_id)
+    trace_token = _current_trace.set(current)
+    span_token = _current_span.set(None)
+    try:
+        yield current
+    finally:
+        current.end = time.time()
+        _current_span.reset(span_token)
+        _current_trace.reset(trace_token)
+        if Config.TRACING_ENABLED:
+            get_exporter().export(current)
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """
+    Record a timed span under the active trace; a no-op outside of a trace
+    """
+    current = _current_trace.get()
+    if current is None:
+        yield None
+        return
+
+    parent = _current_span.get()
+    new_span = Span(name, parent.span_id if parent else None, attributes)
+    token = _current_span.set(new_span)
+    try:
+        yield new_span
+    except Exception as e:
+        new_span.error = str(e)
+        raise
+    finally:
+        new_span.end = time.time()
+        _current_span.reset(token)
+        current.add_span(new_span)
+
+
+def current_trace_id() -> Optional[str]:
+    current = _current_trace.get()
+    return current.trace_id if current else None
+
+
+def bind_context(fn, *args, **kwargs):
+    """
+    Wrap a call so it runs inside a copy of the caller's trace context, e.g. in an executor
+    """
+    context = contextvars.copy_context()
+    return functools.partial(context.run, fn, *args, **kwargs)
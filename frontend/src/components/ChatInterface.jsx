@@ -1,5 +1,5 @@
 // src/components/ChatInterface.jsx
-import React, { useState } from 'react';
+import React, { useEffect, useState } from 'react';
 import MessageBubble from './MessageBubble';
 import LoadingSpinner from './LoadingSpinner';
 import '../styles/ChatInterface.css';
@@ -9,6 +9,14 @@ const ChatInterface = ({ videoId }) => {
   const [messages, setMessages] = useState([]);
   const [input, setInput] = useState('');
   const [loading, setLoading] = useState(false);
+  const [sessionId, setSessionId] = useState(null);
+
+  // A different video starts a fresh conversation
+  useEffect(() => {
+    setMessages([]);
+    setSessionId(null);
+    setInput('');
+  }, [videoId]);
 
   const handleSend = async () => {
     if (!input.trim()) return;
@@ -17,7 +25,8 @@ const ChatInterface = ({ videoId }) => {
     setLoading(true);
 
     try {
-      const response = await sendChatMessage(input, videoId);
+      const response = await sendChatMessage(input, videoId, sessionId);
+      setSessionId(response.session_id);
       const botMessage = { type: 'bot', text: response.response };
       setMessages((prev) => [...prev, botMessage]);
     } catch (error) {
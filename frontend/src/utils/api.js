@@ -10,10 +10,12 @@ export const processVideo = async (url) => {
   return response.data;
 };
 
-export const sendChatMessage = async (message, video_id) => {
+export const sendChatMessage = async (message, video_id, session_id) => {
   const response = await axios.post(`${BASE_URL}/chat`, { 
     query: message,  // Changed from 'message' to 'query' to match backend model
-    video_id: video_id 
+    video_id: video_id,
+    session_id: session_id,  // Server keeps the conversation history for this session
+    start_session: true      // Open one on the first message
   });
   return response.data;
 };
\ No newline at end of file